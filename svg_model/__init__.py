@@ -1,14 +1,23 @@
 # coding: utf-8
 from __future__ import absolute_import
 from __future__ import unicode_literals
-import re
 import types
 import warnings
 
+from .curves import CURVE_TOLERANCE
 from .data_frame import get_bounding_boxes
+from .primitives import PRIMITIVE_TAGS, PrimitiveShapes, primitive_parameters
+from .simplify import simplify_mask
+from .svgload.layers import iter_layer_shapes
+from .svgload.path_parser import (LoopTracer, ParseError, PathDataParser,
+                                  cre_path_number)
+from .svgload.walk import SHAPE_TAGS, iter_shapes
+from .transform import (TransformedPoints, apply_transform,
+                        element_transform)
 from six.moves import map
 from six.moves import cStringIO as StringIO
 import lxml
+import numpy as np
 import pandas as pd
 import pint  # Unit conversion from inches to mm
 import six
@@ -22,65 +31,132 @@ NSMAP = {'svg' : XHTML_NAMESPACE}
 INKSCAPE_NSMAP = NSMAP.copy()
 INKSCAPE_NSMAP['inkscape'] = 'http://www.inkscape.org/namespaces/inkscape'
 
+#: Shape element attributes describing geometry (i.e., not included as
+#: columns by :func:`svg_shapes_to_df`, since vertex coordinates already
+#: reflect them, including the ``transform`` of each shape).
+GEOMETRY_ATTRIBUTES = ('d', 'points', 'x', 'y', 'width', 'height', 'cx',
+                       'cy', 'r', 'rx', 'ry', 'x1', 'y1', 'x2', 'y2',
+                       'transform')
+
 # Convert Inkscape pixels-per-inch (PPI) to pixels-per-mm (PPmm).
 ureg = pint.UnitRegistry()
 
 INKSCAPE_PPI = 90
 INKSCAPE_PPmm = INKSCAPE_PPI / (1 * ureg.inch).to('mm')
 
-float_pattern = r'[+-]?\d+(\.\d+)?([eE][+-]?\d+)?'  # 2, 1.23, 23e39, 1.23e-6, etc.
-cre_path_command = re.compile(r'((?P<xy_command>[ML])\s+(?P<x>{0}),\s*(?P<y>{0})\s*|'
-                              r'(?P<x_command>[H])\s+(?P<hx>{0})\s*|'
-                              r'(?P<y_command>[V])\s+(?P<vy>{0})\s*|'
-                              r'(?P<command>[Z]\s*))'
-                              .format(float_pattern))
+def path_vertices(svg_path_d, tolerance=CURVE_TOLERANCE):
+    '''
+    Parameters
+    ----------
+    svg_path_d : str
+        ``"d"`` attribute of SVG ``path`` element.
+    tolerance : float, optional
+        Maximum distance between curves (i.e., ``C``, ``S``, ``Q``, ``T``,
+        ``A`` commands) and the line segments they are flattened to.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(n, 2)`` array of vertices of all subpaths, in order.
 
+        Each closed subpath is closed to its own start point, and its closing
+        vertex (i.e., equal to the start point) is not repeated.
 
-def shape_path_points(svg_path_d):
+    Raises
+    ------
+    svg_model.svgload.path_parser.ParseError
+        If the path data is invalid.
+
+    See also
+    --------
+    :meth:`svg_model.svgload.path_parser.PathDataParser.to_arrays`,
+    :meth:`svg_model.svgload.path_parser.LoopTracer.trace`
+
+    Examples
+    --------
+
+    >>> path_vertices('m 100,200 50,0 0,50 -50,0 z').tolist()
+    [[100.0, 200.0], [150.0, 200.0], [150.0, 250.0], [100.0, 250.0]]
+    '''
+    loops = LoopTracer(tolerance).trace(*PathDataParser()
+                                        .to_arrays(svg_path_d),
+                                        open_paths=True)
+    return np.concatenate(loops) if loops else np.empty((0, 2))
+
+
+def shape_path_points(svg_path_d, tolerance=CURVE_TOLERANCE):
     '''
     Parameters
     ----------
     svg_path_d : str
         ``"d"`` attribute of SVG ``path`` element.
+    tolerance : float, optional
+        Maximum distance between curves (i.e., ``C``, ``S``, ``Q``, ``T``,
+        ``A`` commands) and the line segments they are flattened to.
 
     Returns
     -------
     list
-        List of coordinates of points found in SVG path.
+        List of coordinates of points found in SVG path (see
+        :func:`path_vertices`).
 
         Each point is represented by a dictionary with keys ``x`` and ``y``.
+
+    Examples
+    --------
+
+    Absolute and relative (i.e., lower case) commands may be mixed:
+
+    >>> [(point_i['x'], point_i['y'])
+    ...  for point_i in shape_path_points('M 1,2 l 3,0 V 6 h -3 z')]
+    [(1.0, 2.0), (4.0, 2.0), (4.0, 6.0), (1.0, 6.0)]
     '''
-    # TODO Add support for relative commands, e.g., `l, h, v`.
-    def _update_path_state(path_state, match):
-        if match.group('xy_command'):
-            for dim_j in 'xy':
-                path_state[dim_j] = float(match.group(dim_j))
-            if path_state.get('x0') is None:
-                for dim_j in 'xy':
-                    path_state['%s0' % dim_j] = path_state[dim_j]
-        elif match.group('x_command'):
-            path_state['x'] = float(match.group('hx'))
-        elif match.group('y_command'):
-            path_state['y'] = float(match.group('vy'))
-        elif match.group('command') == 'Z':
-            for dim_j in 'xy':
-                path_state[dim_j] = path_state['%s0' % dim_j]
-        return path_state
-
-    # Some commands in a SVG path element `"d"` attribute require previous state.
-    #
-    # For example, the `"H"` command is a horizontal move, so the previous
-    # ``y`` position is required to resolve the new `(x, y)` position.
-    #
-    # Iterate through the commands in the `"d"` attribute in order and maintain
-    # the current path position in the `path_state` dictionary.
-    path_state = {'x': None, 'y': None}
-    return [{k: v for k, v in six.iteritems(_update_path_state(path_state, match_i)) if k in 'xy'} for match_i in cre_path_command
-            .finditer(svg_path_d)]
+    return [{'x': x, 'y': y}
+            for x, y in path_vertices(svg_path_d, tolerance).tolist()]
+
+
+def parse_points(points):
+    '''
+    Parse SVG `points`_ attribute (e.g., of an ``svg:polygon``).
+
+    Coordinates may be separated by any combination of whitespace (including
+    newlines) and commas; all coordinates are converted to floats at once.
+
+    .. _points: https://developer.mozilla.org/en-US/docs/Web/SVG/Attribute/points
 
+    Parameters
+    ----------
+    points : str
+        SVG ``points`` attribute value.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(n, 2)`` array of point coordinates.
+
+    Raises
+    ------
+    ValueError
+        If any coordinate is not a number, or the number of coordinates is
+        odd.
 
-def svg_shapes_to_df(svg_source, xpath='//svg:path | //svg:polygon',
-                     namespaces=INKSCAPE_NSMAP):
+    Examples
+    --------
+
+    >>> parse_points('0,0 10, 0\\n  10 5,0,5').tolist()
+    [[0.0, 0.0], [10.0, 0.0], [10.0, 5.0], [0.0, 5.0]]
+    '''
+    if cre_path_number.sub('', points).strip(' \t\r\n,'):
+        raise ValueError('Invalid number in points: %r' % points)
+    coordinates = np.array(cre_path_number.findall(points), dtype=float)
+    if coordinates.size % 2:
+        raise ValueError('Odd number of coordinates in points: %r' % points)
+    return coordinates.reshape(-1, 2)
+
+
+def svg_shapes_to_df(svg_source, xpath=None, namespaces=INKSCAPE_NSMAP,
+                     tolerance=CURVE_TOLERANCE, simplify_tolerance=None,
+                     layers=None, tags=SHAPE_TAGS):
     '''
     Construct a data frame with one row per vertex for all shapes in
     :data:`svg_source``.
@@ -92,9 +168,28 @@ def svg_shapes_to_df(svg_source, xpath='//svg:path | //svg:polygon',
     xpath : str, optional
         XPath path expression to select shape nodes.
 
-        By default, all ``svg:path`` and ``svg:polygon`` elements are selected.
+        By default, all ``svg:path``, ``svg:polygon``, ``svg:polyline``,
+        ``svg:line``, ``svg:rect``, ``svg:circle``, and ``svg:ellipse``
+        elements are selected in a single walk of the document tree (see
+        :func:`svg_model.svgload.walk.iter_shapes`).
     namespaces : dict, optional
         Key/value mapping of XML namespaces.
+    tolerance : float, optional
+        Maximum distance between ``svg:path`` curves (or ``svg:rect``,
+        ``svg:circle``, and ``svg:ellipse`` outlines) and the line segments
+        they are flattened to (see :func:`path_vertices` and
+        :meth:`svg_model.primitives.PrimitiveShapes.get_polygons`).
+    simplify_tolerance : float, optional
+        If not ``None``, simplify each shape (after applying transforms) with
+        the specified tolerance (see
+        :func:`svg_model.simplify.simplify_shapes`).
+    layers : str or list, optional
+        If not ``None``, only load shapes from the layer(s) with the specified
+        ``inkscape:label`` (see :func:`load_layer`).  Cannot be combined with
+        :data:`xpath`.
+    tags : list, optional
+        Local names of (SVG namespace) shape elements to load (ignored if
+        :data:`xpath` is specified).
 
     Returns
     -------
@@ -107,27 +202,61 @@ def svg_shapes_to_df(svg_source, xpath='//svg:path | //svg:polygon',
          - ``y``: The y-coordinate of the vertex.
          - other: attributes of the SVG shape element (e.g., ``id``, ``fill``,
             etc.)
+
+        Vertex coordinates are in document coordinates, i.e., the
+        ``transform`` attributes of each shape element and of all its
+        ancestor elements (e.g., Inkscape layer groups) are applied.  The
+        ``transform`` attribute is therefore *not* included as a column
+        (e.g., so that drawing the frame with
+        :func:`svg_model.draw.draw_shapes_svg_layer` does not apply the
+        transform again).
+
+        Note that ``svg:rect``, ``svg:circle``, and ``svg:ellipse`` elements
+        are polygonized to produce vertices.  Use
+        :class:`svg_model.primitives.PrimitiveShapes` to compute areas,
+        centroids, bounding boxes, or point-in-shape tests of these shapes
+        analytically instead.
     '''
     from lxml import etree
 
-    e_root = etree.parse(svg_source)
-    frames = []
+    if layers is not None:
+        if xpath is not None:
+            raise ValueError('`xpath` and `layers` cannot be combined.')
+        # Only materialize shape elements of selected layers.
+        shapes, transforms = [], []
+        for shape_i, transform_i, layer_i in iter_layer_shapes(svg_source,
+                                                               layers, tags):
+            shapes.append(shape_i)
+            transforms.append(transform_i)
+    elif xpath is None:
+        # Shape elements with cumulative transforms, in one pass.
+        shapes, transforms = [], []
+        for shape_i, transform_i, layer_i in iter_shapes(etree
+                                                         .parse(svg_source),
+                                                         tags):
+            shapes.append(shape_i)
+            transforms.append(transform_i)
+    else:
+        e_root = etree.parse(svg_source)
+        shapes = e_root.xpath(xpath, namespaces=namespaces)
+        # Cumulative transform of each ancestor group (resolved once per
+        # group).
+        transform_cache = {}
+        transforms = [element_transform(shape_i, transform_cache)
+                      for shape_i in shapes]
     attribs_set = set()
 
     # Get list of attributes that are set in any of the shapes (not including
-    # the `svg:path` `"d"` attribute or the `svg:polygon` `"points"`
-    # attribute).
+    # geometry attributes, e.g., the `svg:path` `"d"` attribute or the
+    # `svg:polygon` `"points"` attribute).
     #
     # This, for example, collects attributes such as:
     #
     #  - `fill`, `stroke` (as part of `"style"` attribute)
-    #  - `"transform"`: matrix, scale, etc.
-    for shape_i in e_root.xpath(xpath, namespaces=namespaces):
+    for shape_i in shapes:
         attribs_set.update(list(shape_i.attrib.keys()))
 
-    for k in ('d', 'points'):
-        if k in attribs_set:
-            attribs_set.remove(k)
+    attribs_set.difference_update(GEOMETRY_ATTRIBUTES)
 
     attribs = list(sorted(attribs_set))
 
@@ -136,33 +265,128 @@ def svg_shapes_to_df(svg_source, xpath='//svg:path | //svg:polygon',
         attribs.remove('id')
     attribs.insert(0, 'id')
 
-    for shape_i in e_root.xpath(xpath, namespaces=namespaces):
-        # Gather shape attributes from SVG element.
-        base_fields = [shape_i.attrib.get(k, None) for k in attribs]
-
-        if shape_i.tag == '{http://www.w3.org/2000/svg}path':
+    shape_fields = []
+    shape_points = []
+    # Position in `shape_points`, parameters and transform of each primitive
+    # shape (polygonized all at once below).
+    primitive_positions = []
+    primitive_params = []
+    primitive_transforms = []
+
+    for shape_i, matrix_i in zip(shapes, transforms):
+        tag_i = shape_i.tag.rsplit('}', 1)[-1]
+        if tag_i == 'path':
             # Decode `svg:path` vertices from [`"d"`][1] attribute.
             #
             # [1]: https://developer.mozilla.org/en-US/docs/Web/SVG/Attribute/d
-            points_i = [base_fields + [i] + [point_i.get(k) for k in 'xy']
-                        for i, point_i in
-                        enumerate(shape_path_points(shape_i.attrib['d']))]
-        elif shape_i.tag == '{http://www.w3.org/2000/svg}polygon':
-            # Decode `svg:polygon` vertices from [`"points"`][2] attribute.
+            try:
+                points_i = path_vertices(shape_i.attrib['d'], tolerance)
+            except ParseError as exception:
+                warnings.warn('Error parsing path %s: %s' %
+                              (shape_i.attrib.get('id'), exception),
+                              RuntimeWarning)
+                continue
+        elif tag_i in ('polygon', 'polyline'):
+            # Decode `svg:polygon`/`svg:polyline` vertices from [`"points"`][2]
+            # attribute.
             #
             # [2]: https://developer.mozilla.org/en-US/docs/Web/SVG/Attribute/points
-            points_i = [base_fields + [i] + list(map(float, v.split(',')))
-                        for i, v in enumerate(shape_i.attrib['points']
-                                              .strip().split(' '))]
+            points_i = parse_points(shape_i.attrib['points'])
+        elif tag_i == 'line':
+            points_i = [[float(shape_i.attrib.get(k, 0)) for k in pair]
+                        for pair in (('x1', 'y1'), ('x2', 'y2'))]
+        elif tag_i in PRIMITIVE_TAGS:
+            params_i = primitive_parameters(shape_i)
+            if params_i is None:
+                # Shape is not rendered (e.g., zero radius).
+                continue
+            primitive_positions.append(len(shape_points))
+            primitive_params.append(params_i)
+            primitive_transforms.append(np.identity(3) if matrix_i is None
+                                        else matrix_i)
+            shape_points.append(None)
+            shape_fields.append([shape_i.attrib.get(k, None)
+                                 for k in attribs])
+            continue
         else:
-            warnings.warning('Unsupported shape tag type: %s' % shape_i.tag)
+            warnings.warn('Unsupported shape tag type: %s' % shape_i.tag)
             continue
-        frames.extend(points_i)
-    if not frames:
-        # There were no shapes found, so set `frames` list to `None` to allow
-        # an empty data frame to be created.
-        frames = None
-    return pd.DataFrame(frames, columns=attribs + ['vertex_i', 'x', 'y'])
+        points_i = np.array(points_i, dtype=float).reshape(-1, 2)
+
+        # Apply cumulative transform to all vertices of shape at once.
+        points_i = apply_transform(points_i, matrix_i)
+        shape_points.append(points_i)
+
+        # Gather shape attributes from SVG element.
+        shape_fields.append([shape_i.attrib.get(k, None) for k in attribs])
+
+    if primitive_positions:
+        # Polygonize all primitive shapes at once (in document coordinates).
+        primitives = PrimitiveShapes([None] * len(primitive_params),
+                                     primitive_params, primitive_transforms)
+        points, counts = primitives.get_polygons(tolerance)
+        for position_i, points_i in zip(primitive_positions,
+                                        np.split(points,
+                                                 np.cumsum(counts)[:-1])):
+            shape_points[position_i] = points_i
+
+    if not shape_points:
+        # There were no shapes found, so create an empty data frame.
+        return pd.DataFrame(None, columns=attribs + ['vertex_i', 'x', 'y'])
+
+    # Build columns directly from per-shape arrays (one row per vertex).
+    counts = np.array([points_i.shape[0] for points_i in shape_points])
+    points = np.concatenate(shape_points)
+
+    if simplify_tolerance is not None:
+        # Simplify all shapes at once (shapes without vertices are skipped,
+        # since they have no vertices in `points`).
+        keep = simplify_mask(points, counts[counts > 0], simplify_tolerance)
+        shape_codes = np.repeat(np.arange(counts.size), counts)
+        counts = np.bincount(shape_codes[keep], minlength=counts.size)
+        points = points[keep]
+    fields = np.empty((len(shape_fields), len(attribs)), dtype=object)
+    fields[:] = shape_fields
+    fields = fields.repeat(counts, axis=0)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+
+    columns = [(k, fields[:, j]) for j, k in enumerate(attribs)]
+    columns += [('vertex_i', np.arange(points.shape[0]) - starts),
+                ('x', points[:, 0]), ('y', points[:, 1])]
+    return pd.DataFrame(dict(columns), columns=[c for c, v in columns])
+
+
+def load_layer(svg_source, name, **kwargs):
+    '''
+    Construct a data frame with one row per vertex for all shapes in the
+    selected layer(s) of :data:`svg_source`.
+
+    The document is parsed in a single streaming pass, where elements outside
+    of the selected layers are discarded as soon as they are parsed (see
+    :func:`svg_model.svgload.layers.iter_layer_shapes`).  Use
+    :func:`svg_model.svgload.layers.index_layers` to list the layers of a
+    document.
+
+    Arguments
+    ---------
+    svg_source : str or file-like
+        A file path, URI, or file-like object.
+    name : str or list
+        Label (i.e., ``inkscape:label``) or list of labels of layers to load.
+    **kwargs
+        Keyword arguments passed to :func:`svg_shapes_to_df`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        See :func:`svg_shapes_to_df`.
+
+    Raises
+    ------
+    KeyError
+        If any of the selected layers is not found in the document.
+    '''
+    return svg_shapes_to_df(svg_source, layers=name, **kwargs)
 
 
 def svg_polygons_to_df(svg_source, xpath='//svg:polygon',
@@ -257,7 +481,8 @@ def compute_shape_centers(df_shapes, shape_i_column, inplace=False):
     return df_shapes.join(center_offset, rsuffix='_center_offset')
 
 
-def scale_points(df_points, scale=INKSCAPE_PPmm.magnitude, inplace=False):
+def scale_points(df_points, scale=INKSCAPE_PPmm.magnitude, inplace=False,
+                 lazy=False):
     '''
     Translate points such that bounding box is anchored at (0, 0) and scale
     ``x`` and ``y`` columns of input frame by specified :data:`scale`.
@@ -275,33 +500,36 @@ def scale_points(df_points, scale=INKSCAPE_PPmm.magnitude, inplace=False):
 
         By default, scale to millimeters based on Inkscape default of 90
         pixels-per-inch.
-    scale : float, optional
-        Factor to scale points by.
-    in_place : bool, optional
+    inplace : bool, optional
         If ``True``, input frame will be modified.
 
         Otherwise, the scaled points are written to a new frame, leaving the
         input frame unmodified.
+    lazy : bool, optional
+        If ``True`` (and :data:`inplace` is ``False``), return a
+        :class:`svg_model.transform.TransformedPoints` view of the input frame
+        instead of a new frame, i.e., the input frame is *not* copied and the
+        scaled coordinates are computed on access.
 
     Returns
     -------
-    pandas.DataFrame
+    pandas.DataFrame or svg_model.transform.TransformedPoints
         Input frame with the points translated such that bounding box is
         anchored at (0, 0) and ``x`` and ``y`` values scaled by specified
         :data:`scale`.
     '''
-    if not inplace:
-        df_points = df_points.copy()
-
-    # Offset device, such that all coordinates are >= 0.
-    df_points.x -= df_points.x.min()
-    df_points.y -= df_points.y.min()
+    xy = df_points[['x', 'y']].values
+    # Offset device, such that all coordinates are >= 0, and scale path
+    # coordinates.
+    points_scale = 1. / scale
+    offset = -points_scale * xy.min(axis=0)
 
-    # Scale path coordinates.
-    df_points.x /= scale
-    df_points.y /= scale
-
-    return df_points
+    if inplace:
+        df_points['x'] = points_scale * xy[:, 0] + offset[0]
+        df_points['y'] = points_scale * xy[:, 1] + offset[1]
+        return df_points
+    view = TransformedPoints(df_points, points_scale, offset)
+    return view if lazy else view.to_frame()
 
 
 def scale_to_fit_a_in_b(a_shape, b_shape):
@@ -311,8 +539,9 @@ def scale_to_fit_a_in_b(a_shape, b_shape):
 
     Arguments
     ---------
-    a_shape, b_shape : pandas.Series
-        Input shapes containing numeric `width` and `height` values.
+    a_shape, b_shape : pandas.Series or tuple
+        Input shapes containing numeric `width` and `height` values (or
+        ``(width, height)`` tuples).
 
     Returns
     -------
@@ -320,20 +549,24 @@ def scale_to_fit_a_in_b(a_shape, b_shape):
         Scale factor to fit :data:`a_shape` into :data:`b_shape` while
         maintaining aspect ratio.
     '''
-    # Normalize the shapes to allow comparison.
-    a_shape_normal = a_shape / a_shape.max()
-    b_shape_normal = b_shape / b_shape.max()
-
-    if a_shape_normal.width > b_shape_normal.width:
-        a_shape_normal *= b_shape_normal.width / a_shape_normal.width
+    a_width, a_height = _shape_size(a_shape)
+    b_width, b_height = _shape_size(b_shape)
+    # Limit scale by the dimension of `a` that is largest relative to `b`
+    # (dimensions of zero size do not constrain the scale).
+    scales = [b_i / a_i for a_i, b_i in ((a_width, b_width),
+                                         (a_height, b_height)) if a_i]
+    return min(scales) if scales else 1.
 
-    if a_shape_normal.height > b_shape_normal.height:
-        a_shape_normal *= b_shape_normal.height / a_shape_normal.height
 
-    return a_shape_normal.max() * b_shape.max() / a_shape.max()
+def _shape_size(shape):
+    if isinstance(shape, pd.Series):
+        return float(shape['width']), float(shape['height'])
+    width, height = shape
+    return float(width), float(height)
 
 
-def fit_points_in_bounding_box(df_points, bounding_box, padding_fraction=0):
+def fit_points_in_bounding_box(df_points, bounding_box, padding_fraction=0,
+                               lazy=False):
     '''
     Return data frame with ``x``, ``y`` columns scaled to fit points from
     :data:`df_points` to fill :data:`bounding_box` while maintaining aspect
@@ -348,20 +581,23 @@ def fit_points_in_bounding_box(df_points, bounding_box, padding_fraction=0):
         A `pandas.Series` containing numeric `width` and `height` values.
     padding_fraction : float
         Fraction of padding to add around points.
+    lazy : bool, optional
+        If ``True``, return a :class:`svg_model.transform.TransformedPoints`
+        view of :data:`df_points` instead of a new frame, i.e., the input
+        frame is *not* copied and the scaled coordinates are computed on
+        access.
 
     Returns
     -------
-    pandas.DataFrame
+    pandas.DataFrame or svg_model.transform.TransformedPoints
         Input frame with the points with ``x`` and ``y`` values scaled to fill
         :data:`bounding_box` while maintaining aspect ratio.
     '''
-    df_scaled_points = df_points.copy()
     offset, padded_scale = fit_points_in_bounding_box_params(df_points,
                                                              bounding_box,
                                                              padding_fraction)
-    df_scaled_points[['x', 'y']] *= padded_scale
-    df_scaled_points[['x', 'y']] += offset
-    return df_scaled_points
+    view = TransformedPoints(df_points, padded_scale, offset.values)
+    return view if lazy else view.to_frame()
 
 
 def fit_points_in_bounding_box_params(df_points, bounding_box,
@@ -377,7 +613,8 @@ def fit_points_in_bounding_box_params(df_points, bounding_box,
         A frame with at least the columns ``x`` and ``y``, containing one row
         per point.
     bounding_box: pandas.Series
-        A `pandas.Series` containing numeric `width` and `height` values.
+        A `pandas.Series` containing numeric `width` and `height` values (or
+        a ``(width, height)`` tuple).
     padding_fraction : float
         Fraction of padding to add around points.
 
@@ -390,18 +627,19 @@ def fit_points_in_bounding_box_params(df_points, bounding_box,
 
         :data:`offset` contains ``x`` and ``y`` values for the offset.
     '''
-    width = df_points.x.max()
-    height = df_points.y.max()
+    width, height = df_points[['x', 'y']].values.max(axis=0)
+    bounding_width, bounding_height = _shape_size(bounding_box)
 
-    points_bbox = pd.Series([width, height], index=['width', 'height'])
     fill_scale = 1 - 2 * padding_fraction
     assert(fill_scale > 0)
 
-    scale = scale_to_fit_a_in_b(points_bbox, bounding_box)
+    scale = scale_to_fit_a_in_b((width, height),
+                                (bounding_width, bounding_height))
 
     padded_scale = scale * fill_scale
-    offset = .5 * (bounding_box - points_bbox * padded_scale)
-    offset.index = ['x', 'y']
+    offset = pd.Series([.5 * (bounding_width - width * padded_scale),
+                        .5 * (bounding_height - height * padded_scale)],
+                       index=['x', 'y'])
     return offset, padded_scale
 
 
@@ -1,7 +1,251 @@
 # coding: utf-8
 from __future__ import absolute_import
+from __future__ import division
 from __future__ import unicode_literals
+from collections import OrderedDict
 import re
+import threading
+
+#: Maximum number of entries in each parsed color/style cache.
+CACHE_SIZE = 256
+
+#: Named colors (see `SVG color keywords`_).
+#:
+#: .. _SVG color keywords: https://www.w3.org/TR/SVG11/types.html#ColorKeywords
+NAMED_COLORS = {
+    'aliceblue': '#f0f8ff', 'antiquewhite': '#faebd7', 'aqua': '#00ffff',
+    'aquamarine': '#7fffd4', 'azure': '#f0ffff', 'beige': '#f5f5dc',
+    'bisque': '#ffe4c4', 'black': '#000000', 'blanchedalmond': '#ffebcd',
+    'blue': '#0000ff', 'blueviolet': '#8a2be2', 'brown': '#a52a2a',
+    'burlywood': '#deb887', 'cadetblue': '#5f9ea0', 'chartreuse': '#7fff00',
+    'chocolate': '#d2691e', 'coral': '#ff7f50', 'cornflowerblue': '#6495ed',
+    'cornsilk': '#fff8dc', 'crimson': '#dc143c', 'cyan': '#00ffff',
+    'darkblue': '#00008b', 'darkcyan': '#008b8b', 'darkgoldenrod': '#b8860b',
+    'darkgray': '#a9a9a9', 'darkgreen': '#006400', 'darkgrey': '#a9a9a9',
+    'darkkhaki': '#bdb76b', 'darkmagenta': '#8b008b',
+    'darkolivegreen': '#556b2f', 'darkorange': '#ff8c00',
+    'darkorchid': '#9932cc', 'darkred': '#8b0000', 'darksalmon': '#e9967a',
+    'darkseagreen': '#8fbc8f', 'darkslateblue': '#483d8b',
+    'darkslategray': '#2f4f4f', 'darkslategrey': '#2f4f4f',
+    'darkturquoise': '#00ced1', 'darkviolet': '#9400d3', 'deeppink': '#ff1493',
+    'deepskyblue': '#00bfff', 'dimgray': '#696969', 'dimgrey': '#696969',
+    'dodgerblue': '#1e90ff', 'firebrick': '#b22222', 'floralwhite': '#fffaf0',
+    'forestgreen': '#228b22', 'fuchsia': '#ff00ff', 'gainsboro': '#dcdcdc',
+    'ghostwhite': '#f8f8ff', 'gold': '#ffd700', 'goldenrod': '#daa520',
+    'gray': '#808080', 'grey': '#808080', 'green': '#008000',
+    'greenyellow': '#adff2f', 'honeydew': '#f0fff0', 'hotpink': '#ff69b4',
+    'indianred': '#cd5c5c', 'indigo': '#4b0082', 'ivory': '#fffff0',
+    'khaki': '#f0e68c', 'lavender': '#e6e6fa', 'lavenderblush': '#fff0f5',
+    'lawngreen': '#7cfc00', 'lemonchiffon': '#fffacd', 'lightblue': '#add8e6',
+    'lightcoral': '#f08080', 'lightcyan': '#e0ffff',
+    'lightgoldenrodyellow': '#fafad2', 'lightgray': '#d3d3d3',
+    'lightgreen': '#90ee90', 'lightgrey': '#d3d3d3', 'lightpink': '#ffb6c1',
+    'lightsalmon': '#ffa07a', 'lightseagreen': '#20b2aa',
+    'lightskyblue': '#87cefa', 'lightslategray': '#778899',
+    'lightslategrey': '#778899', 'lightsteelblue': '#b0c4de',
+    'lightyellow': '#ffffe0', 'lime': '#00ff00', 'limegreen': '#32cd32',
+    'linen': '#faf0e6', 'magenta': '#ff00ff', 'maroon': '#800000',
+    'mediumaquamarine': '#66cdaa', 'mediumblue': '#0000cd',
+    'mediumorchid': '#ba55d3', 'mediumpurple': '#9370db',
+    'mediumseagreen': '#3cb371', 'mediumslateblue': '#7b68ee',
+    'mediumspringgreen': '#00fa9a', 'mediumturquoise': '#48d1cc',
+    'mediumvioletred': '#c71585', 'midnightblue': '#191970',
+    'mintcream': '#f5fffa', 'mistyrose': '#ffe4e1', 'moccasin': '#ffe4b5',
+    'navajowhite': '#ffdead', 'navy': '#000080', 'oldlace': '#fdf5e6',
+    'olive': '#808000', 'olivedrab': '#6b8e23', 'orange': '#ffa500',
+    'orangered': '#ff4500', 'orchid': '#da70d6', 'palegoldenrod': '#eee8aa',
+    'palegreen': '#98fb98', 'paleturquoise': '#afeeee',
+    'palevioletred': '#db7093', 'papayawhip': '#ffefd5',
+    'peachpuff': '#ffdab9', 'peru': '#cd853f', 'pink': '#ffc0cb',
+    'plum': '#dda0dd', 'powderblue': '#b0e0e6', 'purple': '#800080',
+    'red': '#ff0000', 'rosybrown': '#bc8f8f', 'royalblue': '#4169e1',
+    'saddlebrown': '#8b4513', 'salmon': '#fa8072', 'sandybrown': '#f4a460',
+    'seagreen': '#2e8b57', 'seashell': '#fff5ee', 'sienna': '#a0522d',
+    'silver': '#c0c0c0', 'skyblue': '#87ceeb', 'slateblue': '#6a5acd',
+    'slategray': '#708090', 'slategrey': '#708090', 'snow': '#fffafa',
+    'springgreen': '#00ff7f', 'steelblue': '#4682b4', 'tan': '#d2b48c',
+    'teal': '#008080', 'thistle': '#d8bfd8', 'tomato': '#ff6347',
+    'turquoise': '#40e0d0', 'violet': '#ee82ee', 'wheat': '#f5deb3',
+    'white': '#ffffff', 'whitesmoke': '#f5f5f5', 'yellow': '#ffff00',
+    'yellowgreen': '#9acd32',
+}
+
+cre_hex_color = re.compile(r'#(?P<R>[\da-fA-F]{2})(?P<G>[\da-fA-F]{2})'
+                           r'(?P<B>[\da-fA-F]{2})(?P<A>[\da-fA-F]{2})?$|'
+                           r'#(?P<r>[\da-fA-F])(?P<g>[\da-fA-F])'
+                           r'(?P<b>[\da-fA-F])(?P<a>[\da-fA-F])?$')
+cre_rgb_color = re.compile(r'rgba?\(\s*(?P<R>[\d.]+)(?P<percent>%?)\s*,'
+                           r'\s*(?P<G>[\d.]+)%?\s*,\s*(?P<B>[\d.]+)%?\s*'
+                           r'(,\s*(?P<A>[\d.]+)\s*)?\)$')
+
+
+class LruCache(object):
+    '''
+    Bounded least-recently-used cache of the results of a single-argument
+    function.
+
+    Parameters
+    ----------
+    function : callable
+        Function to cache (results are shared between calls, i.e., must not
+        be modified).
+    maxsize : int, optional
+        Maximum number of cached results.
+    '''
+    def __init__(self, function, maxsize=CACHE_SIZE):
+        self.function = function
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        # Guards `_cache`, e.g., for parsing in a thread pool (see
+        # :func:`svg_model.path_group.load_many`).
+        self._lock = threading.Lock()
+        self.__doc__ = function.__doc__
+
+    def __call__(self, key):
+        with self._lock:
+            try:
+                value = self._cache.pop(key)
+            except KeyError:
+                pass
+            else:
+                # Reinsert as most recently used result.
+                self._cache[key] = value
+                return value
+        # Compute result outside of the lock (concurrent misses for the same
+        # key may compute the result more than once).
+        value = self.function(key)
+        with self._lock:
+            self._cache.pop(key, None)
+            while len(self._cache) >= self.maxsize:
+                # Evict least recently used result.
+                self._cache.popitem(last=False)
+            self._cache[key] = value
+        return value
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def _parse_color(color):
+    '''
+    Parse SVG/CSS color string.
+
+    Results are cached (see :class:`LruCache`).
+
+    Parameters
+    ----------
+    color : str
+        Color string, i.e., ``"#RGB[A]"``, ``"#RRGGBB[AA]"``, ``"rgb(r, g,
+        b)"``, ``"rgba(r, g, b, a)"`` (channels as integers or percentages,
+        alpha in ``[0, 1]``), a named color (e.g., ``"red"``), or ``"none"``.
+
+    Returns
+    -------
+    tuple or None
+        ``(r, g, b, a)`` tuple, where each channel is an integer in ``[0,
+        255]`` (``a`` is ``None`` if not specified), or ``None`` if
+        :data:`color` is ``"none"``.
+
+    Raises
+    ------
+    ValueError
+        If :data:`color` is not a supported color string.
+
+    Examples
+    --------
+
+    >>> parse_color('#0000ff')
+    (0, 0, 255, None)
+    >>> parse_color('#f80')
+    (255, 136, 0, None)
+    >>> parse_color('rgb(100%, 50%, 0%)')
+    (255, 128, 0, None)
+    >>> parse_color('Navy')
+    (0, 0, 128, None)
+    '''
+    color = color.strip()
+    lower_color = color.lower()
+    if lower_color == 'none':
+        return None
+    color = NAMED_COLORS.get(lower_color, color)
+
+    match = cre_hex_color.match(color)
+    if match:
+        channels = match.groupdict()
+        if channels['R'] is not None:
+            return tuple(int(channels[k], 16) if channels[k] is not None
+                         else None for k in 'RGBA')
+        # Each digit of `#rgb[a]` is repeated, e.g., `#f80` is `#ff8800`.
+        return tuple(17 * int(channels[k], 16) if channels[k] is not None
+                     else None for k in 'rgba')
+
+    match = cre_rgb_color.match(lower_color)
+    if match:
+        channels = match.groupdict()
+        # Channels are either in `[0, 255]` or percentages.
+        scale = 100 if channels['percent'] else 255
+        rgb = tuple(min(int(round(float(channels[k]) * 255 / scale)), 255)
+                    for k in 'RGB')
+        alpha = (None if channels['A'] is None
+                 else min(int(round(float(channels['A']) * 255)), 255))
+        return rgb + (alpha, )
+
+    raise ValueError('Unsupported color string: %r (must be in format '
+                     '#RGB[A], #RRGGBB[AA], rgb(r, g, b), rgba(r, g, b, a), '
+                     'or a named color)' % color)
+
+
+parse_color = LruCache(_parse_color)
+
+
+def _parse_style(style):
+    '''
+    Parse SVG ``style`` attribute.
+
+    Results are cached (see :class:`LruCache`), since documents typically
+    reuse a handful of distinct style strings across many elements.
+
+    Parameters
+    ----------
+    style : str
+        Style string, e.g., ``"fill:#ff2a2a;fill-rule:evenodd;stroke:none"``.
+
+    Returns
+    -------
+    (fill, properties) : (tuple, dict)
+        The items in the tuple are:
+         - ``fill``: Fill color as an ``(r, g, b, a)`` tuple (see
+           :func:`parse_color`), or ``None`` if there is no fill (or the fill
+           is not a plain color, e.g., a gradient).
+         - ``properties``: Style properties (including ``fill``), keyed by
+           property name.  **Shared between calls, must not be modified.**
+
+    Examples
+    --------
+
+    >>> fill, properties = parse_style('fill:#ff2a2a;stroke:none')
+    >>> fill
+    (255, 42, 42, None)
+    >>> properties['stroke'] == 'none'
+    True
+    '''
+    properties = {}
+    for element in style.split(';'):
+        name, separator, value = element.partition(':')
+        if separator:
+            properties[name.strip()] = value.strip()
+    try:
+        fill = parse_color(properties['fill'])
+    except (KeyError, ValueError):
+        fill = None
+    return fill, properties
+
+
+parse_style = LruCache(_parse_style)
 
 
 def hex_color_to_rgba(hex_color, normalize_to=255):
@@ -9,6 +253,9 @@ def hex_color_to_rgba(hex_color, normalize_to=255):
     Convert a hex-formatted number (i.e., `"#RGB[A]"` or `"#RRGGBB[AA]"`) to an
     RGBA tuple (i.e., `(<r>, <g>, <b>, <a>)`).
 
+    Any other color string supported by :func:`parse_color` (e.g.,
+    `"rgb(255, 0, 0)"` or `"red"`) is also accepted.
+
     Args:
 
         hex_color (str) : hex-formatted number (e.g., `"#2fc"`, `"#3c2f8611"`)
@@ -19,28 +266,11 @@ def hex_color_to_rgba(hex_color, normalize_to=255):
         (tuple) : RGBA tuple (i.e., `(<r>, <g>, <b>, <a>)`), where range of
             each channel in tuple is `[0, normalize_to]`.
     '''
-    color_pattern_one_digit = (r'#(?P<R>[\da-fA-F])(?P<G>[\da-fA-F])'
-                               r'(?P<B>[\da-fA-F])(?P<A>[\da-fA-F])?')
-    color_pattern_two_digit = (r'#(?P<R>[\da-fA-F]{2})(?P<G>[\da-fA-F]{2})'
-                               r'(?P<B>[\da-fA-F]{2})(?P<A>[\da-fA-F]{2})?')
-
-    # First try to match `#rrggbb[aa]`.
-    match = re.match(color_pattern_two_digit, hex_color)
+    channels = parse_color(hex_color)
+    if channels is None:
+        raise ValueError('Color string must be in format #RGB[A] or '
+                         '#RRGGBB[AA] (i.e., alpha channel is optional)')
 
-    if match:
-        channels = match.groupdict()
-        channel_scale = 255
-    else:
-        # Try to match `#rgb[a]`.
-        match = re.match(color_pattern_one_digit, hex_color)
-        if match:
-            channels = match.groupdict()
-            channel_scale = 15
-        else:
-            raise ValueError('Color string must be in format #RGB[A] or '
-                             '#RRGGBB[AA] (i.e., alpha channel is optional)')
-
-    scale = normalize_to / channel_scale
-    return tuple(type(normalize_to)(int(channels[k], 16) * scale)
-                 if channels[k] is not None else None
-                 for k in 'RGBA')
+    scale = normalize_to / 255
+    return tuple(type(normalize_to)(channel * scale)
+                 if channel is not None else None for channel in channels)
@@ -11,23 +11,172 @@ import numpy as np
 
 from . import INKSCAPE_NSMAP
 from .draw import draw_lines_svg_layer as _draw_lines_svg_layer
+from .segments import (iter_segment_pairs, polygon_segments,
+                       segment_distances, shared_lengths)
+from .spatial_index import BoundingBoxIndex
 from six.moves import map
+import six
 
 
 def extend_shapes(df_shapes, axis, distance):
     '''
     Extend shape/polygon outline away from polygon center point by absolute
     distance.
+
+    See :func:`dilate_shapes` to dilate all shapes in both directions without
+    requiring center columns (see :func:`svg_model.compute_shape_centers`).
+    '''
+    offsets = df_shapes[axis + '_center_offset'].values
+    offsets = offsets + np.where(offsets < 0, -distance, distance)
+    return df_shapes.assign(**{axis: df_shapes[axis + '_center'].values +
+                               offsets})
+
+
+def dilate_polygons(points, counts, distance, miter_limit=4.):
     '''
-    df_shapes_i = df_shapes.copy()
-    offsets = df_shapes_i[axis + '_center_offset'].copy()
-    offsets[offsets < 0] -= distance
-    offsets[offsets >= 0] += distance
-    df_shapes_i[axis] = df_shapes_i[axis + '_center'] + offsets
-    return df_shapes_i
+    Offset polygon outlines outward by an absolute distance (i.e., mitered
+    polygon offsetting), for all polygons at once.
 
+    Parameters
+    ----------
+    points : numpy.ndarray
+        ``(n, 2)`` array of vertices of all polygons, where the vertices of
+        each polygon are contiguous and in path order.  Polygons may be
+        explicitly closed (i.e., last vertex equal to the first vertex), may
+        repeat consecutive vertices, and may have either orientation.
+    counts : numpy.ndarray
+        Number of vertices of each polygon.
+    distance : float
+        Offset distance (negative values shrink polygons).
+    miter_limit : float, optional
+        Maximum distance of offset vertices from the original vertices, as a
+        multiple of :data:`distance` (limits spikes at sharp corners).
 
-def extract_adjacent_shapes(df_shapes, shape_i_column, extend=.5):
+    Returns
+    -------
+    numpy.ndarray
+        ``(n, 2)`` array of offset vertices.
+    '''
+    points = np.asarray(points, dtype=float)
+    counts = np.asarray(counts, dtype=int)
+    positions = np.arange(points.shape[0])
+    starts = np.cumsum(counts) - counts
+    polygon_i = np.repeat(np.arange(counts.size), counts)
+
+    # Repeated consecutive vertices (i.e., zero-length edges, including the
+    # closing edge of explicitly closed polygons) have no normal, so offsets
+    # are computed for distinct vertices only.  Each repeated vertex is
+    # offset along with the first vertex of its run.
+    distinct = np.ones(points.shape[0], dtype=bool)
+    distinct[1:] = (points[1:] != points[:-1]).any(axis=1)
+    distinct[starts] = True
+    run_starts = np.maximum.accumulate(np.where(distinct, positions, 0))
+    last = run_starts[starts + counts - 1]
+    closed = (last != starts) & (points[last] == points[starts]).all(axis=1)
+    distinct[last[closed]] = False
+    closing = np.zeros(points.shape[0], dtype=bool)
+    closing[last[closed]] = True
+    run_starts = np.where(closing[run_starts], starts[polygon_i], run_starts)
+    vertex_i = (np.cumsum(distinct) - 1)[run_starts]
+
+    vertices = points[distinct]
+    polygon_i = polygon_i[distinct]
+    counts = np.bincount(polygon_i, minlength=counts.size)
+    starts = np.cumsum(counts) - counts
+    positions = np.arange(vertices.shape[0])
+    next_i = positions + 1
+    next_i[starts + counts - 1] = starts
+    previous_i = positions - 1
+    previous_i[starts] = starts + counts - 1
+
+    # Orientation of each polygon (shoelace formula).
+    x, y = vertices[:, 0], vertices[:, 1]
+    factors = x * y[next_i] - x[next_i] * y
+    signed_areas = np.bincount(polygon_i, weights=factors,
+                               minlength=counts.size)
+    orientation = np.where(signed_areas < 0, -1., 1.)[polygon_i]
+
+    def _normals(edges):
+        lengths = np.hypot(edges[:, 0], edges[:, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normals = np.column_stack([edges[:, 1], -edges[:, 0]]) / \
+                lengths[:, None]
+        return np.nan_to_num(normals) * orientation[:, None]
+
+    # Outward unit normals of edge to and from each vertex.
+    normals_in = _normals(vertices - vertices[previous_i])
+    normals_out = _normals(vertices[next_i] - vertices)
+
+    # Miter offset along bisector of edge normals.
+    bisectors = normals_in + normals_out
+    scale = 1 + (normals_in * normals_out).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offsets = bisectors / scale[:, None]
+    offsets = np.nan_to_num(offsets)
+    lengths = np.hypot(offsets[:, 0], offsets[:, 1])
+    too_long = lengths > miter_limit
+    offsets[too_long] *= (miter_limit / lengths[too_long])[:, None]
+    return points + distance * offsets[vertex_i]
+
+
+def dilate_shapes(df_shapes, shape_i_columns, distance, polygons=False):
+    '''
+    Dilate all shapes by an absolute distance.
+
+    Only the ``x``/``y`` columns are read (attribute columns are neither
+    copied nor included in the result).
+
+    Parameters
+    ----------
+    df_shapes : pandas.DataFrame
+        Table of polygon shape vertices (one row per vertex).
+    shape_i_columns : str or list
+        Column(s) forming key to differentiate rows/vertices for each distinct
+        shape.
+    distance : float
+        Dilation distance.
+    polygons : bool, optional
+        If ``True``, return outward offset polygons (see
+        :func:`dilate_polygons`).  Otherwise, return dilated bounding boxes.
+
+    Returns
+    -------
+    pandas.DataFrame
+        If :data:`polygons` is ``False``, table indexed by
+        :data:`shape_i_columns` with the columns ``x``, ``y``, ``width``, and
+        ``height`` of the dilated bounding box of each shape (see
+        :func:`svg_model.data_frame.get_bounding_boxes`).
+
+        Otherwise, table with the :data:`shape_i_columns` columns and the
+        columns ``vertex_i``, ``x``, and ``y`` (one row per vertex of each
+        offset polygon).
+    '''
+    if isinstance(shape_i_columns, six.string_types):
+        shape_i_columns = [shape_i_columns]
+
+    if not polygons:
+        xy_groups = df_shapes.groupby(shape_i_columns)[['x', 'y']]
+        xy_min = xy_groups.agg('min') - distance
+        shapes = (xy_groups.agg('max') + distance -
+                  xy_min).rename(columns={'x': 'width', 'y': 'height'})
+        return xy_min.join(shapes)
+
+    # Row positions of each shape, in path order.
+    shape_rows = df_shapes.groupby(shape_i_columns).indices
+    order = np.concatenate(list(shape_rows.values()))
+    counts = np.array([rows_i.size for rows_i in shape_rows.values()])
+    points = dilate_polygons(df_shapes[['x', 'y']].values[order], counts,
+                             distance)
+
+    columns = [(c, df_shapes[c].values[order]) for c in shape_i_columns]
+    columns += [('vertex_i', np.arange(order.size) -
+                 np.repeat(np.cumsum(counts) - counts, counts)),
+                ('x', points[:, 0]), ('y', points[:, 1])]
+    return pd.DataFrame(dict(columns), columns=[c for c, v in columns])
+
+
+def extract_adjacent_shapes(df_shapes, shape_i_column, extend=.5,
+                            mode='bbox', min_shared_length=0):
     '''
     Generate list of connections between "adjacent" polygon shapes based on
     geometrical "closeness".
@@ -48,6 +197,23 @@ def extract_adjacent_shapes(df_shapes, shape_i_column, extend=.5):
         In each direction, a polygon considered adjacent to all polygons that
         are overlapped by the extended shape.
 
+        If :data:`mode` is ``'polygon'``, maximum gap between the outlines of
+        adjacent polygons.
+    mode : str, optional
+        Adjacency criterion:
+         - ``'bbox'``: Overlap of stretched bounding boxes (see
+           :data:`extend`).
+         - ``'polygon'``: Minimum distance between polygon outlines (i.e.,
+           edge-to-edge distance) of at most :data:`extend`, and shared
+           boundary length of at least :data:`min_shared_length`.  Candidate
+           pairs are found using bounding boxes; the distances and shared
+           lengths are then computed over all segment pairs of each
+           candidate pair at once.
+    min_shared_length : float, optional
+        Minimum length of boundary shared by adjacent polygons, i.e., the
+        length of (nearly) parallel edges within :data:`extend` of each
+        other (only used if :data:`mode` is ``'polygon'``).
+
     Returns
     -------
     pandas.DataFrame
@@ -56,65 +222,100 @@ def extract_adjacent_shapes(df_shapes, shape_i_column, extend=.5):
 
         The ``source`` and ``target`` of each adjacency connection is ordered
         such that the ``source`` is less than the ``target``.
+
+        If :data:`mode` is ``'polygon'``, the frame also contains the
+        columns ``distance`` (minimum edge-to-edge distance) and
+        ``shared_length``.
+    '''
+    if mode not in ('bbox', 'polygon'):
+        raise ValueError('Unsupported adjacency mode: %s' % mode)
+
+    # Find corners of each solid shape outline, in order of first appearance
+    # of each shape.
+    df_corners = dilate_shapes(df_shapes, shape_i_column, 0)
+    shape_keys = df_shapes[shape_i_column].drop_duplicates().values
+    df_corners = df_corners.loc[shape_keys]
+    x_min, y_min = df_corners.x.values, df_corners.y.values
+    x_max = x_min + df_corners.width.values
+    y_max = y_min + df_corners.height.values
+    bboxes = np.column_stack([x_min, y_min, x_max, y_max])
+
+    if mode == 'polygon':
+        return _extract_adjacent_polygons(df_shapes, shape_i_column,
+                                          shape_keys, bboxes, extend,
+                                          min_shared_length)
+
+    # Broad phase: shapes overlapping the bounding box of each shape extended
+    # by `extend` in both directions.
+    index = BoundingBoxIndex(bboxes)
+    i, j = index.query(bboxes + abs(extend) * np.array([-1, -1, 1, 1]))
+
+    # Shape `i` stretched in `x` direction overlaps edge of shape `j`, or
+    # shape `i` stretched in `y` direction overlaps edge of shape `j`.
+    def _stretched_overlap(a_min, a_max, b_min, b_max, c_min, c_max, d_min,
+                           d_max):
+        # `a`, `b`: stretched axis of shapes `i` and `j`;  `c`, `d`: other
+        # axis.
+        return ((((b_min < a_max + extend) & (b_max >= a_max + extend)) |
+                 ((b_min < a_min - extend) & (b_max >= a_min - extend))) &
+                (d_min < c_max) & (d_max > c_min))
+
+    adjacent = (_stretched_overlap(x_min[i], x_max[i], x_min[j], x_max[j],
+                                   y_min[i], y_max[i], y_min[j], y_max[j]) |
+                _stretched_overlap(y_min[i], y_max[i], y_min[j], y_max[j],
+                                   x_min[i], x_max[i], x_min[j], x_max[j]))
+    i, j = i[adjacent], j[adjacent]
+
+    # Keep each connection once, i.e., drop `(i, j)` if `(j, i)` was found for
+    # a shape `j` appearing before shape `i`.
+    connections = set(zip(i.tolist(), j.tolist()))
+    unique = np.array([not (j_k < i_k and (j_k, i_k) in connections)
+                       for i_k, j_k in zip(i.tolist(), j.tolist())],
+                      dtype=bool)
+
+    df_connected = (pd.DataFrame({'source': shape_keys[i[unique]],
+                                  'target': shape_keys[j[unique]]},
+                                 columns=['source', 'target'])
+                    .sort_values(['source', 'target']))
+    return df_connected
+
+
+def _extract_adjacent_polygons(df_shapes, shape_i_column, shape_keys, bboxes,
+                               gap, min_shared_length):
+    '''
+    Polygon-exact adjacency (see :func:`extract_adjacent_shapes`).
     '''
-    # Find corners of each solid shape outline.
-    # Extend x coords by abs units
-    df_scaled_x = extend_shapes(df_shapes, 'x', extend)
-    # Extend y coords by abs units
-    df_scaled_y = extend_shapes(df_shapes, 'y', extend)
-
-    df_corners = df_shapes.groupby(shape_i_column).agg({'x': ['min', 'max'],
-                                                        'y': ['min', 'max']})
-
-    # Find adjacent electrodes
-    row_list = []
-
-    for shapeNumber in df_shapes[shape_i_column].drop_duplicates():
-        df_stretched = df_scaled_x[df_scaled_x[shape_i_column]
-                                   .isin([shapeNumber])]
-        xmin_x, xmax_x, ymin_x, ymax_x = (df_stretched.x.min(),
-                                          df_stretched.x.max(),
-                                          df_stretched.y.min(),
-                                          df_stretched.y.max())
-        df_stretched = df_scaled_y[df_scaled_y[shape_i_column]
-                                   .isin([shapeNumber])]
-        xmin_y, xmax_y, ymin_y, ymax_y = (df_stretched.x.min(),
-                                          df_stretched.x.max(),
-                                          df_stretched.y.min(),
-                                          df_stretched.y.max())
-
-        #Some conditions unnecessary if it is assumed that electrodes don't overlap
-        adjacent = df_corners[
-            ((df_corners.x['min'] < xmax_x) & (df_corners.x['max'] >= xmax_x)
-            # Check in x stretched direction
-            |(df_corners.x['min'] < xmin_x) & (df_corners.x['max'] >= xmin_x))
-            # Check if y is within bounds
-            & (df_corners.y['min'] < ymax_x) & (df_corners.y['max'] > ymin_x) |
-
-            #maybe do ymax_x - df_corners.y['min'] > threshold &
-            #  df_corners.y['max'] - ymin_x > threshold
-
-            ((df_corners.y['min'] < ymax_y) & (df_corners.y['max'] >= ymax_y)
-             # Checks in y stretched direction
-             |(df_corners.y['min'] < ymin_y) & (df_corners.y['max'] >= ymin_y))
-             # Check if x in within bounds
-            & ((df_corners.x['min'] < xmax_y) & (df_corners.x['max'] > xmin_y))
-        ].index.values
-
-        for shape in adjacent:
-            temp_dict = {}
-            reverse_dict = {}
-
-            temp_dict ['source'] = shapeNumber
-            reverse_dict['source'] = shape
-            temp_dict ['target'] = shape
-            reverse_dict['target'] = shapeNumber
-
-            if(reverse_dict not in row_list):
-                row_list.append(temp_dict)
-
-    df_connected = (pd.DataFrame(row_list)[['source', 'target']]
-                    .sort_index(axis=1, ascending=True)
+    # Broad phase: pairs of shapes with bounding boxes within `gap`.
+    index = BoundingBoxIndex(bboxes)
+    i, j = index.query(bboxes + gap * np.array([-1, -1, 1, 1]))
+    upper = i < j
+    i, j = i[upper], j[upper]
+
+    # Boundary segments of each shape (in order of first appearance).
+    shape_rows = df_shapes.groupby(shape_i_column).indices
+    rows = [shape_rows[k] for k in shape_keys]
+    points = df_shapes[['x', 'y']].values[np.concatenate(rows)]
+    p0, p1, segment_counts = polygon_segments(points, [r.size for r in rows])
+
+    # Narrow phase: minimum edge-to-edge distance and shared boundary length
+    # of each candidate pair, over all segment pairs.
+    distances = np.full(i.size, np.inf)
+    lengths = np.zeros(i.size)
+    for pair_k, a, b in iter_segment_pairs(segment_counts, i, j):
+        np.minimum.at(distances, pair_k,
+                      segment_distances(p0[a], p1[a], p0[b], p1[b]))
+        lengths += np.bincount(pair_k, weights=shared_lengths(p0[a], p1[a],
+                                                              p0[b], p1[b],
+                                                              gap),
+                               minlength=i.size)
+
+    adjacent = (distances <= gap) & (lengths >= min_shared_length)
+    df_connected = (pd.DataFrame({'source': shape_keys[i[adjacent]],
+                                  'target': shape_keys[j[adjacent]],
+                                  'distance': distances[adjacent],
+                                  'shared_length': lengths[adjacent]},
+                                 columns=['source', 'target', 'distance',
+                                          'shared_length'])
                     .sort_values(['source', 'target']))
     return df_connected
 
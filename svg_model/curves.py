@@ -0,0 +1,338 @@
+# coding: utf-8
+'''
+Flattening of SVG path curve commands (i.e., cubic/quadratic Bézier curves
+and elliptical arcs) into line segments.
+
+Curve segments are collected while interpreting path commands and then
+flattened *in batch*, i.e., all segments of the same kind are evaluated with
+a handful of array operations (see :func:`flatten_curves`).
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+import numpy as np
+
+#: Default maximum distance between a curve and its flattened line segments.
+CURVE_TOLERANCE = 0.1
+
+#: Maximum number of line segments per flattened curve segment.
+MAX_CURVE_SEGMENTS = 1024
+
+#: Number of arguments of each curve command.
+CURVE_ARG_COUNTS = {'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7}
+
+
+def curve_segments(command, args, current, control=None):
+    '''
+    Resolve a curve command to absolute curve segments.
+
+    Parameters
+    ----------
+    command : str
+        Curve command, one of ``C``, ``S``, ``Q``, ``T``, ``A`` (or the
+        corresponding lower-case, i.e., relative, command).
+    args : list
+        Command arguments.  Multiple sets of arguments (i.e., implicitly
+        repeated commands) are supported.
+    current : tuple
+        Current ``(x, y)`` point (i.e., start point of the first segment).
+    control : tuple, optional
+        ``(family, (x, y))``, where ``family`` is ``C`` or ``Q`` and ``(x,
+        y)`` is the last control point of the previous segment, as returned
+        by a previous call.  Used to reflect the first control point of
+        ``S``/``T`` segments.
+
+    Returns
+    -------
+    (segments, control) : (list, tuple)
+        The items in the tuple are:
+         - ``segments``: List of ``(kind, values)`` tuples, where ``kind`` is
+           one of ``C``, ``Q``, or ``A`` and ``values`` is a list of absolute
+           values in the format expected by :func:`flatten_curves`.  The
+           last two values are the end point of the segment.
+         - ``control``: Control point to pass to the next call.
+
+    Raises
+    ------
+    ValueError
+        If the number of arguments is not a multiple of the number of
+        arguments of :data:`command`.
+    '''
+    kind = command.upper()
+    relative = command != kind
+    arg_count = CURVE_ARG_COUNTS[kind]
+    if not args or len(args) % arg_count:
+        raise ValueError('invalid number of arguments for command %s: %d' %
+                         (command, len(args)))
+
+    segments = []
+    x0, y0 = current
+    for i in range(0, len(args), arg_count):
+        values = [float(v) for v in args[i:i + arg_count]]
+        if relative:
+            # Offset coordinate pairs by current point (arc radii, rotation
+            # and flags are not coordinates).
+            start = 5 if kind == 'A' else 0
+            values[start:] = [v + (y0 if k % 2 else x0)
+                              for k, v in enumerate(values[start:])]
+
+        if kind in 'ST':
+            # Reflect last control point of previous segment of the same
+            # family about the current point (or use the current point).
+            family = 'C' if kind == 'S' else 'Q'
+            if control is not None and control[0] == family:
+                cx, cy = control[1]
+                reflected = [2 * x0 - cx, 2 * y0 - cy]
+            else:
+                reflected = [x0, y0]
+            values = reflected + values
+            kind_i = family
+        else:
+            kind_i = kind
+
+        if kind_i == 'A':
+            segments.append(('A', [x0, y0] + values))
+            control = None
+        else:
+            segments.append((kind_i, [x0, y0] + values))
+            control = (kind_i, tuple(values[-4:-2]))
+        x0, y0 = values[-2:]
+    return segments, control
+
+
+def _segment_counts(counts):
+    counts = np.ceil(np.nan_to_num(counts))
+    return np.clip(counts, 1, MAX_CURVE_SEGMENTS).astype(int)
+
+
+def _parameters(counts):
+    # Curve index and parameter `t` in `(0, 1]` of each output point.
+    index = np.repeat(np.arange(counts.size), counts)
+    steps = np.arange(index.size) - np.repeat(np.cumsum(counts) - counts,
+                                              counts) + 1
+    return index, (steps / counts[index])[:, None]
+
+
+def cubic_bezier_points(control_points, tolerance=CURVE_TOLERANCE):
+    '''
+    Flatten cubic Bézier curves.
+
+    The number of line segments of each curve is chosen such that the
+    distance between the curve and the line segments is at most
+    :data:`tolerance`.
+
+    Parameters
+    ----------
+    control_points : numpy.ndarray
+        ``(n, 4, 2)`` array of start point, control points, and end point of
+        each curve.
+    tolerance : float, optional
+        Maximum flattening error.
+
+    Returns
+    -------
+    (points, counts) : (numpy.ndarray, numpy.ndarray)
+        ``(m, 2)`` array of flattened points of all curves (excluding the start
+        point of each curve, including the end point), and number of points of
+        each curve.
+    '''
+    p = np.asarray(control_points, dtype=float)
+    # Bound on the second derivative (Wang's formula).
+    second = np.maximum(np.hypot(*(p[:, 0] - 2 * p[:, 1] + p[:, 2]).T),
+                        np.hypot(*(p[:, 1] - 2 * p[:, 2] + p[:, 3]).T))
+    counts = _segment_counts(np.sqrt(.75 * second / tolerance))
+    index, t = _parameters(counts)
+    s = 1 - t
+    p = p[index]
+    points = (s ** 3 * p[:, 0] + 3 * s ** 2 * t * p[:, 1] +
+              3 * s * t ** 2 * p[:, 2] + t ** 3 * p[:, 3])
+    return points, counts
+
+
+def quadratic_bezier_points(control_points, tolerance=CURVE_TOLERANCE):
+    '''
+    Flatten quadratic Bézier curves.
+
+    See :func:`cubic_bezier_points`.
+
+    Parameters
+    ----------
+    control_points : numpy.ndarray
+        ``(n, 3, 2)`` array of start point, control point, and end point of
+        each curve.
+    tolerance : float, optional
+        Maximum flattening error.
+    '''
+    p = np.asarray(control_points, dtype=float)
+    second = np.hypot(*(p[:, 0] - 2 * p[:, 1] + p[:, 2]).T)
+    counts = _segment_counts(np.sqrt(.25 * second / tolerance))
+    index, t = _parameters(counts)
+    s = 1 - t
+    p = p[index]
+    points = s ** 2 * p[:, 0] + 2 * s * t * p[:, 1] + t ** 2 * p[:, 2]
+    return points, counts
+
+
+def arc_points(arcs, tolerance=CURVE_TOLERANCE):
+    '''
+    Flatten SVG elliptical arcs.
+
+    See `SVG implementation notes`_ for conversion from endpoint to center
+    parameterization.
+
+    .. _SVG implementation notes: https://www.w3.org/TR/SVG11/implnote.html#ArcImplementationNotes
+
+    Parameters
+    ----------
+    arcs : numpy.ndarray
+        ``(n, 9)`` array with columns ``x0, y0, rx, ry, x_axis_rotation,
+        large_arc_flag, sweep_flag, x, y``, i.e., the start point followed by
+        the ``A`` command arguments.
+    tolerance : float, optional
+        Maximum flattening error.
+
+    Returns
+    -------
+    (points, counts) : (numpy.ndarray, numpy.ndarray)
+        See :func:`cubic_bezier_points`.
+    '''
+    arcs = np.asarray(arcs, dtype=float).reshape(-1, 9)
+    x0, y0, rx, ry, phi, large_arc, sweep, x, y = arcs.T
+    rx, ry = np.abs(rx), np.abs(ry)
+    phi = np.radians(phi)
+    cos, sin = np.cos(phi), np.sin(phi)
+
+    # Start point in rotated coordinates, relative to chord midpoint.
+    dx, dy = .5 * (x0 - x), .5 * (y0 - y)
+    x1, y1 = cos * dx + sin * dy, -sin * dx + cos * dy
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Scale up radii that are too small to span the chord.
+        scale = np.sqrt(np.maximum(1, (x1 / rx) ** 2 + (y1 / ry) ** 2))
+        rx, ry = rx * scale, ry * scale
+
+        numerator = (rx * ry) ** 2 - (rx * y1) ** 2 - (ry * x1) ** 2
+        denominator = (rx * y1) ** 2 + (ry * x1) ** 2
+        coefficient = np.sqrt(np.maximum(numerator, 0) / denominator)
+        coefficient = np.where(large_arc == sweep, -coefficient, coefficient)
+        coefficient = np.nan_to_num(coefficient)
+        cx1, cy1 = coefficient * rx * y1 / ry, -coefficient * ry * x1 / rx
+
+        theta = np.arctan2((y1 - cy1) / ry, (x1 - cx1) / rx)
+        delta = np.arctan2((-y1 - cy1) / ry, (-x1 - cx1) / rx) - theta
+        delta = np.where((sweep == 0) & (delta > 0), delta - 2 * np.pi, delta)
+        delta = np.where((sweep != 0) & (delta < 0), delta + 2 * np.pi, delta)
+
+        # Angle step such that the chord sagitta is at most `tolerance`.
+        radius = np.maximum(rx, ry)
+        step = 2 * np.arccos(np.clip(1 - tolerance / radius, -1, 1))
+        counts = np.ceil(np.abs(delta) / step)
+
+    # Zero radius (or zero length) arcs are straight lines.
+    degenerate = ((rx == 0) | (ry == 0) | ((x0 == x) & (y0 == y)) |
+                  ~np.isfinite(delta))
+    counts = _segment_counts(np.where(degenerate, 1, counts))
+
+    cx = cos * cx1 - sin * cy1 + .5 * (x0 + x)
+    cy = sin * cx1 + cos * cy1 + .5 * (y0 + y)
+
+    index, t = _parameters(counts)
+    t = t[:, 0]
+    angle = theta[index] + delta[index] * t
+    ex, ey = rx[index] * np.cos(angle), ry[index] * np.sin(angle)
+    points = np.column_stack([cx[index] + cos[index] * ex - sin[index] * ey,
+                              cy[index] + sin[index] * ex + cos[index] * ey])
+
+    # Use exact end points (and straight lines for degenerate arcs).
+    ends = np.cumsum(counts) - 1
+    points[ends] = arcs[:, 7:]
+    return points, counts
+
+
+def flatten_curves(curves, tolerance=CURVE_TOLERANCE):
+    '''
+    Flatten curve segments, evaluating all segments of the same kind at once.
+
+    Parameters
+    ----------
+    curves : list
+        List of ``(kind, values)`` tuples, as returned by
+        :func:`curve_segments`, where ``values`` is:
+         - ``C``: ``x0, y0, x1, y1, x2, y2, x, y``
+         - ``Q``: ``x0, y0, x1, y1, x, y``
+         - ``A``: ``x0, y0, rx, ry, x_axis_rotation, large_arc_flag,
+           sweep_flag, x, y``
+    tolerance : float, optional
+        Maximum flattening error.
+
+    Returns
+    -------
+    list
+        ``(k, 2)`` array of flattened points for each curve (excluding the
+        start point, including the end point).
+    '''
+    functions = {'C': lambda v: cubic_bezier_points(v.reshape(-1, 4, 2),
+                                                    tolerance),
+                 'Q': lambda v: quadratic_bezier_points(v.reshape(-1, 3, 2),
+                                                        tolerance),
+                 'A': lambda v: arc_points(v, tolerance)}
+    result = [None] * len(curves)
+    for kind, function in functions.items():
+        positions = [i for i, (kind_i, values_i) in enumerate(curves)
+                     if kind_i == kind]
+        if not positions:
+            continue
+        values = np.array([curves[i][1] for i in positions], dtype=float)
+        points, counts = function(values)
+        for i, points_i in zip(positions,
+                               np.split(points, np.cumsum(counts)[:-1])):
+            result[i] = points_i
+    return result
+
+
+def splice_curves(points, curves, tolerance=CURVE_TOLERANCE):
+    '''
+    Replace curve segment end points in a list of points by the flattened
+    curve segments.
+
+    Parameters
+    ----------
+    points : list or numpy.ndarray
+        List of ``(x, y)`` points (or ``(n, 2)`` array), including the end
+        point of each curve segment.
+    curves : list
+        List of ``(position, kind, values)`` tuples, where ``position`` is the
+        index of the end point of the curve segment in :data:`points` (in
+        ascending order) and ``kind, values`` is a curve segment, as returned
+        by :func:`curve_segments`.
+    tolerance : float, optional
+        Maximum flattening error.
+
+    Returns
+    -------
+    list or numpy.ndarray
+        List of ``(x, y)`` points (or ``(m, 2)`` array if :data:`points` is an
+        array).
+    '''
+    if not curves:
+        return points
+    flattened = flatten_curves([(kind_i, values_i)
+                                for position_i, kind_i, values_i in curves],
+                               tolerance)
+    if isinstance(points, np.ndarray):
+        pieces = []
+        start = 0
+        for (position_i, kind_i, values_i), points_i in zip(curves, flattened):
+            pieces.extend([points[start:position_i], points_i])
+            start = position_i + 1
+        pieces.append(points[start:])
+        return np.concatenate(pieces)
+
+    result = []
+    start = 0
+    for (position_i, kind_i, values_i), points_i in zip(curves, flattened):
+        result.extend(points[start:position_i])
+        result.extend(tuple(p) for p in points_i.tolist())
+        start = position_i + 1
+    result.extend(points[start:])
+    return result
@@ -9,10 +9,14 @@ from .connections import extract_adjacent_shapes
 from .draw import draw_lines_svg_layer
 from . import INKSCAPE_NSMAP, compute_shape_centers, svg_shapes_to_df
 
+#: Local names of shape elements considered by
+#: :func:`auto_detect_adjacent_shapes` (by default).
+CLOSED_SHAPE_TAGS = ('path', 'polygon', 'rect', 'circle', 'ellipse')
+
 
 def auto_detect_adjacent_shapes(svg_source, shape_i_attr='id',
                                 layer_name='Connections',
-                                shapes_xpath='//svg:path | //svg:polygon',
+                                shapes_xpath=None,
                                 extend=1.5):
     '''
     Attempt to automatically find "adjacent" shapes in a SVG layer.
@@ -33,7 +37,10 @@ def auto_detect_adjacent_shapes(svg_source, shape_i_attr='id',
     shapes_xpath : str, optional
         XPath path expression to select shape nodes.
 
-        By default, all ``svg:path`` and ``svg:polygon`` elements are selected.
+        By default, all closed shape elements (i.e., ``svg:path``,
+        ``svg:polygon``, ``svg:rect``, ``svg:circle``, and ``svg:ellipse``)
+        are selected (see :func:`svg_model.svg_shapes_to_df`), i.e., *not*
+        ``svg:line`` elements of an existing connections layer.
     extend : float, optional
         Extend ``x``/``y`` coords by the specified number of absolute units
         from the center point of each shape.
@@ -50,7 +57,8 @@ def auto_detect_adjacent_shapes(svg_source, shape_i_attr='id',
         instances.
     '''
     # Read SVG polygons into dataframe, one row per polygon vertex.
-    df_shapes = svg_shapes_to_df(svg_source, xpath=shapes_xpath)
+    df_shapes = svg_shapes_to_df(svg_source, xpath=shapes_xpath,
+                                 tags=CLOSED_SHAPE_TAGS)
     df_shapes = compute_shape_centers(df_shapes, shape_i_attr)
     df_shape_connections = extract_adjacent_shapes(df_shapes, shape_i_attr,
                                                    extend=extend)
@@ -3,18 +3,33 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import cStringIO as StringIO
 
-import svgwrite
-from svgwrite.path import Path as Path_
-from svgwrite.shapes import Polygon
+import numpy as np
 
-from . import INKSCAPE_NSMAP
+from .simplify import simplify_shapes
+from .svg_writer import (FLOAT_FORMAT, SvgStreamWriter, format_attributes,
+                         format_coordinates, qualify_attribute_names)
+
+#: Number of shapes formatted at once by :func:`draw_shapes_svg_layer`.
+SHAPE_CHUNK_SIZE = 10000
+#: Default CSS class of lines drawn by :func:`draw_lines_svg_layer`.
+LINE_CSS_CLASS = 'connection'
+#: Default CSS style of lines drawn by :func:`draw_lines_svg_layer`.
+LINE_STYLE = 'stroke:#000000; stroke-width:0.1;'
 
 
 def draw_shapes_svg_layer(df_shapes, shape_i_columns, layer_name,
-                          layer_number=1, use_svg_path=True):
+                          layer_number=1, use_svg_path=True,
+                          simplify_tolerance=None, output=None,
+                          float_format=FLOAT_FORMAT,
+                          chunk_size=SHAPE_CHUNK_SIZE):
     '''
     Draw shapes as a layer in a SVG file.
 
+    SVG source is streamed directly to :data:`output`, where the source of
+    all shapes (in chunks of :data:`chunk_size` shapes) is formatted at once
+    from the vertex coordinate array (see
+    :class:`svg_model.svg_writer.SvgStreamWriter`).
+
     Args:
 
         df_shapes (pandas.DataFrame): Table of shape vertices (one row per
@@ -28,74 +43,127 @@ def draw_shapes_svg_layer(df_shapes, shape_i_columns, layer_name,
         use_svg_path (bool, optional) : If ``True``, electrodes are drawn as
             ``svg:path`` elements.  Otherwise, electrodes are drawn as
             ``svg:polygon`` elements.
+        simplify_tolerance (float, optional) : If not ``None``, simplify
+            shapes with the specified tolerance before drawing (see
+            :func:`svg_model.simplify.simplify_shapes`).
+        output (str or file-like, optional) : Output file path or writable
+            file-like object.  By default, output is written to a new
+            in-memory file-like object.
+        float_format (str, optional) : Format of vertex coordinates.
+        chunk_size (int, optional) : Number of shapes to format at once.
 
     Returns
     -------
-    StringIO.StringIO
-        A file-like object containing SVG XML source.
+    file-like or str
+        :data:`output` or, if :data:`output` is not specified, a
+        ``StringIO.StringIO`` file-like object containing SVG XML source
+        (rewound to the start).
 
         The XML contains a layer named according to :data:`layer_name`, which
         in turn contains ``svg:polygon`` or ``svg:path`` elements corresponding
         to the shapes in the input :data:`df_shapes` table.
     '''
-    # Note that `svgwrite.Drawing` requires a filepath to be specified during
-    # construction, *but* nothing is actually written to the path unless one of
-    # the `save*` methods is called.
-    #
-    # In this function, we do *not* call any of the `save*` methods.  Instead,
-    # we use the `write` method to write to an in-memory file-like object.
-    minx, miny = df_shapes[['x', 'y']].min().values
-    maxx, maxy = df_shapes[['x', 'y']].max().values
-    width = maxx - minx
-    height = maxy - miny
-
-    dwg = svgwrite.Drawing('should_not_exist.svg', size=(width, height),
-                           debug=False)
-
-    nsmap = INKSCAPE_NSMAP
-
-    dwg.attribs['xmlns:inkscape'] = nsmap['inkscape']
-
-    svg_root = dwg.g(id='layer%d' % layer_number,
-                     **{'inkscape:label': layer_name,
-                        'inkscape:groupmode': 'layer'})
-
-    minx, miny = df_shapes[['x', 'y']].min().values
-
-    for shape_i, df_shape_i in df_shapes.groupby(shape_i_columns):
-        attr_columns = [c for c in df_shape_i.columns
-                        if c not in ('vertex_i', 'x', 'y')]
-        attrs = df_shape_i.iloc[0][attr_columns].to_dict()
-        vertices = df_shape_i[['x', 'y']].values.tolist()
-        if not use_svg_path:
-            # Draw electrode shape as an `svg:polygon` element.
-            p = Polygon(vertices, debug=False, **attrs)
-        else:
-            # Draw electrode shape as an `svg:path` element.
-            commands = ['M %s,%s' % tuple(vertices[0])]
-            commands += ['L %s,%s' % tuple(v) for v in vertices[1:]]
-            while vertices[0] == vertices[-1]:
-                # Start is equal to end of path, but we will use the `'Z'`
-                # command to close the path, so delete the last point in the
-                # path.
-                del vertices[-1]
-            commands += ['Z']
-            p = Path_(d=' '.join(commands), debug=False, **attrs)
-        svg_root.add(p)
-    dwg.add(svg_root)
-
-    # Write result to `StringIO`.
-    output = StringIO.StringIO()
-    dwg.write(output)
-    output.seek(0)
-
+    if simplify_tolerance is not None:
+        df_shapes = simplify_shapes(df_shapes, shape_i_columns,
+                                    simplify_tolerance)[0]
+
+    # Vertex rows of each shape (in order of shape key, as with `groupby`).
+    shape_rows = df_shapes.groupby(shape_i_columns).indices
+    rows = [shape_rows[key] for key in sorted(shape_rows)]
+    counts = np.array([rows_i.size for rows_i in rows], dtype=int)
+    rows = (np.concatenate(rows) if rows else np.zeros(0, dtype=int))
+    points = df_shapes[['x', 'y']].values[rows].astype(float)
+    starts = np.cumsum(counts) - counts
+
+    # Attributes of each shape, from the first vertex row of each shape.
+    attr_columns = [c for c in df_shapes.columns
+                    if c not in ('vertex_i', 'x', 'y')]
+    # Prefix namespaced attributes (e.g., `sodipodi:nodetypes`).
+    attr_names, namespaces = qualify_attribute_names(attr_columns)
+    attributes = format_attributes(df_shapes[attr_columns]
+                                   .iloc[rows[starts]]
+                                   .rename(columns=attr_names))
+
+    if use_svg_path:
+        # Start is equal to end of path, but we will use the `'Z'` command
+        # to close the path, so delete the last point(s) of the path.
+        while True:
+            ends = starts + counts - 1
+            closed = (counts > 1) & (points[ends] ==
+                                     points[starts]).all(axis=1)
+            if not closed.any():
+                break
+            keep = np.ones(points.shape[0], dtype=bool)
+            keep[ends[closed]] = False
+            points = points[keep]
+            counts = counts - closed
+            starts = np.cumsum(counts) - counts
+
+    minx, miny = points.min(axis=0) if points.size else (0, 0)
+    maxx, maxy = points.max(axis=0) if points.size else (0, 0)
+
+    if output is None:
+        output = StringIO.StringIO()
+        rewind = True
+    else:
+        rewind = False
+
+    with SvgStreamWriter(output, width=maxx - minx, height=maxy - miny,
+                         namespaces=namespaces) as writer:
+        with writer.layer(layer_name, layer_number):
+            for first in range(0, counts.size, chunk_size):
+                last = min(first + chunk_size, counts.size)
+                shape_points = points[starts[first]:
+                                      starts[last - 1] + counts[last - 1]]
+                writer.write_lines(_shape_sources(shape_points,
+                                                  counts[first:last],
+                                                  attributes[first:last],
+                                                  use_svg_path, float_format))
+
+    if rewind:
+        output.seek(0)
     return output
 
 
-def draw_lines_svg_layer(df_endpoints, layer_name, layer_number=1):
+def _shape_sources(points, counts, attributes, use_svg_path, float_format):
+    '''
+    Returns
+    -------
+    numpy.ndarray
+        Source fragments (one per vertex) which, joined, are the ``svg:path``
+        (or ``svg:polygon``) elements of the shapes.
+    '''
+    coordinates = format_coordinates(points, float_format).astype(object)
+    starts = np.cumsum(counts) - counts
+    ends = starts + counts - 1
+    # Prefix of each vertex, where the first vertex of each shape starts the
+    # element.
+    prefixes = np.empty(points.shape[0], dtype=object)
+    if use_svg_path:
+        prefixes[:] = ' L '
+        prefixes[starts] = '<path' + attributes + ' d="M '
+        suffix = ' Z" />'
+    else:
+        prefixes[:] = ' '
+        prefixes[starts] = '<polygon' + attributes + ' points="'
+        suffix = '" />'
+    fragments = prefixes + coordinates[:, 0] + ',' + coordinates[:, 1]
+    fragments[ends] += suffix
+    return fragments
+
+
+def draw_lines_svg_layer(df_endpoints, layer_name, layer_number=1,
+                         output=None, css_class=LINE_CSS_CLASS,
+                         style=LINE_STYLE, float_format=FLOAT_FORMAT):
     '''
     Draw lines defined by endpoint coordinates as a layer in a SVG file.
 
+    The source of all ``svg:line`` elements is formatted at once from the
+    coordinate columns and streamed directly to :data:`output` (see
+    :class:`svg_model.svg_writer.SvgStreamWriter`).  All lines share a single
+    CSS class (defined in the ``svg:defs`` element of the document), rather
+    than each line having an inline ``style`` attribute.
+
     Args:
 
         df_endpoints (pandas.DataFrame) : Each row corresponds to the endpoints
@@ -103,44 +171,51 @@ def draw_lines_svg_layer(df_endpoints, layer_name, layer_number=1):
             ``y_source``, ``x_target``, and ``y_target``.
         layer_name (str) : Name of Inkscape layer.
         layer_number (int, optional) : Z-order index of Inkscape layer.
+        output (str or file-like, optional) : Output file path or writable
+            file-like object.  By default, output is written to a new
+            in-memory file-like object.
+        css_class (str, optional) : CSS class of lines.
+        style (str, optional) : CSS style declarations of :data:`css_class`.
+        float_format (str, optional) : Format of endpoint coordinates.
 
     Returns
     -------
-    StringIO.StringIO
-        A file-like object containing SVG XML source.
+    file-like or str
+        :data:`output` or, if :data:`output` is not specified, a
+        ``StringIO.StringIO`` file-like object containing SVG XML source
+        (rewound to the start).
 
-        The XML contains a layer named ``"Connections"``, which in turn
-        contains one line per row in the input :data:`df_endpoints` table.
+        The XML contains a layer named according to :data:`layer_name`, which
+        in turn contains one line per row in the input :data:`df_endpoints`
+        table (with ``id`` of ``"line<row index>"``).
     '''
-    # Note that `svgwrite.Drawing` requires a filepath to be specified during
-    # construction, *but* nothing is actually written to the path unless one of
-    # the `save*` methods is called.
-    #
-    # In this function, we do *not* call any of the `save*` methods.  Instead,
-    # we use the `write` method to write to an in-memory file-like object.
-    dwg = svgwrite.Drawing('should_not_exist.svg', profile='tiny', debug=False)
-
-    dwg.attribs['width'] = df_endpoints[['x_source', 'x_target']].values.max()
-    dwg.attribs['height'] = df_endpoints[['y_source', 'y_target']].values.max()
-
-    nsmap = INKSCAPE_NSMAP
-
-    dwg.attribs['xmlns:inkscape'] = nsmap['inkscape']
-
     coord_columns = ['x_source', 'y_source', 'x_target', 'y_target']
-
-    line_layer = dwg.g(id='layer%d' % layer_number,
-                       **{'inkscape:label': layer_name,
-                          'inkscape:groupmode': 'layer'})
-
-    for i, (x1, y1, x2, y2) in df_endpoints[coord_columns].iterrows():
-        line_i = dwg.line((x1, y1), (x2, y2), id='line%d' % i,
-                          style='stroke:#000000; stroke-width:0.1;')
-        line_layer.add(line_i)
-    dwg.add(line_layer)
-
-    output = StringIO.StringIO()
-    dwg.write(output)
-    # Rewind file.
-    output.seek(0)
+    coordinates = df_endpoints[coord_columns].values.astype(float)
+
+    # Format all line elements at once.
+    columns = format_coordinates(coordinates, float_format).astype(object)
+    ids = np.char.mod('%s', df_endpoints.index.values).astype(object)
+    lines = ('<line class="%s" id="line' % css_class + ids +
+             '" x1="' + columns[:, 0] + '" y1="' + columns[:, 1] +
+             '" x2="' + columns[:, 2] + '" y2="' + columns[:, 3] + '" />')
+
+    if coordinates.size:
+        width = coordinates[:, [0, 2]].max()
+        height = coordinates[:, [1, 3]].max()
+    else:
+        width, height = None, None
+
+    if output is None:
+        output = StringIO.StringIO()
+        rewind = True
+    else:
+        rewind = False
+
+    with SvgStreamWriter(output, width=width, height=height,
+                         style='.%s { %s }' % (css_class, style)) as writer:
+        with writer.layer(layer_name, layer_number):
+            writer.write_lines(lines)
+
+    if rewind:
+        output.seek(0)
     return output
@@ -16,12 +16,27 @@ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
 '''
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import numpy as np
+import six
+
 from .loop import Loop
+from .transform import apply_transform
 
 
 class Path(object):
     '''
     A Path is a list of loops.
+
+    The vertices of all loops are stored in one concatenated ``(n, 2)``
+    ``float64`` array (see :attr:`points`), where the vertices of loop ``i``
+    are ``points[loop_offsets[i]:loop_offsets[i + 1]]``.  The vertex array of
+    each loop is a *view* into the concatenated array.
+
+    Bounding box, area, and centroid are computed (vectorized across all
+    loops) on first access and cached.  The cache is updated by
+    :meth:`offset` and :meth:`offset_to_origin` (and by
+    :meth:`svg_model.loop.Loop.offset` or setting the vertices of a loop);
+    call :meth:`reset_cache` after modifying vertex arrays directly.
     '''
     def __init__(self, loops):
         self.loops = []
@@ -30,52 +45,321 @@ class Path(object):
                 loop = Loop(loop)
             self.loops.append(loop)
 
+        lengths = [loop._points.shape[0] for loop in self.loops]
+        loop_offsets = np.zeros(len(lengths) + 1, dtype=int)
+        np.cumsum(lengths, out=loop_offsets[1:])
+        if self.loops:
+            points = np.concatenate([loop._points for loop in self.loops])
+        else:
+            points = np.empty((0, 2), dtype=float)
+        self._set_points(points, loop_offsets)
+
+
+    def _set_points(self, points, loop_offsets):
+        '''
+        Store loop vertices in :data:`points` (which may be a view into a
+        larger array) and point each loop at its slice of it.
+        '''
+        self._points = points
+        self._loop_offsets = loop_offsets
+        for loop, start, end in zip(self.loops, loop_offsets[:-1],
+                                    loop_offsets[1:]):
+            # Basic slice, i.e., a view (cached loop properties still apply).
+            loop._points = points[start:end]
+            loop._owner = self
+        self.reset_cache()
+
+
+    def __setstate__(self, state):
+        # Unpickled loop vertex arrays are copies, i.e., rebind each loop to a
+        # view into the (unpickled) concatenated vertex array.
+        self.__dict__.update(state)
+        self._set_points(self._points, self._loop_offsets)
+
+
+    def reset_cache(self):
+        for loop in self.loops:
+            loop._reset_cache()
+        self._bounding_box = None
+        self._loop_signed_areas = None
+        self._centroid = None
+
+
+    @property
+    def points(self):
+        '''
+        Read-only ``(n, 2)`` array of the vertices of all loops.
+        '''
+        points = self._points.view()
+        points.flags.writeable = False
+        return points
+
+
+    @property
+    def loop_offsets(self):
+        '''
+        ``(len(loops) + 1, )`` array of loop start positions in :attr:`points`
+        (the last item is the total number of vertices).
+        '''
+        return self._loop_offsets
+
+
+    def _compute_area_centroid(self):
+        # Loop index of each vertex.
+        lengths = np.diff(self._loop_offsets)
+        loop_i = np.repeat(np.arange(lengths.size), lengths)
+
+        # Index of the next vertex *within the same loop* (i.e., the last vertex
+        # of each loop wraps around to the first vertex of the loop).
+        next_i = np.arange(1, self._points.shape[0] + 1)
+        nonempty = lengths > 0
+        next_i[self._loop_offsets[1:][nonempty] - 1] = \
+            self._loop_offsets[:-1][nonempty]
+
+        x, y = self._points[:, 0], self._points[:, 1]
+        x_next, y_next = x[next_i], y[next_i]
+        factors = x_next * y - x * y_next
+
+        # Per-loop shoelace sums.
+        n_loops = lengths.size
+        self._loop_signed_areas = .5 * np.bincount(loop_i, weights=factors,
+                                                   minlength=n_loops)
+        moments_x = np.bincount(loop_i, weights=(x + x_next) * factors,
+                                minlength=n_loops) / 6.
+        moments_y = np.bincount(loop_i, weights=(y + y_next) * factors,
+                                minlength=n_loops) / 6.
+
+        # Weight each loop centroid by loop mass, i.e., `centroid * area *
+        # density`, where `centroid = moment / |signed area|`.
+        weights = (np.sign(self._loop_signed_areas) *
+                   np.array([loop.density for loop in self.loops], dtype=float))
+        if n_loops > 0:
+            area = self.get_area()
+            self._centroid = (float(np.dot(moments_x, weights)) / area,
+                              float(np.dot(moments_y, weights)) / area)
+        else:
+            self._centroid = (0, 0)
+
+
+    def get_loop_areas(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            Area of each loop.
+        '''
+        if self._loop_signed_areas is None:
+            self._compute_area_centroid()
+        return np.abs(self._loop_signed_areas)
+
 
     def get_area(self):
-        return sum(loop.get_area() for loop in self.loops)
+        return float(self.get_loop_areas().sum())
 
 
     def get_mass(self):
-        return sum(loop.get_mass() for loop in self.loops)
+        return float(np.dot(self.get_loop_areas(),
+                            [loop.density for loop in self.loops]))
+
 
     def get_center(self):
         x, y, width, height = self.get_bounding_box()
         return x + width / 2., y + height / 2.
 
     def get_centroid(self):
-        x, y = 0, 0
-        for loop in self.loops:
-            loopx, loopy = loop.get_centroid()
-            x += loopx * loop.get_mass()
-            y += loopy * loop.get_mass()
-        if len(self.loops) > 0:
-            area = self.get_area()
-            x /= area
-            y /= area
-        return (x, y)
+        if self._centroid is None:
+            self._compute_area_centroid()
+        return self._centroid
 
 
     def get_moment(self):
         return sum(loop.get_moment() for loop in self.loops)
 
 
+    def _loop_offset(self):
+        # Called after a single loop was translated in place, i.e., the
+        # bounding box and centroid are stale (loop areas are unchanged).
+        self._bounding_box = None
+        self._centroid = None
+
+
     def offset(self, x, y):
+        # Translate vertices of all loops at once (loop arrays are views).
+        self._points += (x, y)
+        self._offset_cache(x, y)
+
+
+    def _offset_cache(self, x, y):
+        # Update cached properties after the vertices were translated in place.
         for loop in self.loops:
-            loop.offset(x, y)
+            loop._offset_cache(x, y)
+        # Translation does not change the area.
+        if self._centroid is not None:
+            self._centroid = (self._centroid[0] + x, self._centroid[1] + y)
+        if self._bounding_box is not None:
+            min_x, min_y, width, height = self._bounding_box
+            self._bounding_box = (min_x + x, min_y + y, width, height)
 
 
     def offset_to_origin(self):
         x, y = self.get_centroid()
-        for loop in self.loops:
-            loop.offset(-x, -y)
+        self.offset(-x, -y)
 
     def get_bounding_box(self):
-        from itertools import chain
-        x_vals = list(chain(*[zip(*loop.verts)[0] for loop in self.loops]))
-        y_vals = list(chain(*[zip(*loop.verts)[1] for loop in self.loops]))
-        min_x, min_y = min(x_vals), min(y_vals)
-        max_x, max_y = max(x_vals), max(y_vals)
-        return (min_x, min_y, max_x - min_x, max_y - min_y)
+        if self._bounding_box is None:
+            min_x, min_y = self._points.min(axis=0).tolist()
+            max_x, max_y = self._points.max(axis=0).tolist()
+            self._bounding_box = (min_x, min_y, max_x - min_x, max_y - min_y)
+        return self._bounding_box
+
+
+def join_paths(paths):
+    '''
+    Move the vertices of all paths into one shared array, such that each
+    path (and each loop) array is a *view* into the shared array.
+
+    Parameters
+    ----------
+    paths : list
+        List of :class:`Path` instances.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(n, 2)`` array of the vertices of all paths (in order).
+    '''
+    paths = list(paths)
+    if not paths:
+        return np.empty((0, 2), dtype=float)
+    lengths = [path_i._points.shape[0] for path_i in paths]
+    points = np.concatenate([path_i._points for path_i in paths])
+    start = 0
+    for path_i, length_i in zip(paths, lengths):
+        path_i._set_points(points[start:start + length_i],
+                           path_i.loop_offsets)
+        start += length_i
+    return points
+
+
+def transform_paths(paths, matrix, points=None):
+    '''
+    Apply affine transform to the vertices of all paths as a single array
+    operation.
+
+    Parameters
+    ----------
+    paths : list
+        List of :class:`Path` instances.
+    matrix : array-like
+        ``3x3`` (or ``2x3``) affine transformation matrix, i.e., a point
+        ``(x, y)`` is mapped to ``matrix.dot([x, y, 1])``.
+
+        If the transform is a reflection (i.e., negative determinant), the
+        vertex order of each loop is reversed to preserve the (clockwise)
+        loop orientation.
+    points : numpy.ndarray, optional
+        Shared vertex array of :data:`paths`, as returned by
+        :func:`join_paths`.  If not specified, :func:`join_paths` is called.
+
+    Returns
+    -------
+    numpy.ndarray
+        Shared vertex array of :data:`paths`.
+    '''
+    paths = list(paths)
+    if points is None:
+        points = join_paths(paths)
+    matrix = np.asarray(matrix, dtype=float)
+    points[:] = apply_transform(points, matrix)
+    reflect = np.linalg.det(matrix[:2, :2]) < 0
+    for path_i in paths:
+        if reflect:
+            # A reflection flips the orientation of each loop, so reverse the
+            # vertex order of each loop (in place, i.e., loop arrays remain
+            # views) to keep loops clockwise (see :class:`Loop`).
+            offsets = path_i.loop_offsets
+            counts = np.diff(offsets)
+            loop_i = np.repeat(np.arange(counts.size), counts)
+            reverse_i = (offsets[:-1] + offsets[1:] - 1)[loop_i] - \
+                np.arange(loop_i.size)
+            path_i._points[:] = path_i._points[reverse_i]
+        path_i.reset_cache()
+    return points
+
+
+class PathCollection(object):
+    '''
+    Base class for collections of paths, i.e., objects with a :attr:`paths`
+    dictionary of :class:`Path` instances.
+
+    Provides bulk geometry operations (see :meth:`apply_affine`,
+    :meth:`translate`, and :meth:`scale`), which act on one vertex array
+    shared by all paths (see :meth:`get_points`).
+    '''
+    _points = None
+
+    def _iter_paths(self):
+        return six.itervalues(self.paths)
+
+    def _paths_transformed(self):
+        '''
+        Called after the vertices of the paths have been transformed.
+        '''
+        pass
+
+    def get_points(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            ``(n, 2)`` array of the vertices of all paths.  The vertex arrays
+            of the paths are *views* into this array.
+        '''
+        paths = list(self._iter_paths())
+        points = self._points
+        # Rebuild the shared array if paths were added/replaced since it was
+        # created.
+        if (points is None or
+            any(path_i._points.base is not points for path_i in paths) or
+            sum(path_i._points.shape[0] for path_i in paths) !=
+                points.shape[0]):
+            points = self._points = join_paths(paths)
+        return points
+
+    def apply_affine(self, matrix):
+        '''
+        Transform the vertices of all paths in place.
+
+        Parameters
+        ----------
+        matrix : array-like
+            ``3x3`` (or ``2x3``) affine transformation matrix, i.e., a point
+            ``(x, y)`` is mapped to ``matrix.dot([x, y, 1])``.
+        '''
+        transform_paths(self._iter_paths(), matrix, self.get_points())
+        self._paths_transformed()
+
+    def translate(self, x, y):
+        '''
+        Translate the vertices of all paths in place.
+        '''
+        points = self.get_points()
+        points += (x, y)
+        # Translation does not change the area (i.e., shift cached values).
+        for path_i in self._iter_paths():
+            path_i._offset_cache(x, y)
+        self._paths_transformed()
+
+    def scale(self, scale_x, scale_y=None):
+        '''
+        Scale the vertices of all paths in place (relative to the origin).
+
+        If :data:`scale_y` is not specified, :data:`scale_x` is used for both
+        axes.
+        '''
+        if scale_y is None:
+            scale_y = scale_x
+        self.apply_affine([[scale_x, 0, 0], [0, scale_y, 0]])
 
 
 class ColoredPath(Path):
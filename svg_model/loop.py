@@ -18,17 +18,85 @@ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
 
 
 from __future__ import unicode_literals
-from six.moves import range
+import numpy as np
+
+
 class Loop(object):
+    '''
+    Closed loop of vertices, stored as a contiguous ``(n, 2)`` ``float64``
+    array.
+
+    Signed area and centroid are computed (vectorized) on first access and
+    cached until the vertices are modified (i.e., through :attr:`verts`,
+    :attr:`points`, or :meth:`offset`).
+
+    The vertices of a loop of a :class:`svg_model.geo_path.Path` are a *view*
+    into the vertex array of the path, i.e., setting :attr:`points` (or
+    :attr:`verts`) writes the new vertices into the view, and the number of
+    vertices may not change.
+    '''
+    __slots__ = ('_points', '_signed_area', '_centroid', '_owner')
 
     density = 1
 
     def __init__(self, verts=None):
         if verts is None:
             verts = []
-        self.verts = verts
+        # Path whose vertex array `_points` is a view into (if any).
+        self._owner = None
+        self.points = verts
         if not self.is_clockwise():
-            self.verts.reverse()
+            self._points = np.ascontiguousarray(self._points[::-1])
+            self._signed_area = -self._signed_area
+
+
+    @property
+    def points(self):
+        '''
+        Read-only ``(n, 2)`` array of vertex coordinates.
+        '''
+        points = self._points.view()
+        points.flags.writeable = False
+        return points
+
+    @points.setter
+    def points(self, points):
+        points = np.array(points, dtype=float).reshape(-1, 2)
+        if self._owner is None:
+            self._points = points
+            self._reset_cache()
+        elif points.shape != self._points.shape:
+            raise ValueError('Number of vertices of a path loop may not '
+                             'change (%d != %d).' % (points.shape[0],
+                                                     self._points.shape[0]))
+        else:
+            # Keep vertex array of loop a view into the vertex array of the
+            # path.
+            self._points[:] = points
+            self._owner.reset_cache()
+
+
+    def _reset_cache(self):
+        self._signed_area = None
+        self._centroid = None
+
+
+    @property
+    def verts(self):
+        '''
+        List of ``(x, y)`` vertex tuples.
+        '''
+        return [tuple(v) for v in self._points.tolist()]
+
+    @verts.setter
+    def verts(self, verts):
+        self.points = verts
+
+
+    def _shoelace_factors(self):
+        x, y = self._points[:, 0], self._points[:, 1]
+        x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+        return x, y, x_next, y_next, x_next * y - x * y_next
 
 
     def get_signed_area(self):
@@ -37,13 +105,10 @@ class Loop(object):
         If verts wind anti-clockwise, this returns a negative number.
         Assume y-axis points up.
         """
-        accum = 0.0
-        for i in range(len(self.verts)):
-            j = (i + 1) % len(self.verts)
-            accum += (
-                self.verts[j][0] * self.verts[i][1] -
-                self.verts[i][0] * self.verts[j][1])
-        return accum / 2
+        if self._signed_area is None:
+            factors = self._shoelace_factors()[-1]
+            self._signed_area = float(factors.sum()) / 2
+        return self._signed_area
 
 
     def get_area(self):
@@ -66,18 +131,14 @@ class Loop(object):
 
 
     def get_centroid(self):
-        x, y = 0, 0
-        for i in range(len(self.verts)):
-            j = (i + 1) % len(self.verts)
-            factor = (
-                self.verts[j][0] * self.verts[i][1] -
-                self.verts[i][0] * self.verts[j][1])
-            x += (self.verts[i][0] + self.verts[j][0]) * factor
-            y += (self.verts[i][1] + self.verts[j][1]) * factor
-        polyarea = self.get_area()
-        x /= 6 * polyarea
-        y /= 6 * polyarea
-        return (x, y)
+        if self._centroid is None:
+            x, y, x_next, y_next, factors = self._shoelace_factors()
+            polyarea = self.get_area()
+            self._centroid = (float(np.dot(x + x_next, factors)) /
+                              (6 * polyarea),
+                              float(np.dot(y + y_next, factors)) /
+                              (6 * polyarea))
+        return self._centroid
 
 
     #def get_moment(self):
@@ -85,10 +146,17 @@ class Loop(object):
 
 
     def offset(self, x, y):
-        self.verts = [
-            (self.verts[i][0] + x, self.verts[i][1] + y)
-            for i in range(len(self.verts))
-        ]
+        self._points += (x, y)
+        self._offset_cache(x, y)
+        if self._owner is not None:
+            self._owner._loop_offset()
+
+
+    def _offset_cache(self, x, y):
+        # Update cached properties after the vertices were translated in place
+        # (translation does not change the area).
+        if self._centroid is not None:
+            self._centroid = (self._centroid[0] + x, self._centroid[1] + y)
 
 
     #def get_shape(self, body):
@@ -96,4 +164,3 @@ class Loop(object):
         #shape.elasticity = 0.5
         #shape.friction = 10.0
         #return shape
-
@@ -0,0 +1,105 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from collections import OrderedDict
+
+import numpy as np
+
+from .tesselate import tesselate_shapes_arrays
+
+
+class TriangleMesh(object):
+    '''
+    Indexed triangle mesh, i.e., a deduplicated vertex buffer and an index
+    buffer with three vertex indices per triangle (compatible with, e.g.,
+    ``GL_TRIANGLES`` indexed primitives).
+
+    All buffers are C-contiguous :class:`numpy.ndarray` instances and may be
+    exported without copying through the buffer protocol (see
+    :meth:`buffers`).
+
+    Attributes
+    ----------
+    vertices : numpy.ndarray
+        ``(n_vertices, 2)`` array of ``float64`` vertex coordinates.
+    indices : numpy.ndarray
+        ``(n_triangles, 3)`` array of ``int32`` indices into :attr:`vertices`.
+    shape_ids : numpy.ndarray
+        ``(n_triangles, )`` array of ``int32`` shape codes, i.e., positions
+        in :attr:`shape_index`.
+    shape_index : pandas.Index
+        Shape keys.
+    '''
+    def __init__(self, vertices, indices, shape_ids, shape_index):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+        self.shape_ids = np.ascontiguousarray(shape_ids, dtype=np.int32)
+        self.shape_index = shape_index
+
+    @classmethod
+    def from_triangles(cls, triangles, shape_codes, shape_index):
+        '''
+        Create mesh from the columnar output of
+        :func:`svg_model.tesselate.tesselate_shapes_arrays`.
+
+        Vertices shared by multiple triangles (including triangles of
+        different shapes) are stored once.
+        '''
+        triangles = np.asarray(triangles, dtype=np.float64)
+        points = triangles.reshape(-1, 2)
+        if points.shape[0]:
+            vertices, inverse = np.unique(points, axis=0, return_inverse=True)
+        else:
+            vertices, inverse = points, np.empty(0, dtype=np.int32)
+        return cls(vertices, inverse.reshape(-1, 3), shape_codes, shape_index)
+
+    @classmethod
+    def from_shapes_frame(cls, df_shapes, shape_i_columns):
+        '''
+        Tesselate shapes from a table of shape vertices (one row per vertex)
+        and create mesh.
+
+        See :func:`svg_model.tesselate.tesselate_shapes_arrays`.
+        '''
+        return cls.from_triangles(*tesselate_shapes_arrays(df_shapes,
+                                                           shape_i_columns))
+
+    @property
+    def triangles(self):
+        '''
+        ``(n_triangles, 3, 2)`` array of triangle vertex coordinates (*not*
+        indexed, i.e., a new array).
+        '''
+        return self.vertices[self.indices]
+
+    @property
+    def shape_keys(self):
+        '''
+        Shape key of each triangle.
+        '''
+        return self.shape_index[self.shape_ids]
+
+    def buffers(self):
+        '''
+        Returns
+        -------
+        collections.OrderedDict
+            Read-only :class:`memoryview` of the ``vertices``, ``indices`` and
+            ``shape_ids`` buffers (in that order).
+
+            No data is copied.
+        '''
+        buffers = OrderedDict()
+        for name_i in ('vertices', 'indices', 'shape_ids'):
+            array_i = getattr(self, name_i).view()
+            array_i.flags.writeable = False
+            buffers[name_i] = memoryview(array_i)
+        return buffers
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+    def __repr__(self):
+        return ('<%s vertices=%d triangles=%d shapes=%d>' %
+                (self.__class__.__name__, self.vertices.shape[0],
+                 self.indices.shape[0], len(self.shape_index)))
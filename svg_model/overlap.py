@@ -0,0 +1,161 @@
+# coding: utf-8
+'''
+Detection of overlapping shapes, e.g., to validate a device design before
+fabrication.
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import numpy as np
+import pandas as pd
+
+from .segments import (_cross, iter_segment_pairs, points_in_polygons,
+                       polygon_segments, segments_intersect)
+from .spatial_index import BoundingBoxIndex
+
+#: Relative offset of boundary sample points from the boundary.
+BOUNDARY_EPSILON = 1e-7
+
+
+def find_overlapping_shapes(df_shapes, shape_i_column, min_area=0):
+    '''
+    Find pairs of shapes with overlapping interiors (shapes that only touch
+    along their outlines do not overlap).
+
+    Candidate pairs are found using a bounding box sweep (see
+    :class:`svg_model.spatial_index.BoundingBoxIndex`).  For each candidate
+    pair, the outline of each shape is split at the intersections with the
+    outline of the other shape, and each resulting piece is classified as
+    inside or outside of the other shape.  The overlap area is then computed
+    from the pieces bounding the intersection (Green's theorem).  All steps
+    are vectorized across candidate pairs.
+
+    Parameters
+    ----------
+    df_shapes : pandas.DataFrame
+        Table of polygon shape vertices (one row per vertex).  Shapes must be
+        simple polygons (i.e., not self-intersecting).
+    shape_i_column : str or list
+        Column name(s) that identify the polygon each row belongs to.
+    min_area : float, optional
+        Minimum overlap area.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Frame containing the columns ``source``, ``target``, and ``area`` (the
+        overlap area), with one row per pair of overlapping shapes.
+    '''
+    columns = ['source', 'target', 'area']
+    shape_rows = df_shapes.groupby(shape_i_column).indices
+    if not shape_rows:
+        return pd.DataFrame(None, columns=columns)
+    shape_keys = np.empty(len(shape_rows), dtype=object)
+    shape_keys[:] = sorted(shape_rows)
+    rows = [shape_rows[key] for key in shape_keys]
+    counts = np.array([rows_i.size for rows_i in rows])
+    points = df_shapes[['x', 'y']].values[np.concatenate(rows)].astype(float)
+
+    # Broad phase: pairs of shapes with overlapping bounding boxes.
+    starts = np.cumsum(counts) - counts
+    bboxes = np.column_stack([np.minimum.reduceat(points, starts, axis=0),
+                              np.maximum.reduceat(points, starts, axis=0)])
+    i, j = BoundingBoxIndex(bboxes).pairs()
+
+    # Boundary segments of each shape, oriented counter-clockwise (i.e., the
+    # interior is on the left of each segment).
+    p0, p1, segment_counts = polygon_segments(points, counts)
+    segment_shape = np.repeat(np.arange(counts.size), segment_counts)
+    signed_areas = .5 * np.bincount(segment_shape, weights=_cross(p0, p1),
+                                    minlength=counts.size)
+    clockwise = signed_areas[segment_shape] < 0
+    p0, p1 = p0.copy(), p1.copy()
+    p0[clockwise], p1[clockwise] = p1[clockwise], p0[clockwise].copy()
+
+    # Split parameters `(pair, segment, t)` at intersections of segments of
+    # each candidate pair.
+    split_pairs, split_segments, split_ts = [], [], []
+    for pair_k, a, b in iter_segment_pairs(segment_counts, i, j):
+        hit = segments_intersect(p0[a], p1[a], p0[b], p1[b])
+        pair_k, a, b = pair_k[hit], a[hit], b[hit]
+        a0, a1, b0, b1 = p0[a], p1[a], p0[b], p1[b]
+        da, db = a1 - a0, b1 - b0
+        denominator = _cross(da, db)
+        crossing = denominator != 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_a = _cross(b0 - a0, db) / denominator
+            t_b = _cross(b0 - a0, da) / denominator
+            # Collinear overlap: split each segment at end points of other
+            # segment.
+            t_a0 = ((b0 - a0) * da).sum(axis=1) / (da * da).sum(axis=1)
+            t_a1 = ((b1 - a0) * da).sum(axis=1) / (da * da).sum(axis=1)
+            t_b0 = ((a0 - b0) * db).sum(axis=1) / (db * db).sum(axis=1)
+            t_b1 = ((a1 - b0) * db).sum(axis=1) / (db * db).sum(axis=1)
+        collinear = ~crossing
+        split_pairs += [pair_k[crossing], pair_k[crossing],
+                        pair_k[collinear], pair_k[collinear],
+                        pair_k[collinear], pair_k[collinear]]
+        split_segments += [a[crossing], b[crossing], a[collinear],
+                           a[collinear], b[collinear], b[collinear]]
+        split_ts += [t_a[crossing], t_b[crossing], t_a0[collinear],
+                     t_a1[collinear], t_b0[collinear], t_b1[collinear]]
+
+    # Split parameters `t = 0` and `t = 1` of every segment of each pair.
+    segment_starts = np.cumsum(segment_counts) - segment_counts
+    for shape_i in (i, j):
+        counts_i = segment_counts[shape_i]
+        pair_k = np.repeat(np.arange(i.size), counts_i)
+        segments_i = (np.repeat(segment_starts[shape_i], counts_i) +
+                      np.arange(counts_i.sum()) -
+                      np.repeat(np.cumsum(counts_i) - counts_i, counts_i))
+        split_pairs += [pair_k, pair_k]
+        split_segments += [segments_i, segments_i]
+        split_ts += [np.zeros(segments_i.size), np.ones(segments_i.size)]
+
+    split_pairs = np.concatenate(split_pairs)
+    split_segments = np.concatenate(split_segments)
+    split_ts = np.clip(np.concatenate(split_ts), 0, 1)
+
+    # Pieces between consecutive split parameters of each segment of each
+    # pair.
+    order = np.lexsort((split_ts, split_segments, split_pairs))
+    split_pairs = split_pairs[order]
+    split_segments = split_segments[order]
+    split_ts = split_ts[order]
+    piece = ((split_pairs[:-1] == split_pairs[1:]) &
+             (split_segments[:-1] == split_segments[1:]) &
+             (split_ts[:-1] < split_ts[1:]))
+    piece_pairs = split_pairs[:-1][piece]
+    piece_segments = split_segments[:-1][piece]
+    t0 = split_ts[:-1][piece][:, None]
+    t1 = split_ts[1:][piece][:, None]
+    delta = p1[piece_segments] - p0[piece_segments]
+    q0 = p0[piece_segments] + t0 * delta
+    q1 = p0[piece_segments] + t1 * delta
+
+    # Classify each piece using sample points just left (inside own shape)
+    # and just right of the piece midpoint.
+    from_i = segment_shape[piece_segments] == i[piece_pairs]
+    other = np.where(from_i, j[piece_pairs], i[piece_pairs])
+    midpoints = .5 * (q0 + q1)
+    lengths = np.hypot(delta[:, 0], delta[:, 1])[:, None]
+    normals = np.column_stack([-delta[:, 1], delta[:, 0]]) / lengths
+    epsilon = BOUNDARY_EPSILON * max(np.abs(points).max(), 1)
+    left_inside = points_in_polygons(midpoints + epsilon * normals, other,
+                                     p0, p1, segment_counts)
+    right_inside = points_in_polygons(midpoints - epsilon * normals, other,
+                                      p0, p1, segment_counts)
+    # Pieces of the outline of the overlap region (pieces shared by both
+    # outlines are counted once, i.e., from shape `i`).
+    bounding = np.where(from_i, left_inside, left_inside & right_inside)
+
+    areas = .5 * np.bincount(piece_pairs, weights=_cross(q0, q1) * bounding,
+                             minlength=i.size)
+    # Ignore round-off for pairs only touching along outlines.
+    tolerance = epsilon * np.sqrt(np.minimum(np.abs(signed_areas[i]),
+                                             np.abs(signed_areas[j])))
+    overlapping = (areas > tolerance) & (areas > min_area)
+    return pd.DataFrame({'source': shape_keys[i[overlapping]],
+                         'target': shape_keys[j[overlapping]],
+                         'area': areas[overlapping]}, columns=columns)
@@ -15,27 +15,149 @@ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
 '''
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from .svgload.svg_parser import SvgParser
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+import time
 
+from lxml import etree
+from path_helpers import path
 
-class PathGroup(object):
+from .curves import CURVE_TOLERANCE
+from .geo_path import PathCollection
+from .svgload.svg_parser import SvgParser, SvgParseError
+
+
+class PathGroup(PathCollection):
+    '''
+    Group of paths with a boundary path.
+
+    The vertices of all paths (including the boundary) may be transformed at
+    once using :meth:`apply_affine`, :meth:`translate`, or :meth:`scale`.
+    '''
     def __init__(self, paths, boundary):
         self.paths = paths
         self._boundary = boundary
         self._bounding_box = self._boundary.get_bounding_box()
 
+    def _iter_paths(self):
+        for path_i in self.paths.values():
+            yield path_i
+        if not any(path_i is self._boundary for path_i in self.paths.values()):
+            yield self._boundary
+
+    def _paths_transformed(self):
+        self._bounding_box = self._boundary.get_bounding_box()
+
+    @classmethod
+    def from_svg(cls, svg):
+        paths = svg.paths
+        if not paths:
+            raise Exception("File has no valid paths.")
+        return cls(paths, svg.get_boundary())
+
     @classmethod
     def load_svg(cls, svg_path, on_error=None):
         # Parse SVG file.
         parser = SvgParser()
         svg = parser.parse_file(svg_path, on_error)
-        paths = svg.paths
-        if not paths:
-            raise Exception("File has no valid paths.")
-        boundary = svg.get_boundary()
-        del svg
-        del parser
-        return PathGroup(paths, boundary)
+        return cls.from_svg(svg)
 
     def get_bounding_box(self):
         return self._bounding_box
+
+
+def _load_svg(args):
+    '''
+    Load path group from SVG file (in a worker process/thread).
+
+    Returns
+    -------
+    (path_group, duration, errors) : (PathGroup, float, list)
+        Path group, parse duration (in seconds), and list of ``(tag_path,
+        message)`` tuples, where ``tag_path`` is the XPath of each path tag
+        that could not be parsed (element objects cannot be passed between
+        processes).
+    '''
+    svg_path, tolerance = args
+    start = time.time()
+    errors = []
+
+    def _on_error(filename, tag, message):
+        errors.append((tag.getroottree().getpath(tag), message))
+
+    svg = SvgParser(tolerance).parse_file(svg_path, _on_error)
+    return PathGroup.from_svg(svg), time.time() - start, errors
+
+
+def load_many(svg_paths, workers=None, pool='process', on_error=None,
+              tolerance=CURVE_TOLERANCE):
+    '''
+    Load path groups from multiple SVG files in parallel.
+
+    Parameters
+    ----------
+    svg_paths : list
+        SVG file paths.
+    workers : int, optional
+        Number of worker processes/threads (default: number of CPUs).  If
+        one, files are loaded sequentially in the calling thread.
+    pool : str, optional
+        ``'process'`` to parse files in a process pool, or ``'thread'`` to
+        parse files in a thread pool (:mod:`lxml` releases the GIL while
+        parsing, and no results need to be transferred between processes).
+    on_error : function, optional
+        Callback to call for each path tag that could not be parsed, with the
+        same arguments as for :meth:`SvgParser.parse`, i.e., ``(<svg
+        filename>, <path_tag>, <error message>)``.  Callbacks are called in
+        the calling process, in input order.
+
+        If not set, a :class:`SvgParseError` is raised for the first path tag
+        that could not be parsed.
+    tolerance : float, optional
+        Maximum distance between curves and the line segments they are
+        flattened to.
+
+    Returns
+    -------
+    (path_groups, durations) : (list, list)
+        :class:`PathGroup` and parse duration (in seconds) of each file, in
+        input order.
+    '''
+    svg_paths = list(svg_paths)
+    if workers is None:
+        workers = cpu_count()
+    workers = max(1, min(workers, len(svg_paths)))
+    args = [(svg_path_i, tolerance) for svg_path_i in svg_paths]
+
+    if workers == 1:
+        results = list(map(_load_svg, args))
+    else:
+        if pool == 'process':
+            worker_pool = Pool(workers)
+        elif pool == 'thread':
+            worker_pool = ThreadPool(workers)
+        else:
+            raise ValueError('Unsupported pool: %s' % pool)
+        try:
+            results = worker_pool.map(_load_svg, args)
+        finally:
+            worker_pool.close()
+            worker_pool.join()
+
+    path_groups = []
+    durations = []
+    for svg_path_i, (path_group_i, duration_i, errors_i) in zip(svg_paths,
+                                                                 results):
+        if errors_i:
+            # Resolve path tags of errors from (re-parsed) source document.
+            filename = path(svg_path_i)
+            xml_root = etree.parse(filename)
+            for tag_path, message in errors_i:
+                args_i = (filename, xml_root.xpath(tag_path)[0], message)
+                if on_error:
+                    on_error(*args_i)
+                else:
+                    raise SvgParseError(*args_i)
+        path_groups.append(path_group_i)
+        durations.append(duration_i)
+    return path_groups, durations
@@ -1,13 +1,28 @@
 # coding: utf-8
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from collections import OrderedDict
 import itertools
 import types
 
+import numpy as np
 import pandas as pd
 import pymunk as pm
 from six.moves import zip
 
+from .tesselate import tesselate_shape
+
+
+def _static_body():
+    if hasattr(pm.Body, 'STATIC'):
+        # Assume `pymunk>=5.0`, where static bodies must be declared
+        # explicitly.
+        return pm.Body(body_type=pm.Body.STATIC)
+    else:
+        # Assume `pymunk<5.0`, where bodies are static unless otherwise
+        # specified.
+        return pm.Body()
+
 
 def get_shapes_pymunk_space(df_convex_shapes, shape_i_columns):
     '''
@@ -34,14 +49,7 @@ def get_shapes_pymunk_space(df_convex_shapes, shape_i_columns):
         if not isinstance(shape_i, (list, tuple)):
             shape_i = [shape_i]
 
-        if hasattr(pm.Body, 'STATIC'):
-            # Assume `pymunk>=5.0`, where static bodies must be declared
-            # explicitly.
-            body = pm.Body(body_type=pm.Body.STATIC)
-        else:
-            # Assume `pymunk<5.0`, where bodies are static unless otherwise
-            # specified.
-            body = pm.Body()
+        body = _static_body()
         # Using the code below is about 66% faster than:
         #     `df_i[['x', 'y']].values`.
         points = [[x, y] for x, y in zip(df_i.x, df_i.y)]
@@ -52,3 +60,143 @@ def get_shapes_pymunk_space(df_convex_shapes, shape_i_columns):
     return space, (pd.DataFrame(bodies, columns=['body',
                                                  shape_i_columns[0]])
                    .set_index('body')[shape_i_columns[0]])
+
+
+
+class PymunkShapeIndex(object):
+    '''
+    Point location index backed by a `pymunk.Space`, with one static body per
+    convex (e.g., triangle) part of each shape.
+
+    Shapes may be added, replaced, or removed individually, i.e., without
+    rebuilding the `Space`.
+    '''
+    def __init__(self):
+        self.space = pm.Space()
+        # Map each `pymunk.Body` to the corresponding shape key.
+        self.bodies = OrderedDict()
+        # Map each `pymunk.Body` to the vertices of its triangle.
+        self.body_triangles = {}
+        # Map each shape key to list of `(body, poly)` tuples.
+        self.shape_polys = OrderedDict()
+
+    @classmethod
+    def from_triangles(cls, triangles, shape_codes, shape_index):
+        '''
+        Create index from the columnar output of
+        :func:`svg_model.tesselate.tesselate_shapes_arrays`.
+        '''
+        index = cls()
+        # Codes are sorted, so the triangles of each shape are contiguous.
+        bounds = np.searchsorted(shape_codes, np.arange(len(shape_index) + 1))
+        for i, shape_key in enumerate(shape_index):
+            index.add_shape(shape_key, None,
+                            triangles[bounds[i]:bounds[i + 1]])
+        return index
+
+    def add_shape(self, shape_key, vertices, triangles=None):
+        '''
+        Add convex parts of shape to index, replacing any existing parts of
+        the shape.
+
+        Parameters
+        ----------
+        shape_key
+            Shape identifier (returned by :meth:`find_shape`).
+        vertices : numpy.ndarray
+            ``(n, 2)`` array of shape vertex coordinates.  Only used if
+            :data:`triangles` is not specified.
+        triangles : numpy.ndarray, optional
+            ``(n_triangles, 3, 2)`` array of triangle vertex coordinates.
+
+            If not specified, :data:`vertices` are tesselated.
+        '''
+        if triangles is None:
+            triangles = tesselate_shape(vertices)
+        self.remove_shape(shape_key)
+        polys = []
+        for triangle_i in np.asarray(triangles).tolist():
+            body = _static_body()
+            poly = pm.Poly(body, triangle_i)
+            self.space.add(poly)
+            self.bodies[body] = shape_key
+            self.body_triangles[body] = triangle_i
+            polys.append((body, poly))
+        self.shape_polys[shape_key] = polys
+
+    def remove_shape(self, shape_key):
+        '''
+        Remove all convex parts of shape from index (if present).
+        '''
+        for body, poly in self.shape_polys.pop(shape_key, []):
+            self.space.remove(poly)
+            del self.bodies[body]
+            del self.body_triangles[body]
+
+    def find_shape(self, x, y):
+        '''
+        Returns
+        -------
+        object
+            Key of shape containing point ``(x, y)``, or ``None`` if no shape
+            contains the point.
+        '''
+        if hasattr(self.space, 'point_query_first'):
+            # Assume `pymunk<5.0`.
+            shape = self.space.point_query_first((x, y))
+        else:
+            # Assume `pymunk>=5.0`, where `point_query_first` method has been
+            # deprecated.
+            info = self.space.point_query_nearest((x, y), 0,
+                                                  [pm.ShapeFilter
+                                                   .ALL_CATEGORIES])
+            shape = info.shape if info else None
+
+        if shape:
+            return self.bodies[shape.body]
+        # Points exactly on the boundary of a triangle (e.g., the center of a
+        # rectangle, which lies on the diagonal shared by its two triangles)
+        # may be missed by `pymunk`, so test the triangles with bounding boxes
+        # containing the point exactly.
+        return self._find_shape_exact(x, y)
+
+    def _find_shape_exact(self, x, y):
+        bb = pm.BB(x, y, x, y)
+        if hasattr(pm, 'ShapeFilter'):
+            # Assume `pymunk>=5.0`.
+            shapes = self.space.bb_query(bb, pm.ShapeFilter())
+        else:
+            shapes = self.space.bb_query(bb)
+        for shape in shapes:
+            (ax, ay), (bx, by), (cx, cy) = self.body_triangles[shape.body]
+            # Orientation of point relative to each triangle edge (zero on
+            # the edge).
+            sides = [(bx - ax) * (y - ay) - (by - ay) * (x - ax),
+                     (cx - bx) * (y - by) - (cy - by) * (x - bx),
+                     (ax - cx) * (y - cy) - (ay - cy) * (x - cx)]
+            if min(sides) >= 0 or max(sides) <= 0:
+                return self.bodies[shape.body]
+        return None
+
+
+def get_triangles_pymunk_space(triangles, shape_codes, shape_index):
+    '''
+    Return two-ple containing:
+
+     - A `pymunk.Space` instance, with one convex polygon per triangle.
+     - A `pandas.Series` mapping each `pymunk.Body` object in the `Space` to a
+       shape key.
+
+    Triangles are read directly from the columnar output of
+    :func:`svg_model.tesselate.tesselate_shapes_arrays`, i.e., *without*
+    grouping a tesselation table.
+
+    See :class:`PymunkShapeIndex` for an index that supports adding and
+    removing shapes individually.
+    '''
+    index = PymunkShapeIndex.from_triangles(triangles, shape_codes,
+                                            shape_index)
+    return index.space, pd.Series(list(index.bodies.values()),
+                                  index=pd.Index(list(index.bodies),
+                                                 name='body'),
+                                  name=shape_index.names[0])
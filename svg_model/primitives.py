@@ -0,0 +1,311 @@
+# coding: utf-8
+'''
+Analytic SVG primitive shapes (i.e., ``svg:rect``, ``svg:circle``, and
+``svg:ellipse``).
+
+Each primitive is represented as a (possibly transformed) *rounded rectangle*
+with center ``(cx, cy)``, half-size ``(a, b)`` and corner radii ``(rx,
+ry)``, where a circle/ellipse is a rounded rectangle with corner radii equal
+to its half-size.  Area, centroid, bounding box, and point-in-shape tests are
+computed analytically (vectorized across all shapes), i.e., primitives are
+only polygonized if vertices are explicitly requested (see
+:meth:`PrimitiveShapes.get_polygons`).
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+import re
+
+import numpy as np
+
+from .curves import CURVE_TOLERANCE, MAX_CURVE_SEGMENTS
+from .svgload.path_parser import cre_path_number
+
+#: Local names of primitive shape elements.
+PRIMITIVE_TAGS = ('rect', 'circle', 'ellipse')
+
+cre_length = re.compile(r'\s*' + cre_path_number.pattern)
+
+
+def _length(element, name):
+    # Numeric part of length attribute (units are ignored).
+    match = cre_length.match(element.get(name, ''))
+    return float(match.group()) if match else None
+
+
+def primitive_parameters(element):
+    '''
+    Parameters
+    ----------
+    element : lxml.etree._Element
+        ``svg:rect``, ``svg:circle``, or ``svg:ellipse`` element.
+
+    Returns
+    -------
+    tuple or None
+        ``(cx, cy, a, b, rx, ry)`` rounded rectangle parameters (see
+        :mod:`svg_model.primitives`), or ``None`` if the shape is not
+        rendered (e.g., zero width or radius).
+    '''
+    tag = element.tag.rsplit('}', 1)[-1]
+    if tag == 'rect':
+        x, y = (_length(element, k) or 0 for k in ('x', 'y'))
+        width, height = (_length(element, k) or 0
+                         for k in ('width', 'height'))
+        rx, ry = _length(element, 'rx'), _length(element, 'ry')
+        # A missing corner radius defaults to the other radius.
+        rx = ry if rx is None else rx
+        ry = rx if ry is None else ry
+        a, b = .5 * width, .5 * height
+        params = (x + a, y + b, a, b, min(abs(rx or 0), a),
+                  min(abs(ry or 0), b))
+    elif tag == 'circle':
+        r = _length(element, 'r') or 0
+        params = ((_length(element, 'cx') or 0), (_length(element, 'cy') or 0),
+                  r, r, r, r)
+    elif tag == 'ellipse':
+        rx, ry = (_length(element, k) or 0 for k in ('rx', 'ry'))
+        params = ((_length(element, 'cx') or 0), (_length(element, 'cy') or 0),
+                  rx, ry, rx, ry)
+    else:
+        raise ValueError('Unsupported primitive tag: %s' % element.tag)
+    if params[2] <= 0 or params[3] <= 0:
+        return None
+    return params
+
+
+class PrimitiveShapes(object):
+    '''
+    Collection of analytic primitive shapes.
+
+    Parameters
+    ----------
+    ids : list
+        Identifier of each shape.
+    params : numpy.ndarray
+        ``(n, 6)`` array of ``(cx, cy, a, b, rx, ry)`` rounded rectangle
+        parameters of each shape (see :func:`primitive_parameters`).
+    transforms : numpy.ndarray, optional
+        ``(n, 3, 3)`` array of affine transforms (shape to document
+        coordinates) of each shape.
+    '''
+    def __init__(self, ids, params, transforms=None):
+        self.ids = list(ids)
+        self.params = np.asarray(params, dtype=float).reshape(-1, 6)
+        if transforms is None:
+            transforms = np.tile(np.identity(3), (self.params.shape[0], 1, 1))
+        self.transforms = np.asarray(transforms,
+                                     dtype=float).reshape(-1, 3, 3)
+
+    def __len__(self):
+        return self.params.shape[0]
+
+    @classmethod
+    def from_shapes(cls, shapes):
+        '''
+        Parameters
+        ----------
+        shapes : list
+            List of ``(element, transform)`` tuples (or
+            :class:`svg_model.svgload.walk.ShapeElement` instances), where
+            ``transform`` is a ``3x3`` matrix or ``None``.  Elements that are
+            not primitives, or not rendered, are skipped.
+        '''
+        ids, params, transforms = [], [], []
+        for shape in shapes:
+            element, transform = shape[:2]
+            if element.tag.rsplit('}', 1)[-1] not in PRIMITIVE_TAGS:
+                continue
+            params_i = primitive_parameters(element)
+            if params_i is None:
+                continue
+            ids.append(element.get('id'))
+            params.append(params_i)
+            transforms.append(np.identity(3) if transform is None
+                              else transform)
+        return cls(ids, params, transforms if transforms else None)
+
+    @classmethod
+    def from_svg(cls, svg_source):
+        '''
+        Load all primitive shapes (at any depth) from SVG document.
+
+        Parameters
+        ----------
+        svg_source : str or file-like
+            A file path, URI, or file-like object.
+        '''
+        from lxml import etree
+        from .svgload.walk import iter_shapes
+
+        return cls.from_shapes(iter_shapes(etree.parse(svg_source),
+                                           PRIMITIVE_TAGS))
+
+    def get_areas(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            Area of each shape (in document coordinates).
+        '''
+        cx, cy, a, b, rx, ry = self.params.T
+        determinants = np.linalg.det(self.transforms[:, :2, :2])
+        return (4 * a * b - (4 - np.pi) * rx * ry) * np.abs(determinants)
+
+    def get_centroids(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            ``(n, 2)`` array of centroid of each shape (the center, since
+            primitives are symmetric).
+        '''
+        return (np.einsum('nij,nj->ni', self.transforms[:, :2, :2],
+                          self.params[:, :2]) + self.transforms[:, :2, 2])
+
+    def get_bounding_boxes(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            ``(n, 4)`` array of ``(x_min, y_min, x_max, y_max)`` bounding box
+            of each shape (in document coordinates).
+        '''
+        cx, cy, a, b, rx, ry = self.params.T
+        m = self.transforms[:, :2, :2]
+        # Half-extent of the transformed inner rectangle (i.e., between
+        # corner arc centers) plus half-extent of the transformed corner
+        # ellipse.
+        half_extents = (np.abs(m[:, :, 0]) * (a - rx)[:, None] +
+                        np.abs(m[:, :, 1]) * (b - ry)[:, None] +
+                        np.hypot(m[:, :, 0] * rx[:, None],
+                                 m[:, :, 1] * ry[:, None]))
+        centers = self.get_centroids()
+        return np.column_stack([centers - half_extents,
+                                centers + half_extents])
+
+    def contains(self, points, shape_i):
+        '''
+        Test whether points are inside shapes.
+
+        Parameters
+        ----------
+        points : numpy.ndarray
+            ``(m, 2)`` array of points (in document coordinates).
+        shape_i : numpy.ndarray
+            Position of shape to test each point against.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``True`` for each point inside (or on the boundary of) the
+            corresponding shape.
+        '''
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        shape_i = np.asarray(shape_i, dtype=int)
+        # Map points to shape coordinates.
+        inverse = np.linalg.inv(self.transforms[shape_i])
+        local = (np.einsum('nij,nj->ni', inverse[:, :2, :2], points) +
+                 inverse[:, :2, 2])
+        cx, cy, a, b, rx, ry = self.params[shape_i].T
+        dx, dy = np.abs(local[:, 0] - cx), np.abs(local[:, 1] - cy)
+        # Offset from the center of the nearest corner arc.
+        ex, ey = dx - (a - rx), dy - (b - ry)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            in_corner = (ex / rx) ** 2 + (ey / ry) ** 2 <= 1
+        return ((dx <= a) & (dy <= b) &
+                ((ex <= 0) | (ey <= 0) | in_corner))
+
+    def find_shapes(self, points):
+        '''
+        Look up the shape containing each point.
+
+        Parameters
+        ----------
+        points : numpy.ndarray
+            ``(m, 2)`` array of points (in document coordinates).
+
+        Returns
+        -------
+        numpy.ndarray
+            Position of (the last, i.e., topmost) shape containing each
+            point, or ``-1`` if no shape contains the point.
+        '''
+        from .spatial_index import BoundingBoxIndex
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        result = np.full(points.shape[0], -1, dtype=int)
+        if not len(self):
+            return result
+        point_i, shape_i = (BoundingBoxIndex(self.get_bounding_boxes())
+                            .query(np.column_stack([points, points])))
+        inside = self.contains(points[point_i], shape_i)
+        # Later shapes are drawn on top.
+        np.maximum.at(result, point_i[inside], shape_i[inside])
+        return result
+
+    def get_polygons(self, tolerance=CURVE_TOLERANCE):
+        '''
+        Polygonize shapes (all shapes at once).
+
+        Parameters
+        ----------
+        tolerance : float, optional
+            Maximum distance between each shape outline and its polygon (in
+            document coordinates).
+
+        Returns
+        -------
+        (points, counts) : (numpy.ndarray, numpy.ndarray)
+            ``(k, 2)`` array of polygon vertices of all shapes (in document
+            coordinates), and number of vertices of each shape.
+        '''
+        if not len(self):
+            return np.empty((0, 2)), np.zeros(0, dtype=int)
+        cx, cy, a, b, rx, ry = self.params.T
+        # Scale tolerance to shape coordinates by the largest scale factor of
+        # each transform.
+        scales = np.linalg.norm(self.transforms[:, :2, :2], ord=2, axis=(1, 2))
+        radii = np.maximum(rx, ry) * scales
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Angle step such that the chord sagitta is at most `tolerance`.
+            steps = 2 * np.arccos(np.clip(1 - tolerance / radii, -1, 1))
+            quarter_counts = np.ceil(.5 * np.pi / steps)
+        quarter_counts = np.clip(np.nan_to_num(quarter_counts), 1,
+                                 MAX_CURVE_SEGMENTS // 4).astype(int)
+        quarter_counts[radii == 0] = 0
+
+        # `quarter_counts + 1` points (including end points) on each of the
+        # four corner arcs of each shape.
+        corner_counts = np.repeat(quarter_counts + 1, 4)
+        corner_shape = np.repeat(np.arange(len(self)), 4)
+        corner = np.tile(np.arange(4), len(self))
+        point_corner = np.repeat(np.arange(corner_counts.size), corner_counts)
+        steps = (np.arange(point_corner.size) -
+                 np.repeat(np.cumsum(corner_counts) - corner_counts,
+                           corner_counts))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.nan_to_num(steps / quarter_counts[corner_shape]
+                              [point_corner])
+        angles = .5 * np.pi * (corner[point_corner] + t)
+        shape_i = corner_shape[point_corner]
+        # Sign of arc center offset of each corner (counter-clockwise).
+        signs = np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]])[corner
+                                                               [point_corner]]
+        x = (cx[shape_i] + signs[:, 0] * (a - rx)[shape_i] +
+             rx[shape_i] * np.cos(angles))
+        y = (cy[shape_i] + signs[:, 1] * (b - ry)[shape_i] +
+             ry[shape_i] * np.sin(angles))
+
+        # Drop duplicate consecutive points (e.g., where corner arcs meet
+        # without a straight edge in between).
+        points = np.column_stack([x, y])
+        keep = np.ones(points.shape[0], dtype=bool)
+        keep[1:] = ((points[1:] != points[:-1]).any(axis=1) |
+                    (shape_i[1:] != shape_i[:-1]))
+        points, shape_i = points[keep], shape_i[keep]
+
+        m = self.transforms[shape_i]
+        points = (np.einsum('nij,nj->ni', m[:, :2, :2], points) +
+                  m[:, :2, 2])
+        return points, np.bincount(shape_i, minlength=len(self))
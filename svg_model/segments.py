@@ -0,0 +1,245 @@
+# coding: utf-8
+'''
+Vectorized line segment geometry, e.g., for exact (narrow phase) pairwise
+shape queries.
+
+All functions operate on *arrays* of segments, where each segment is given by
+its start point ``p0`` and end point ``p1`` (``(n, 2)`` arrays).
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import numpy as np
+
+#: Maximum number of segment pairs evaluated at once (bounds memory usage).
+MAX_SEGMENT_PAIRS = 1 << 20
+
+
+def polygon_segments(points, counts):
+    '''
+    Boundary segments of polygons.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        ``(n, 2)`` array of vertices of all polygons, where the vertices of
+        each polygon are contiguous and in path order.  Polygons may be
+        explicitly closed (i.e., last vertex equal to the first vertex).
+    counts : numpy.ndarray
+        Number of vertices of each polygon.
+
+    Returns
+    -------
+    (p0, p1, segment_counts) : (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        Start and end point of each (non-zero length) boundary segment,
+        including the closing segment of each polygon, and number of segments
+        of each polygon.  The segments of each polygon are contiguous.
+    '''
+    points = np.asarray(points, dtype=float)
+    counts = np.asarray(counts, dtype=int)
+    polygon_i = np.repeat(np.arange(counts.size), counts)
+    positions = np.arange(points.shape[0])
+    next_i = positions + 1
+    starts = np.cumsum(counts) - counts
+    next_i[starts + counts - 1] = starts
+    p0, p1 = points, points[next_i]
+    nonzero = (p0 != p1).any(axis=1)
+    return (p0[nonzero], p1[nonzero],
+            np.bincount(polygon_i[nonzero], minlength=counts.size))
+
+
+def _cross(a, b):
+    return a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+
+def point_segment_distances(points, p0, p1):
+    '''
+    Returns
+    -------
+    numpy.ndarray
+        Distance of each point to the corresponding segment.
+    '''
+    segment = p1 - p0
+    length_sq = (segment * segment).sum(axis=1)
+    offsets = points - p0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip((offsets * segment).sum(axis=1) / length_sq, 0, 1)
+    t = np.nan_to_num(t)
+    offsets = offsets - t[:, None] * segment
+    return np.hypot(offsets[:, 0], offsets[:, 1])
+
+
+def segments_intersect(a0, a1, b0, b1):
+    '''
+    Returns
+    -------
+    numpy.ndarray
+        ``True`` for each pair of segments ``a``/``b`` that intersect
+        (including touching end points and collinear overlap).
+    '''
+    a, b = a1 - a0, b1 - b0
+    d1 = _cross(b, a0 - b0)
+    d2 = _cross(b, a1 - b0)
+    d3 = _cross(a, b0 - a0)
+    d4 = _cross(a, b1 - a0)
+    proper = (((d1 > 0) & (d2 < 0)) | ((d1 < 0) & (d2 > 0))) & \
+        (((d3 > 0) & (d4 < 0)) | ((d3 < 0) & (d4 > 0)))
+
+    def _on_segment(p, q0, q1):
+        return ((np.minimum(q0[:, 0], q1[:, 0]) <= p[:, 0]) &
+                (p[:, 0] <= np.maximum(q0[:, 0], q1[:, 0])) &
+                (np.minimum(q0[:, 1], q1[:, 1]) <= p[:, 1]) &
+                (p[:, 1] <= np.maximum(q0[:, 1], q1[:, 1])))
+
+    touching = (((d1 == 0) & _on_segment(a0, b0, b1)) |
+                ((d2 == 0) & _on_segment(a1, b0, b1)) |
+                ((d3 == 0) & _on_segment(b0, a0, a1)) |
+                ((d4 == 0) & _on_segment(b1, a0, a1)))
+    return proper | touching
+
+
+def segment_distances(a0, a1, b0, b1):
+    '''
+    Returns
+    -------
+    numpy.ndarray
+        Minimum distance between each pair of segments ``a``/``b`` (zero for
+        intersecting segments).
+    '''
+    distances = np.minimum(np.minimum(point_segment_distances(a0, b0, b1),
+                                      point_segment_distances(a1, b0, b1)),
+                           np.minimum(point_segment_distances(b0, a0, a1),
+                                      point_segment_distances(b1, a0, a1)))
+    distances[segments_intersect(a0, a1, b0, b1)] = 0
+    return distances
+
+
+def shared_lengths(a0, a1, b0, b1, gap, angle_tolerance=0.1):
+    '''
+    Length of each segment ``a`` shared with the corresponding segment ``b``,
+    i.e., the length of the projection of ``b`` onto ``a`` if both segments
+    are (nearly) parallel and ``b`` is within :data:`gap` of the line through
+    ``a``.
+
+    Parameters
+    ----------
+    a0, a1, b0, b1 : numpy.ndarray
+        ``(n, 2)`` arrays of segment end points.
+    gap : float
+        Maximum distance between shared segments.
+    angle_tolerance : float, optional
+        Maximum angle (in radians) between shared segments.
+
+    Returns
+    -------
+    numpy.ndarray
+        Shared length of each segment pair.
+    '''
+    a, b = a1 - a0, b1 - b0
+    a_lengths = np.hypot(a[:, 0], a[:, 1])
+    b_lengths = np.hypot(b[:, 0], b[:, 1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a_unit = a / a_lengths[:, None]
+        b_unit = b / b_lengths[:, None]
+    parallel = np.abs(_cross(a_unit, b_unit)) <= np.sin(angle_tolerance)
+    near = ((np.abs(_cross(a_unit, b0 - a0)) <= gap) &
+            (np.abs(_cross(a_unit, b1 - a0)) <= gap))
+    t0 = ((b0 - a0) * a_unit).sum(axis=1)
+    t1 = ((b1 - a0) * a_unit).sum(axis=1)
+    overlap = (np.minimum(a_lengths, np.maximum(t0, t1)) -
+               np.maximum(0, np.minimum(t0, t1)))
+    return np.where(parallel & near, np.nan_to_num(np.maximum(overlap, 0)), 0)
+
+
+def _batches(counts, limit=None):
+    # Ranges of items with total count of at most `limit` (default:
+    # `MAX_SEGMENT_PAIRS`), with at least one item per range.
+    if limit is None:
+        limit = MAX_SEGMENT_PAIRS
+    bounds = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        end = max(np.searchsorted(bounds, (bounds[start - 1] if start else 0) +
+                                  limit, side='right'), start + 1)
+        yield start, end
+        start = end
+
+
+def iter_segment_pairs(segment_counts, i, j):
+    '''
+    Enumerate all pairs of segments of the polygon pairs ``(i[k], j[k])``, in
+    batches of at most :data:`MAX_SEGMENT_PAIRS` segment pairs (a single
+    polygon pair may exceed the limit).
+
+    Parameters
+    ----------
+    segment_counts : numpy.ndarray
+        Number of segments of each polygon (see :func:`polygon_segments`).
+    i, j : numpy.ndarray
+        Polygon positions of each polygon pair.
+
+    Yields
+    ------
+    (pair_k, segment_a, segment_b) : (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        Polygon pair position (i.e., ``k``) of each segment pair, and segment
+        positions of segment of polygon ``i[k]`` and of polygon ``j[k]``.
+    '''
+    segment_counts = np.asarray(segment_counts, dtype=int)
+    segment_starts = np.cumsum(segment_counts) - segment_counts
+    pair_counts = segment_counts[i] * segment_counts[j]
+
+    for start, end in _batches(pair_counts):
+        counts = pair_counts[start:end]
+        pair_k = np.repeat(np.arange(start, end), counts)
+        # Position of each segment pair within polygon pair.
+        position = (np.arange(counts.sum()) -
+                    np.repeat(np.cumsum(counts) - counts, counts))
+        count_b = segment_counts[j[pair_k]]
+        segment_a = segment_starts[i[pair_k]] + position // count_b
+        segment_b = segment_starts[j[pair_k]] + position % count_b
+        yield pair_k, segment_a, segment_b
+
+
+def points_in_polygons(points, polygon_i, p0, p1, segment_counts):
+    '''
+    Test whether points are inside polygons (even-odd rule).
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        ``(n, 2)`` array of points.
+    polygon_i : numpy.ndarray
+        Position of polygon to test each point against.
+    p0, p1, segment_counts : numpy.ndarray
+        Polygon boundary segments, as returned by :func:`polygon_segments`.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``True`` for each point inside the corresponding polygon (points
+        exactly on the boundary may be classified either way).
+    '''
+    points = np.asarray(points, dtype=float)
+    polygon_i = np.asarray(polygon_i, dtype=int)
+    segment_counts = np.asarray(segment_counts, dtype=int)
+    segment_starts = np.cumsum(segment_counts) - segment_counts
+    counts = segment_counts[polygon_i]
+    inside = np.zeros(points.shape[0], dtype=bool)
+
+    for start, end in _batches(counts):
+        counts_i = counts[start:end]
+        point_k = np.repeat(np.arange(start, end), counts_i)
+        segment_k = (segment_starts[polygon_i[point_k]] +
+                     np.arange(counts_i.sum()) -
+                     np.repeat(np.cumsum(counts_i) - counts_i, counts_i))
+        p, a, b = points[point_k], p0[segment_k], p1[segment_k]
+        # Segments crossing horizontal ray from each point towards `+x`.
+        straddle = (a[:, 1] > p[:, 1]) != (b[:, 1] > p[:, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = a[:, 0] + ((p[:, 1] - a[:, 1]) * (b[:, 0] - a[:, 0]) /
+                                 (b[:, 1] - a[:, 1]))
+        crossings = straddle & (p[:, 0] < x_cross)
+        inside[start:end] = np.bincount(point_k - start, weights=crossings,
+                                        minlength=end - start) % 2 == 1
+    return inside
@@ -29,8 +29,10 @@
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # 
+from collections import OrderedDict
+import bisect
+from fractions import Fraction
 import random
-from math import atan2
 
 ##
 ## Based on Raimund Seidel'e paper "A simple and fast incremental randomized
@@ -41,6 +43,12 @@ from math import atan2
 # Shear transform. May effect numerical robustness
 SHEAR = 1e-3
 
+# Error bound for floating-point evaluation of `orient2d` (see Shewchuk,
+# "Adaptive Precision Floating-Point Arithmetic and Fast Robust Geometric
+# Predicates").
+EPSILON = 2. ** -53
+CCW_ERRBOUND_A = (3. + 16. * EPSILON) * EPSILON
+
 class Point(object):
     
     def __init__(self, x, y):
@@ -88,11 +96,43 @@ class Point(object):
         return Point(self.x, self.y)
 
 def orient2d(pa, pb, pc):
-    acx = pa.x - pc.x;
-    bcx = pb.x - pc.x;
-    acy = pa.y - pc.y;
-    bcy = pb.y - pc.y;
-    return acx * bcy - acy * bcx;
+    '''
+    Return a positive value if the points pa, pb, and pc occur in
+    counterclockwise order (assuming y-axis points up), a negative value if
+    they occur in clockwise order, and zero if they are collinear.
+
+    The sign of the result is exact: the determinant is evaluated in floating
+    point and, only if the result is within the floating-point error bound,
+    re-evaluated using exact rational arithmetic.
+    '''
+    detleft = (pa.x - pc.x) * (pb.y - pc.y)
+    detright = (pa.y - pc.y) * (pb.x - pc.x)
+    det = detleft - detright
+
+    if detleft > 0:
+        if detright <= 0:
+            return det
+        detsum = detleft + detright
+    elif detleft < 0:
+        if detright >= 0:
+            return det
+        detsum = -detleft - detright
+    else:
+        return det
+
+    errbound = CCW_ERRBOUND_A * detsum
+    if det >= errbound or -det >= errbound:
+        return det
+    return orient2d_exact(pa, pb, pc)
+
+
+def orient2d_exact(pa, pb, pc):
+    '''
+    Evaluate `orient2d` determinant using exact rational arithmetic.
+    '''
+    ax, ay, bx, by, cx, cy = map(Fraction, (pa.x, pa.y, pb.x, pb.y, pc.x,
+                                            pc.y))
+    return float((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
 
 class Edge(object):
     
@@ -153,12 +193,15 @@ class Trapezoid(object):
         if lr != None: lr.lower_left = self  
          
     def trim_neighbors(self):
-        if self.inside:
-            self.inside = False
-            if self.upper_left != None: self.upper_left.trim_neighbors()
-            if self.lower_left != None: self.lower_left.trim_neighbors()
-            if self.upper_right != None: self.upper_right.trim_neighbors()
-            if self.lower_right != None: self.lower_right.trim_neighbors()
+        # Depth-first search using explicit stack (recursion depth would
+        # otherwise grow with the number of edges).
+        stack = [self]
+        while stack:
+            t = stack.pop()
+            if t is not None and t.inside:
+                t.inside = False
+                stack.extend((t.upper_left, t.lower_left, t.upper_right,
+                              t.lower_right))
   
     def contains(self, point):
         return (point.x > self.left_point.x and point.x < self.right_point.x and 
@@ -201,7 +244,13 @@ class Triangulator(object):
     ## 
     ## Number of points should be > 3
     ##
-    def __init__(self, poly_line):
+    ## If `normalize` is True, points are translated and scaled to fit in the
+    ## unit square before triangulation (i.e., the shear transform and the
+    ## bounding box margin do not depend on the scale of the input
+    ## coordinates).  Triangles are always returned in input coordinates.
+    ##
+    def __init__(self, poly_line, normalize=True):
+        self.normalize = normalize
         self.polygons = []
         self.trapezoids = []
         self.xmono_poly = []
@@ -217,7 +266,7 @@ class Triangulator(object):
         for p in self.polygons:
             verts = []
             for v in p:
-                verts.append((v.x, v.y))
+                verts.append(v.source)
             triangles.append(verts)
         return triangles
             
@@ -226,31 +275,8 @@ class Triangulator(object):
     
     # Build the trapezoidal map and query graph
     def process(self):
-        for edge in self.edge_list:
-            traps = self.query_graph.follow_edge(edge)  
-            for t in traps:
-                # Remove old trapezods
-                del self.trapezoidal_map.map[t.key]
-                # Bisect old trapezoids and create new
-                cp = t.contains(edge.p)
-                cq = t.contains(edge.q)
-                if cp and cq:
-                    tlist = self.trapezoidal_map.case1(t, edge)
-                    self.query_graph.case1(t.sink, edge, tlist)
-                elif cp and not cq:
-                    tlist = self.trapezoidal_map.case2(t, edge) 
-                    self.query_graph.case2(t.sink, edge, tlist)
-                elif not cp and not cq:
-                    tlist = self.trapezoidal_map.case3(t, edge)
-                    self.query_graph.case3(t.sink, edge, tlist)
-                else:
-                    tlist = self.trapezoidal_map.case4(t, edge)
-                    self.query_graph.case4(t.sink, edge, tlist)
-                # Add new trapezoids to map
-                for t in tlist:
-                    self.trapezoidal_map.map[t.key] = t
-            self.trapezoidal_map.clear()
-                    
+        add_edges(self.trapezoidal_map, self.query_graph, self.edge_list)
+
         # Mark outside trapezoids w/ depth-first search
         for k, t in self.trapezoidal_map.map.items():
             self.mark_outside(t)
@@ -287,20 +313,27 @@ class Triangulator(object):
             t.trim_neighbors()
   
     def init_edges(self, points):
+        points = [(points[i][0], points[i][1]) for i in range(len(points))]
+        if self.normalize:
+            (x0, y0), scale = normalization_params(points)
+            normal_points = [((x - x0) / scale, (y - y0) / scale)
+                             for x, y in points]
+        else:
+            normal_points = points
         edge_list = []
         size = len(points)
         for i in range(size):
             j = i + 1 if i < size-1 else 0
-            p = points[i][0], points[i][1]
-            q = points[j][0], points[j][1]
+            p = normal_points[i], points[i]
+            q = normal_points[j], points[j]
             edge_list.append((p, q))
         return self.order_edges(edge_list)
   
     def order_edges(self, edge_list):
         edges = []
         for e in edge_list:
-            p = shear_transform(e[0])
-            q = shear_transform(e[1])
+            p = shear_transform(*e[0])
+            q = shear_transform(*e[1])
             if p.x > q.x: 
                 edges.append(Edge(q, p))
             else: 
@@ -313,8 +346,55 @@ class Triangulator(object):
         random.shuffle(edges)
         return edges
 
-def shear_transform(point):
-    return Point(point[0] + SHEAR * point[1], point[1])
+def add_edges(trapezoidal_map, query_graph, edge_list):
+    '''
+    Add edges to trapezoidal map and query graph (in order).
+    '''
+    for edge in edge_list:
+        traps = query_graph.follow_edge(edge)
+        for t in traps:
+            # Remove old trapezods
+            del trapezoidal_map.map[t.key]
+            # Bisect old trapezoids and create new
+            cp = t.contains(edge.p)
+            cq = t.contains(edge.q)
+            if cp and cq:
+                tlist = trapezoidal_map.case1(t, edge)
+                query_graph.case1(t.sink, edge, tlist)
+            elif cp and not cq:
+                tlist = trapezoidal_map.case2(t, edge) 
+                query_graph.case2(t.sink, edge, tlist)
+            elif not cp and not cq:
+                tlist = trapezoidal_map.case3(t, edge)
+                query_graph.case3(t.sink, edge, tlist)
+            else:
+                tlist = trapezoidal_map.case4(t, edge)
+                query_graph.case4(t.sink, edge, tlist)
+            # Add new trapezoids to map
+            for t in tlist:
+                trapezoidal_map.map[t.key] = t
+        trapezoidal_map.clear()
+
+def normalization_params(points):
+    '''
+    Return offset (i.e., minimum x and y) and scale to translate and scale
+    points to fit in the unit square.
+    '''
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    scale = float(max(max(xs) - min(xs), max(ys) - min(ys)))
+    return (min(xs), min(ys)), scale if scale > 0 else 1.
+
+
+def shear_transform(point, source=None):
+    '''
+    Return sheared `Point`.  The `source` attribute of the returned point is
+    set to the specified source coordinates (the input coordinates, by
+    default).
+    '''
+    sheared = Point(point[0] + SHEAR * point[1], point[1])
+    sheared.source = (point[0], point[1]) if source is None else source
+    return sheared
  
 def merge_sort(l):
     if len(l)>1 :
@@ -422,14 +502,14 @@ class TrapezoidalMap(object):
         max = edges[0].p + margin
         min = edges[0].q - margin
         for e in edges:
-            if e.p.x > max.x: max = Point(e.p.x + margin, max.y)
-            if e.p.y > max.y: max = Point(max.x, e.p.y + margin)
-            if e.q.x > max.x: max = Point(e.q.x + margin, max.y)
-            if e.q.y > max.y: max = Point(max.x, e.q.y + margin)
-            if e.p.x < min.x: min = Point(e.p.x - margin, min.y)
-            if e.p.y < min.y: min = Point(min.x, e.p.y - margin)
-            if e.q.x < min.x: min = Point(e.q.x - margin, min.y)
-            if e.q.y < min.y: min = Point(min.x, e.q.y - margin)
+            if e.p.x + margin > max.x: max = Point(e.p.x + margin, max.y)
+            if e.p.y + margin > max.y: max = Point(max.x, e.p.y + margin)
+            if e.q.x + margin > max.x: max = Point(e.q.x + margin, max.y)
+            if e.q.y + margin > max.y: max = Point(max.x, e.q.y + margin)
+            if e.p.x - margin < min.x: min = Point(e.p.x - margin, min.y)
+            if e.p.y - margin < min.y: min = Point(min.x, e.p.y - margin)
+            if e.q.x - margin < min.x: min = Point(e.q.x - margin, min.y)
+            if e.q.y - margin < min.y: min = Point(min.x, e.q.y - margin)
         top = Edge(Point(min.x, max.y), Point(max.x, max.y))
         bottom = Edge(Point(min.x, min.y), Point(max.x, min.y))
         left = top.p
@@ -541,8 +621,6 @@ class QueryGraph:
         qNode = XNode(edge.q, yNode, isink(tlist[2]))
         self.replace(sink, qNode)
 
-PI_SLOP = 3.1
-   
 class MonotoneMountain:
 
     def __init__(self):
@@ -582,8 +660,8 @@ class MonotoneMountain:
         self.gen_mono_poly()
         p = self.head.next
         while p.neq(self.tail):
-            a = self.angle(p)
-            if a >= PI_SLOP or a <= -PI_SLOP or a == 0: 
+            if self.orientation(p) == 0:
+                # Collinear point (exact test, see `orient2d`).
                 self.remove(p)
             elif self.is_convex(p): 
                 self.convex_points.add(p)
@@ -614,17 +692,333 @@ class MonotoneMountain:
             self.mono_poly.append(p)
             p = p.next
 
-    def angle(self, p):
-        a = p.next - p
-        b = p.prev - p
-        return atan2(a.cross(b), a.dot(b))
+    def orientation(self, p):
+        # Sign of the angle from `p.next` to `p.prev` around `p`.
+        return orient2d(p.next, p.prev, p)
 
     def angle_sign(self):
-        a = self.head.next - self.head
-        b = self.tail - self.head
-        return atan2(a.cross(b), a.dot(b)) >= 0
+        return orient2d(self.head.next, self.tail, self.head) >= 0
 
     def is_convex(self, p):
-        if self.positive != (self.angle(p) >= 0): 
-            return False
-        return True  
\ No newline at end of file
+        orientation = self.orientation(p)
+        if self.positive:
+            return orientation > 0
+        return orientation < 0  
+
+
+def polygon_vertices(points):
+    '''
+    Return polygon vertices as list of ``(x, y)`` tuples, without the closing
+    vertex (if any).
+    '''
+    vertices = [(float(x), float(y)) for x, y in points]
+    if len(vertices) > 1 and vertices[0] == vertices[-1]:
+        # End point is the same as the start point (do not include it).
+        vertices = vertices[:-1]
+    return vertices
+
+
+def split_polygon(vertices, coordinates):
+    '''
+    Insert points lying on the edges of a polygon as vertices (e.g., where a
+    corner of an adjacent polygon meets the side of the polygon).
+
+    Points are tested in input coordinates (i.e., *before* the shear
+    transform, which does not preserve collinearity exactly).
+
+    Parameters
+    ----------
+    vertices : list
+        Polygon vertices, as ``(x, y)`` tuples (see :func:`polygon_vertices`).
+    coordinates : list
+        Sorted list of ``(x, y)`` tuples of candidate points.
+
+    Returns
+    -------
+    list
+        Polygon vertices, including candidate points on edges.
+    '''
+    result = []
+    size = len(vertices)
+    for i in range(size):
+        a, b = vertices[i], vertices[(i + 1) % size]
+        result.append(a)
+        # Points on the edge interior are between the end points in
+        # lexicographic order.
+        start = bisect.bisect_right(coordinates, min(a, b))
+        end = bisect.bisect_left(coordinates, max(a, b))
+        between = [c for c in coordinates[start:end]
+                   if orient2d(Point(*a), Point(*b), Point(*c)) == 0]
+        result.extend(between if a < b else between[::-1])
+    return result
+
+
+def polygon_edges(key, points, sheared=None):
+    '''
+    Return list of (sheared) edges of a simple polygon.
+
+    Each edge is tagged with the polygon key and whether the polygon interior
+    lies above the edge.  The end points of each edge are ordered from left to
+    right (ties are broken by ``y``).
+
+    If :data:`sheared` is specified, it maps each ``(x, y)`` input coordinate
+    to its sheared point, and is updated with the vertices of the polygon,
+    i.e., edges of polygons sharing a dictionary share end points.
+    '''
+    if sheared is None:
+        sheared = {}
+    vertices = polygon_vertices(points)
+    points = []
+    for vertex in vertices:
+        if vertex not in sheared:
+            sheared[vertex] = shear_transform(vertex)
+        points.append(sheared[vertex])
+    size = len(points)
+    # Shoelace formula (the shear transform preserves area and orientation).
+    area = sum(points[i].cross(points[(i + 1) % size]) for i in range(size))
+    counter_clockwise = area > 0
+    edges = []
+    for i in range(size):
+        a, b = points[i], points[(i + 1) % size]
+        if not a.neq(b):
+            continue
+        left_to_right = (a.x, a.y) < (b.x, b.y)
+        edge = Edge(a, b) if left_to_right else Edge(b, a)
+        edge.key = key
+        # Interior of a counter-clockwise polygon is to the left of each edge.
+        edge.inside_above = left_to_right == counter_clockwise
+        edges.append(edge)
+    return edges
+
+
+def merge_edges(edges, segments):
+    '''
+    Merge polygon edges into segments, where each segment is shared by the
+    edges of (at most) two polygons, i.e., one on either side.
+
+    Parameters
+    ----------
+    edges : list
+        Polygon edges (see :func:`polygon_edges`), where polygons sharing
+        (parts of) edges have been split at each other's vertices (see
+        :func:`split_polygon`).
+    segments : dict
+        Segment for each ``(p.x, p.y, q.x, q.y)`` end point coordinates.  The
+        ``above_key`` and ``below_key`` attributes of each segment are the
+        keys of the polygons above and below the segment (or ``None``).
+
+    Returns
+    -------
+    list
+        Segments that were not already in :data:`segments`.
+    '''
+    created = []
+    for edge in edges:
+        segment = segments.get(segment_key(edge))
+        if segment is None:
+            segment = Edge(edge.p, edge.q)
+            segment.above_key, segment.below_key = None, None
+            segments[segment_key(edge)] = segment
+            created.append(segment)
+        if edge.inside_above:
+            segment.above_key = edge.key
+        else:
+            segment.below_key = edge.key
+    return created
+
+
+def segment_key(edge):
+    return edge.p.x, edge.p.y, edge.q.x, edge.q.y
+
+
+def segments_disjoint(a0, a1, b0, b1):
+    '''
+    Return `True` if segments ``a0``-``a1`` and ``b0``-``b1`` (``(x, y)``
+    tuples) do not meet, or only meet at a shared end point.
+    '''
+    if (max(a0[0], a1[0]) < min(b0[0], b1[0]) or
+            max(b0[0], b1[0]) < min(a0[0], a1[0]) or
+            max(a0[1], a1[1]) < min(b0[1], b1[1]) or
+            max(b0[1], b1[1]) < min(a0[1], a1[1])):
+        return True
+    a0, a1, b0, b1 = [Point(*p) for p in (a0, a1, b0, b1)]
+    sides = [cmp(orient2d(a0, a1, b0), 0), cmp(orient2d(a0, a1, b1), 0),
+             cmp(orient2d(b0, b1, a0), 0), cmp(orient2d(b0, b1, a1), 0)]
+    if sides[0] == sides[1] == 0:
+        # Collinear segments: disjoint unless the interiors overlap.
+        a_min, a_max = sorted([(a0.x, a0.y), (a1.x, a1.y)])
+        b_min, b_max = sorted([(b0.x, b0.y), (b1.x, b1.y)])
+        return max(a_min, b_min) >= min(a_max, b_max)
+    if any(not u.neq(v) for u in (a0, a1) for v in (b0, b1)):
+        # Segments sharing an end point only meet at that point.
+        return True
+    return sides[0] * sides[1] > 0 or sides[2] * sides[3] > 0
+
+
+def polygon_contains(vertices, x, y):
+    '''
+    Return `True` if point is inside polygon (even-odd rule).
+    '''
+    inside = False
+    for (x0, y0), (x1, y1) in zip(vertices, vertices[1:] + vertices[:1]):
+        if ((y0 > y) != (y1 > y) and
+                x < x0 + (y - y0) * (x1 - x0) / (y1 - y0)):
+            inside = not inside
+    return inside
+
+
+class PointLocator(object):
+    '''
+    Point location over the edges of a set of non-overlapping simple polygons,
+    using a *single* trapezoidal map and query graph (i.e., expected
+    O(log n) time per query, where n is the total number of edges).
+
+    Polygons may share (parts of) edges, e.g., adjacent electrodes in a grid.
+    Polygons are split where a vertex of one polygon lies on the edge of
+    another, and each resulting segment is inserted once, tagged with the
+    keys of the polygons on either side.
+
+    Polygons are identified by key.  Adding a polygon inserts its edges into
+    the existing map, as long as the polygon lies within the map bounding box
+    and its edges only meet existing segments at shared end points (or
+    coincide with existing segments).  Otherwise, the map is marked as stale
+    and rebuilt on the next query.
+
+    Removing (or replacing) a polygon only clears the polygon key from its
+    segments, i.e., the segments remain in the map (without affecting
+    queries) until the next rebuild.  Remaining segments inside an added
+    polygon are tagged with the key of the polygon on both sides.
+    '''
+    def __init__(self, polygons=None):
+        '''
+        polygons : iterable of (key, points) pairs, where points is a sequence
+            of (x, y) vertices.
+        '''
+        self.polygons = OrderedDict()
+        if polygons is not None:
+            for key, points in polygons:
+                self.polygons[key] = points
+        self.trapezoidal_map = None
+        self.bounding_box = None
+        self.query_graph = None
+        # Sorted list of input coordinates of all vertices.
+        self.coordinates = []
+        # Sheared point of each input coordinate.
+        self.points = {}
+        # Segment for each end point coordinates (see `merge_edges`).
+        self.segments = OrderedDict()
+        # Segments of each polygon.
+        self.polygon_segments = {}
+
+    def build(self):
+        '''
+        Build trapezoidal map and query graph from the edges of all polygons.
+        '''
+        polygons = [(key, polygon_vertices(points))
+                    for key, points in self.polygons.items()]
+        self.coordinates = sorted(set(vertex for key, vertices in polygons
+                                      for vertex in vertices))
+        self.points = {}
+        self.segments = OrderedDict()
+        self.polygon_segments = {}
+        edges = []
+        for key, vertices in polygons:
+            edges_i = polygon_edges(key, split_polygon(vertices,
+                                                       self.coordinates),
+                                    self.points)
+            edges.extend(edges_i)
+        segments = merge_edges(edges, self.segments)
+        for edge in edges:
+            self.polygon_segments.setdefault(edge.key, []).append(
+                self.segments[segment_key(edge)])
+        if not segments:
+            self.trapezoidal_map = None
+            self.query_graph = None
+            return
+        # Randomized incremental algorithm (use a consistent seed, see
+        # `Triangulator.order_edges`).
+        random.Random(1).shuffle(segments)
+        self.trapezoidal_map = TrapezoidalMap()
+        self.bounding_box = self.trapezoidal_map.bounding_box(segments)
+        self.query_graph = QueryGraph(isink(self.bounding_box))
+        add_edges(self.trapezoidal_map, self.query_graph, segments)
+
+    def add_shape(self, key, vertices, triangles=None):
+        '''
+        Add polygon (replacing existing polygon with the same key, if any).
+
+        Triangles are not required (the argument is accepted for
+        compatibility with other shape index types).
+        '''
+        self.remove_shape(key)
+        self.polygons[key] = vertices
+        if self.query_graph is None:
+            # Map is built on the next query.
+            return
+        vertices = polygon_vertices(vertices)
+        coordinates = sorted(set(self.coordinates).union(vertices))
+        points = dict(self.points)
+        edges = polygon_edges(key, split_polygon(vertices, coordinates),
+                              points)
+        top, bottom = self.bounding_box.top, self.bounding_box.bottom
+        if not all(top.p.x < p.x < top.q.x and bottom.p.y < p.y < top.p.y
+                   for e in edges for p in (e.p, e.q)):
+            # Polygon is not within bounding box of existing map.
+            self.query_graph = None
+            return
+        x_min = min(x for x, y in vertices)
+        x_max = max(x for x, y in vertices)
+        edge_keys = set(segment_key(edge) for edge in edges)
+        # Existing segments (i.e., of removed polygons) inside the polygon.
+        inside = []
+        for segment in self.segments.values():
+            a0, a1 = segment.p.source, segment.q.source
+            if (max(a0[0], a1[0]) < x_min or min(a0[0], a1[0]) > x_max or
+                    segment_key(segment) in edge_keys):
+                continue
+            if not all(segments_disjoint(a0, a1, edge.p.source,
+                                         edge.q.source) for edge in edges):
+                # Edge crosses (or partially overlaps) existing segment.
+                self.query_graph = None
+                return
+            # Segment does not meet the polygon outline (except at end
+            # points), i.e., it is either inside or outside the polygon.
+            if polygon_contains(vertices, .5 * (a0[0] + a1[0]),
+                                .5 * (a0[1] + a1[1])):
+                inside.append(segment)
+        self.coordinates = coordinates
+        self.points = points
+        for segment in inside:
+            segment.above_key, segment.below_key = key, key
+        segments = merge_edges(edges, self.segments)
+        self.polygon_segments[key] = [self.segments[segment_key(edge)]
+                                      for edge in edges] + inside
+        add_edges(self.trapezoidal_map, self.query_graph, segments)
+
+    def remove_shape(self, key):
+        '''
+        Remove polygon (if present).
+
+        The segments of the polygon are kept in the map (only the polygon key
+        is cleared), i.e., the map is not rebuilt.
+        '''
+        if self.polygons.pop(key, None) is None:
+            return
+        for segment in self.polygon_segments.pop(key, []):
+            if segment.above_key == key:
+                segment.above_key = None
+            if segment.below_key == key:
+                segment.below_key = None
+
+    def find_shape(self, x, y):
+        '''
+        Returns key of polygon containing point (x, y), or None if no polygon
+        contains the point.
+        '''
+        if self.query_graph is None:
+            self.build()
+            if self.query_graph is None:
+                return None
+        point = shear_transform((x, y))
+        bottom = self.query_graph.locate(Edge(point, point)).bottom
+        return getattr(bottom, 'above_key', None)
@@ -1,16 +1,21 @@
 # coding: utf-8
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from collections import OrderedDict
 import types
 
 import numpy as np
 import pandas as pd
-import pymunk
+from six.moves import zip
+import six
 
-from . import (svg_polygons_to_df, fit_points_in_bounding_box,
-               fit_points_in_bounding_box_params)
-from .tesselate import tesselate_shapes_frame
-from .point_query import get_shapes_pymunk_space
+from . import svg_polygons_to_df, fit_points_in_bounding_box_params
+from .data_frame import get_bounding_boxes
+from .tesselate import (tesselate_shape, tesselate_shapes_arrays,
+                        triangles_arrays_to_frame)
+from .seidel import PointLocator
+from .simplify import simplify_shapes
+from .transform import TransformedPoints
 
 
 def get_transform(offset, scale):
@@ -41,9 +46,14 @@ class ShapesCanvas(object):
     The `ShapesCanvas.find_shape` method returns the shape located at the
     specified *canvas* coordinates (or `None`, if no shape intersects with
     specified point).
+
+    Individual shapes may be edited through the `update_shape`, `add_shape`,
+    and `remove_shape` methods.  Each edit only tesselates the affected shape
+    and patches the point location index in place.
     '''
     def __init__(self, df_shapes, shape_i_columns, canvas_shape=None,
-                 padding_fraction=0):
+                 padding_fraction=0, point_locator='pymunk',
+                 simplify_tolerance=None):
         '''
         Arguments
         ---------
@@ -54,54 +64,238 @@ class ShapesCanvas(object):
            shape.
          - `canvas_shape`: A `pandas.Series`-like object with a `width` and a
            `height`.
+         - `point_locator`: Point location index used by `find_shape`:
+             * `'pymunk'`: `pymunk` space containing one convex body per
+               triangle of each tesselated shape.
+             * `'seidel'`: Single trapezoidal map over the edges of all shapes
+               (see `seidel.PointLocator`).  Neither `pymunk` nor tesselation
+               is required (shapes are only tesselated if triangles are
+               requested, e.g., through `df_tesselations`).
+         - `simplify_tolerance`: If not `None`, simplify shapes before
+           indexing (see `simplify.simplify_shapes`).  The fraction of
+           vertices removed is stored as `vertex_reduction_ratio`.
         '''
-        self.df_shapes = df_shapes
-        if isinstance(shape_i_columns, bytes):
+        if isinstance(shape_i_columns, six.string_types):
             shape_i_columns = [shape_i_columns]
         self.shape_i_columns = shape_i_columns
+        if simplify_tolerance is not None:
+            df_shapes, self.vertex_reduction_ratio = \
+                simplify_shapes(df_shapes, shape_i_columns, simplify_tolerance)
+        else:
+            self.vertex_reduction_ratio = 0.
+        self._set_df_shapes(df_shapes)
 
         # Scale and center source points to canvas shape.
         self.source_shape = pd.Series(df_shapes[['x', 'y']].max().values,
                                       index=['width', 'height'])
 
-        # Tesselate electrode polygons into convex shapes (triangles), for
-        # compatability with `pymunk`.
-        self.df_tesselations = tesselate_shapes_frame(self.df_shapes,
-                                                      shape_i_columns)
-
-        # Create `pymunk` space and add a body for each convex shape.  Each
-        # body is mapped to the original shape identifier through
-        # `canvas_bodies`.
-        self.space, self.bodies = get_shapes_pymunk_space(self.df_tesselations,
-                                                          shape_i_columns +
-                                                          ['triangle_i'])
+        self.point_locator = point_locator
+        # Triangles of each shape, keyed by shape (tesselated on demand if
+        # `None`).
+        self.shape_triangles = None
+        self._triangle_arrays = None
+
+        if point_locator == 'pymunk':
+            # Import on demand, since `pymunk` is only required by this
+            # point locator.
+            from .point_query import PymunkShapeIndex
+
+            # Create `pymunk` space and add a body for each convex shape.  Each
+            # body is mapped to the original shape identifier through
+            # `self.locator.bodies`.
+            self.locator = \
+                PymunkShapeIndex.from_triangles(*self.get_triangle_arrays())
+        elif point_locator == 'seidel':
+            points = self._df_shapes[['x', 'y']].values
+            self.locator = PointLocator((shape_key, points[rows])
+                                        for shape_key, rows in
+                                        self._shape_rows.items())
+        else:
+            raise ValueError('Unsupported point locator: %s' % point_locator)
         self.padding_fraction = padding_fraction
         self.reset_shape(canvas_shape, self.padding_fraction)
 
+    def _set_df_shapes(self, df_shapes):
+        self._df_shapes = df_shapes
+        # Positions of rows of each shape, keyed by shape.
+        self._shape_rows = df_shapes.groupby(self.shape_i_columns).indices
+        # Pending edits, i.e., new vertex table (or `None` if removed) keyed by
+        # shape.
+        self._shape_edits = OrderedDict()
+        self._df_canvas_shapes = None
+        self._df_bounding_shapes = None
+
+    def _apply_shape_edits(self):
+        '''
+        Apply all pending shape edits to the shapes table at once.
+        '''
+        if not self._shape_edits:
+            return
+        drop_rows = [self._shape_rows[k] for k in self._shape_edits
+                     if k in self._shape_rows]
+        keep = np.ones(self._df_shapes.shape[0], dtype=bool)
+        if drop_rows:
+            keep[np.concatenate(drop_rows)] = False
+        frames = ([self._df_shapes.loc[keep]] +
+                  [df_i for df_i in self._shape_edits.values()
+                   if df_i is not None])
+        self._set_df_shapes(pd.concat(frames, ignore_index=True)
+                            [self._df_shapes.columns])
+
+    @property
+    def df_shapes(self):
+        '''
+        Table of shape vertices (one row per vertex), including any shape
+        edits.
+        '''
+        self._apply_shape_edits()
+        return self._df_shapes
+
+    @property
+    def triangles(self):
+        '''
+        ``(n_triangles, 3, 2)`` array of triangle vertex coordinates.
+        '''
+        return self.get_triangle_arrays()[0]
+
+    @property
+    def triangle_shape_codes(self):
+        '''
+        Sorted ``(n_triangles, )`` array of shape codes, i.e., positions in
+        :attr:`shape_index`.
+        '''
+        return self.get_triangle_arrays()[1]
+
+    @property
+    def shape_index(self):
+        '''
+        Shape keys.
+        '''
+        return self.get_triangle_arrays()[2]
+
+    def get_triangle_arrays(self):
+        '''
+        Returns
+        -------
+        (triangles, shape_codes, shape_index)
+            Triangles of all shapes, in the format returned by
+            :func:`svg_model.tesselate.tesselate_shapes_arrays`.
+        '''
+        if self.shape_triangles is None:
+            # Tesselate electrode polygons into convex shapes (triangles), for
+            # compatability with `pymunk`.
+            #
+            # Triangles are kept in columnar form, i.e., `(n_triangles, 3, 2)`
+            # coordinates array and shape code per triangle.
+            triangles, shape_codes, shape_index = \
+                tesselate_shapes_arrays(self.df_shapes, self.shape_i_columns)
+            bounds = np.searchsorted(shape_codes,
+                                     np.arange(len(shape_index) + 1))
+            self.shape_triangles = OrderedDict((shape_key,
+                                                triangles[bounds[i]:
+                                                          bounds[i + 1]])
+                                               for i, shape_key in
+                                               enumerate(shape_index))
+            self._triangle_arrays = triangles, shape_codes, shape_index
+        elif self._triangle_arrays is None:
+            shape_keys = list(self.shape_triangles)
+            counts = [v.shape[0] for v in self.shape_triangles.values()]
+            if len(self.shape_i_columns) > 1:
+                shape_index = pd.MultiIndex.from_tuples(shape_keys,
+                                                        names=self
+                                                        .shape_i_columns)
+            else:
+                shape_index = pd.Index(shape_keys,
+                                       name=self.shape_i_columns[0])
+            triangles = (np.concatenate(list(self.shape_triangles.values()))
+                         if shape_keys else np.empty((0, 3, 2)))
+            shape_codes = np.repeat(np.arange(len(shape_keys),
+                                              dtype=np.int32), counts)
+            self._triangle_arrays = triangles, shape_codes, shape_index
+        return self._triangle_arrays
+
+    @property
+    def df_tesselations(self):
+        '''
+        Table of triangle vertices (one row per vertex), in the format returned
+        by :func:`svg_model.tesselate.tesselate_shapes_frame`.
+
+        Built on access from the :attr:`triangles` array.
+        '''
+        return triangles_arrays_to_frame(*self.get_triangle_arrays())
+
+    @property
+    def space(self):
+        '''
+        `pymunk` space of the ``'pymunk'`` point locator (or `None` for other
+        point locators).
+        '''
+        return getattr(self.locator, 'space', None)
+
+    @property
+    def bodies(self):
+        '''
+        Shape identifier of each body in :attr:`space`, indexed by body (or
+        `None` if point locator is not ``'pymunk'``).
+        '''
+        if self.point_locator != 'pymunk':
+            return None
+        return pd.Series(list(self.locator.bodies.values()),
+                         index=pd.Index(list(self.locator.bodies),
+                                        name='body'),
+                         name=self.shape_i_columns[0])
+
+    @property
+    def canvas_points(self):
+        '''
+        Lazy view of shape vertices, scaled and offset to fit canvas (see
+        :class:`svg_model.transform.TransformedPoints`).
+
+        The shapes table is *not* copied, i.e., refitting shapes to a new
+        canvas shape (see :meth:`reset_shape`) only updates the scale and
+        offset.
+        '''
+        return TransformedPoints(self.df_shapes, self.canvas_scale,
+                                 self.canvas_offset.values)
+
+    @property
+    def df_canvas_shapes(self):
+        '''
+        Table of shape vertices, scaled and offset to fit canvas.
+
+        Materialized on first access (see :attr:`canvas_points`).
+        '''
+        if self._df_canvas_shapes is None:
+            self._df_canvas_shapes = self.canvas_points.to_frame()
+        return self._df_canvas_shapes
+
+    @property
+    def df_bounding_shapes(self):
+        '''
+        Shape (i.e., width and height) of bounding box for each canvas shape.
+        '''
+        if self._df_bounding_shapes is None:
+            # Canvas transform is a uniform scale and offset, i.e., the
+            # canvas bounding box shapes are the scaled source bounding box
+            # shapes.
+            self._df_bounding_shapes = \
+                (get_bounding_boxes(self.df_shapes, self.shape_i_columns)
+                 [['width', 'height']] * self.canvas_scale)
+        return self._df_bounding_shapes
+
     def reset_shape(self, canvas_shape=None, padding_fraction=None):
         if canvas_shape is None:
             canvas_shape = self.source_shape.copy()
         if padding_fraction is None:
             padding_fraction = self.padding_fraction
         self.canvas_shape = canvas_shape
+        self.canvas_padding_fraction = padding_fraction
+
+        # Canvas shapes tables are computed on access.
+        self._df_canvas_shapes = None
+        self._df_bounding_shapes = None
 
-        self.df_canvas_shapes = fit_points_in_bounding_box(self.df_shapes,
-                                                           canvas_shape,
-                                                           padding_fraction=
-                                                           padding_fraction)
-
-        # Compute shape (i.e., width and height) of bounding box for each
-        # canvas shape.
-        df_bounding_coords = (self.df_canvas_shapes.groupby('id')[['x', 'y']]
-                              .agg(['min', 'max']))
-        bounding_width = df_bounding_coords.x['max'] - df_bounding_coords.x['min']
-        bounding_height = df_bounding_coords.y['max'] - df_bounding_coords.y['min']
-        self.df_bounding_shapes = pd.DataFrame(np.column_stack([bounding_width,
-                                                                bounding_height]),
-                                               columns=['width', 'height'],
-                                               index=df_bounding_coords.index)
-
-        if self.df_canvas_shapes.shape[0] == 0:
+        if self.df_shapes.shape[0] == 0:
             self.canvas_offset = pd.Series([0, 0], index=['x', 'y'])
             self.canvas_scale = 1.
         else:
@@ -118,6 +312,112 @@ class ShapesCanvas(object):
         self.canvas_to_shapes_transform = \
             np.linalg.inv(self.shapes_to_canvas_transform)
 
+    def _shape_frame(self, shape_id, vertices, attrs):
+        '''
+        Build vertex table for a single shape, with the same columns as
+        :attr:`df_shapes`.
+        '''
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 2)
+        shape_values = (shape_id if len(self.shape_i_columns) > 1
+                        else (shape_id, ))
+        values = dict(attrs)
+        values.update(zip(self.shape_i_columns, shape_values))
+        values.update({'vertex_i': np.arange(vertices.shape[0]),
+                       'x': vertices[:, 0], 'y': vertices[:, 1]})
+        columns = self._df_shapes.columns
+        return pd.DataFrame({c: values.get(c) for c in columns},
+                            index=np.arange(vertices.shape[0]),
+                            columns=columns)
+
+    def _get_shape_attrs(self, shape_id):
+        if shape_id in self._shape_edits:
+            df_shape = self._shape_edits[shape_id]
+        elif shape_id in self._shape_rows:
+            df_shape = self._df_shapes.iloc[self._shape_rows[shape_id][:1]]
+        else:
+            df_shape = None
+        if df_shape is None:
+            raise KeyError('Shape not found: %s' % (shape_id, ))
+        return {c: df_shape[c].iloc[0] for c in df_shape.columns
+                if c not in self.shape_i_columns + ['vertex_i', 'x', 'y']}
+
+    def _has_shape(self, shape_id):
+        if shape_id in self._shape_edits:
+            return self._shape_edits[shape_id] is not None
+        return shape_id in self._shape_rows
+
+    def _set_shape(self, shape_id, df_shape):
+        if df_shape is None:
+            if self.shape_triangles is not None:
+                del self.shape_triangles[shape_id]
+            self.locator.remove_shape(shape_id)
+        else:
+            vertices = df_shape[['x', 'y']].values
+            triangles = None
+            if self.shape_triangles is not None:
+                triangles = tesselate_shape(vertices)
+                self.shape_triangles[shape_id] = triangles
+            self.locator.add_shape(shape_id, vertices, triangles)
+        self._shape_edits[shape_id] = df_shape
+        self._triangle_arrays = None
+        self._df_canvas_shapes = None
+        self._df_bounding_shapes = None
+
+    def update_shape(self, shape_id, new_vertices):
+        '''
+        Replace vertices of existing shape.
+
+        Only the updated shape is re-tesselated, and the point location index
+        is patched in place (see :class:`svg_model.seidel.PointLocator` for
+        the ``'seidel'`` point locator).
+
+        .. note::
+            The canvas transform is *not* updated, i.e., existing shapes do not
+            move on the canvas.  Call :meth:`reset_shape` to refit all shapes
+            to the canvas.
+
+        Parameters
+        ----------
+        shape_id
+            Shape key (a tuple if there are multiple shape index columns).
+        new_vertices : array-like
+            ``(n, 2)`` array of vertex coordinates in *shapes* coordinate space
+            (i.e., *not* canvas coordinates).
+        '''
+        attrs = self._get_shape_attrs(shape_id)
+        self._set_shape(shape_id, self._shape_frame(shape_id, new_vertices,
+                                                    attrs))
+
+    def add_shape(self, shape_id, vertices, **attrs):
+        '''
+        Add new shape.
+
+        See :meth:`update_shape`.
+
+        Parameters
+        ----------
+        shape_id
+            Shape key (a tuple if there are multiple shape index columns).
+        vertices : array-like
+            ``(n, 2)`` array of vertex coordinates in *shapes* coordinate space.
+        **attrs
+            Values of other :attr:`df_shapes` columns for the new shape.
+        '''
+        if self._has_shape(shape_id):
+            raise KeyError('Shape already exists: %s' % (shape_id, ))
+        self._set_shape(shape_id, self._shape_frame(shape_id, vertices,
+                                                    attrs))
+
+    def remove_shape(self, shape_id):
+        '''
+        Remove shape.
+
+        See :meth:`update_shape`.
+        '''
+        if not self._has_shape(shape_id):
+            raise KeyError('Shape not found: %s' % (shape_id, ))
+        self._set_shape(shape_id, None)
+
     @classmethod
     def from_svg(cls, svg_filepath, *args, **kwargs):
         # Read SVG polygons into dataframe, one row per polygon vertex.
@@ -132,17 +432,4 @@ class ShapesCanvas(object):
         shape_x, shape_y, w = self.canvas_to_shapes_transform.dot([canvas_x,
                                                                    canvas_y,
                                                                    1])
-        if hasattr(self.space, 'point_query_first'):
-            # Assume `pymunk<5.0`.
-            shape = self.space.point_query_first((shape_x, shape_y))
-        else:
-            # Assume `pymunk>=5.0`, where `point_query_first` method has been
-            # deprecated.
-            info = self.space.point_query_nearest((shape_x, shape_y), 0,
-                                                  [pymunk.ShapeFilter
-                                                   .ALL_CATEGORIES])
-            shape = info.shape if info else None
-
-        if shape:
-            return self.bodies[shape.body]
-        return None
+        return self.locator.find_shape(shape_x, shape_y)
@@ -0,0 +1,204 @@
+# coding: utf-8
+'''
+Polygon simplification, i.e., removal of redundant (e.g., collinear)
+vertices and `Douglas-Peucker`_ simplification.
+
+.. _Douglas-Peucker: https://en.wikipedia.org/wiki/Ramer%E2%80%93Douglas%E2%80%93Peucker_algorithm
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import numpy as np
+import six
+
+#: Relative tolerance used to detect collinear vertices.
+COLLINEAR_EPSILON = 1e-9
+
+
+def _segment_distances(points, start, end):
+    '''
+    Returns
+    -------
+    numpy.ndarray
+        Distance of each point in :data:`points` to the line segment from
+        :data:`start` to :data:`end`.
+    '''
+    segment = end - start
+    length_sq = segment.dot(segment)
+    offsets = points - start
+    if length_sq == 0:
+        return np.hypot(offsets[:, 0], offsets[:, 1])
+    t = np.clip(offsets.dot(segment) / length_sq, 0, 1)
+    offsets = offsets - t[:, None] * segment
+    return np.hypot(offsets[:, 0], offsets[:, 1])
+
+
+def douglas_peucker_mask(points, tolerance):
+    '''
+    Douglas-Peucker simplification of a polyline.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        ``(n, 2)`` array of polyline vertices.
+    tolerance : float
+        Maximum distance between the original and the simplified polyline.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean mask of vertices to keep (the first and last vertices are
+        always kept).
+    '''
+    points = np.asarray(points, dtype=float)
+    keep = np.zeros(points.shape[0], dtype=bool)
+    if not points.shape[0]:
+        return keep
+    keep[[0, -1]] = True
+    # Iterate (rather than recurse) over ranges of vertices, computing the
+    # distances of all vertices in each range at once.
+    ranges = [(0, points.shape[0] - 1)]
+    while ranges:
+        start, end = ranges.pop()
+        if end - start < 2:
+            continue
+        distances = _segment_distances(points[start + 1:end], points[start],
+                                       points[end])
+        i = distances.argmax()
+        if distances[i] > tolerance:
+            i += start + 1
+            keep[i] = True
+            ranges.extend([(start, i), (i, end)])
+    return keep
+
+
+def simplify_mask(points, counts, tolerance=0):
+    '''
+    Compute mask of vertices to keep when simplifying shapes.
+
+    Duplicate and collinear vertices are removed from all shapes at once.  If
+    :data:`tolerance` is greater than zero, each shape is further simplified
+    using the Douglas-Peucker algorithm.
+
+    The first and last vertex of each shape are always kept.  Shapes that
+    would be reduced to fewer than three distinct vertices are kept as is.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        ``(n, 2)`` array of vertices of all shapes, where the vertices of each
+        shape are contiguous and in path order.
+    counts : numpy.ndarray
+        Number of vertices of each shape.
+    tolerance : float, optional
+        Maximum distance between each original and simplified shape outline.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean mask of vertices to keep.
+    '''
+    points = np.asarray(points, dtype=float)
+    counts = np.asarray(counts, dtype=int)
+    vertex_count = points.shape[0]
+    if not vertex_count:
+        return np.zeros(0, dtype=bool)
+    starts = np.cumsum(counts) - counts
+    ends = starts + counts - 1
+
+    interior = np.ones(vertex_count, dtype=bool)
+    interior[starts] = False
+    interior[ends] = False
+
+    # Previous and next vertex of each interior vertex (within same shape).
+    positions = np.arange(vertex_count)
+    previous = points[np.maximum(positions - 1, 0)]
+    next_ = points[np.minimum(positions + 1, vertex_count - 1)]
+
+    base = next_ - previous
+    offsets = points - previous
+    cross = base[:, 0] * offsets[:, 1] - base[:, 1] * offsets[:, 0]
+    base_length = np.hypot(base[:, 0], base[:, 1])
+    scale = max(np.abs(points).max(), 1)
+
+    duplicate = (points == previous).all(axis=1)
+    collinear = ((np.abs(cross) <= COLLINEAR_EPSILON * scale * base_length) &
+                 (base_length > 0) & ~(points == next_).all(axis=1))
+    keep = ~(interior & (duplicate | collinear))
+
+    if tolerance > 0:
+        for start_i, end_i in zip(starts, ends + 1):
+            kept_i = start_i + np.flatnonzero(keep[start_i:end_i])
+            keep[start_i:end_i] = False
+            keep[kept_i[douglas_peucker_mask(points[kept_i], tolerance)]] = \
+                True
+
+    # Keep degenerate results as is (at least three distinct vertices, not
+    # counting a closing vertex equal to the first vertex).
+    closed = (points[starts] == points[ends]).all(axis=1)
+    kept_counts = np.add.reduceat(keep.astype(int), starts)
+    degenerate = kept_counts - closed < 3
+    for start_i, end_i in zip(starts[degenerate], ends[degenerate] + 1):
+        keep[start_i:end_i] = True
+    return keep
+
+
+def simplify_shapes(df_shapes, shape_i_columns, tolerance=0):
+    '''
+    Simplify shapes in a table of shape vertices (one row per vertex).
+
+    See :func:`simplify_mask`.
+
+    Parameters
+    ----------
+    df_shapes : pandas.DataFrame
+        Table containing vertices of shapes, one row per vertex, with the *at
+        least* the following columns:
+         - ``x``: The x-coordinate of the vertex.
+         - ``y``: The y-coordinate of the vertex.
+    shape_i_columns : str or list
+        Column(s) forming key to differentiate rows/vertices for each distinct
+        shape.
+    tolerance : float, optional
+        Maximum distance between each original and simplified shape outline.
+
+        If zero (default), only duplicate and collinear vertices are removed.
+
+    Returns
+    -------
+    (df_simplified, reduction_ratio) : (pandas.DataFrame, float)
+        The items in the tuple are:
+         - ``df_simplified``: Rows of :data:`df_shapes` corresponding to the
+           kept vertices (the ``vertex_i`` column, if present, is renumbered).
+         - ``reduction_ratio``: Fraction of vertices removed.
+    '''
+    if isinstance(shape_i_columns, six.string_types):
+        shape_i_columns = [shape_i_columns]
+    if not df_shapes.shape[0]:
+        return df_shapes, 0.
+
+    # Row positions of each shape, in path order.
+    shape_rows = list(df_shapes.groupby(shape_i_columns).indices.values())
+    order = np.concatenate(shape_rows)
+    counts = np.array([rows_i.size for rows_i in shape_rows])
+
+    keep_ordered = simplify_mask(df_shapes[['x', 'y']].values[order], counts,
+                                 tolerance)
+    keep = np.zeros(df_shapes.shape[0], dtype=bool)
+    keep[order] = keep_ordered
+
+    df_simplified = df_shapes.loc[keep]
+    if 'vertex_i' in df_simplified:
+        # Renumber kept vertices within each shape (i.e., number of kept
+        # vertices before each vertex in the same shape).
+        kept = keep_ordered.astype(int)
+        kept_before = np.cumsum(kept) - kept
+        starts = np.cumsum(counts) - counts
+        vertex_i = kept_before - np.repeat(kept_before[starts], counts)
+        vertex_i_rows = np.empty(df_shapes.shape[0], dtype=int)
+        vertex_i_rows[order] = vertex_i
+        df_simplified = df_simplified.copy()
+        df_simplified['vertex_i'] = vertex_i_rows[keep]
+    reduction_ratio = 1 - df_simplified.shape[0] / df_shapes.shape[0]
+    return df_simplified, reduction_ratio
@@ -0,0 +1,80 @@
+# coding: utf-8
+'''
+Spatial index of axis-aligned bounding boxes, e.g., as a broad phase for
+pairwise shape queries (adjacency, overlap, etc.).
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+
+
+class BoundingBoxIndex(object):
+    '''
+    Static index of axis-aligned bounding boxes (sort and sweep along the
+    ``x`` axis).
+
+    All queries are vectorized, i.e., the candidate pairs for *all* query
+    boxes are generated and filtered with array operations.
+
+    Parameters
+    ----------
+    bboxes : numpy.ndarray
+        ``(n, 4)`` array of bounding boxes, where each row is ``(x_min,
+        y_min, x_max, y_max)``.
+    '''
+    def __init__(self, bboxes):
+        self.bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+        self._order = np.argsort(self.bboxes[:, 0], kind='mergesort')
+        self._x_min_sorted = self.bboxes[self._order, 0]
+        self._max_width = ((self.bboxes[:, 2] - self.bboxes[:, 0]).max()
+                           if self.bboxes.shape[0] else 0)
+
+    def __len__(self):
+        return self.bboxes.shape[0]
+
+    def query(self, bboxes):
+        '''
+        Find indexed boxes overlapping query boxes (boxes touching along an
+        edge are considered overlapping).
+
+        Parameters
+        ----------
+        bboxes : numpy.ndarray
+            ``(m, 4)`` array of query boxes (same format as the indexed
+            boxes).
+
+        Returns
+        -------
+        (query_i, index_i) : (numpy.ndarray, numpy.ndarray)
+            Positions of query box and indexed box of each overlapping pair.
+        '''
+        bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+        # Indexed boxes with `x_min` in `[query x_min - max width, query
+        # x_max]` are contiguous in sorted order and include all boxes
+        # overlapping in `x`.
+        start = np.searchsorted(self._x_min_sorted,
+                                bboxes[:, 0] - self._max_width, side='left')
+        end = np.searchsorted(self._x_min_sorted, bboxes[:, 2], side='right')
+        counts = end - start
+        query_i = np.repeat(np.arange(bboxes.shape[0]), counts)
+        sorted_i = (np.repeat(start - np.cumsum(counts) + counts, counts) +
+                    np.arange(counts.sum()))
+        index_i = self._order[sorted_i]
+
+        a, b = bboxes[query_i], self.bboxes[index_i]
+        overlap = ((b[:, 2] >= a[:, 0]) & (b[:, 1] <= a[:, 3]) &
+                   (b[:, 3] >= a[:, 1]))
+        return query_i[overlap], index_i[overlap]
+
+    def pairs(self):
+        '''
+        Returns
+        -------
+        (i, j) : (numpy.ndarray, numpy.ndarray)
+            Positions of each pair of overlapping indexed boxes, where ``i <
+            j``.
+        '''
+        i, j = self.query(self.bboxes)
+        upper = i < j
+        return i[upper], j[upper]
@@ -0,0 +1,305 @@
+# coding: utf-8
+'''
+Streaming SVG output, i.e., SVG source written directly to a file (or
+file-like object) without building an element tree.
+
+Element source is formatted in bulk from coordinate arrays (see
+:func:`format_coordinates`), and the document and layer headers are written
+exactly once.
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from collections import OrderedDict
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import six
+
+from . import INKSCAPE_NSMAP
+
+#: Default format of coordinates, i.e., the 12 significant digits of
+#: ``str(float)`` in Python 2.
+FLOAT_FORMAT = '%.12g'
+
+XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+
+#: Namespace prefixes declared on the ``svg:svg`` element of every document.
+DOCUMENT_NAMESPACES = OrderedDict([('ev', 'http://www.w3.org/2001/xml-events'),
+                                   ('inkscape', INKSCAPE_NSMAP['inkscape']),
+                                   ('xlink', 'http://www.w3.org/1999/xlink')])
+
+#: Conventional prefixes of namespaces (e.g., of attributes in Inkscape
+#: documents).
+NAMESPACE_PREFIXES = dict([(uri, prefix) for prefix, uri in
+                           six.iteritems(DOCUMENT_NAMESPACES)] +
+                          [('http://sodipodi.sourceforge.net/DTD/'
+                            'sodipodi-0.dtd', 'sodipodi'),
+                           ('http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+                            'rdf'),
+                           ('http://creativecommons.org/ns#', 'cc'),
+                           ('http://purl.org/dc/elements/1.1/', 'dc'),
+                           (XML_NAMESPACE, 'xml')])
+
+
+def format_coordinates(values, float_format=FLOAT_FORMAT):
+    '''
+    Format array of coordinates (all values at once).
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Array of coordinates.
+    float_format : str, optional
+        Format of each coordinate.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of formatted coordinates (same shape as :data:`values`).
+
+    Examples
+    --------
+
+    >>> print(' '.join(format_coordinates([[0., 1.5], [1e-7, 2 / 3.]]).ravel()))
+    0 1.5 1e-07 0.666666666667
+    '''
+    values = np.asarray(values, dtype=float)
+    return np.char.mod(float_format, values).reshape(values.shape)
+
+
+def escape_attribute(values):
+    '''
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Array of strings.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of strings escaped for use as (double-quoted) XML attribute
+        values.
+    '''
+    values = np.asarray(values, dtype=six.text_type)
+    for char, entity in (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'),
+                         ('"', '&quot;')):
+        values = np.char.replace(values, char, entity)
+    return values
+
+
+def qualify_attribute_names(names):
+    '''
+    Map attribute names in `Clark notation`_ (e.g., as returned by
+    :mod:`lxml` for namespaced attributes) to prefixed XML attribute names.
+
+    .. _Clark notation: http://www.jclark.com/xml/xmlns.htm
+
+    Parameters
+    ----------
+    names : list
+        Attribute names, e.g., ``"id"`` or
+        ``"{http://www.inkscape.org/namespaces/inkscape}label"``.
+
+    Returns
+    -------
+    (qualified_names, namespaces) : (dict, OrderedDict)
+        Prefixed name (e.g., ``"inkscape:label"``) of each attribute name,
+        and URI of each prefix that is not declared by default (see
+        :data:`DOCUMENT_NAMESPACES`).  Namespaces without a conventional
+        prefix (see :data:`NAMESPACE_PREFIXES`) are assigned prefixes
+        ``ns0``, ``ns1``, etc.
+
+    Examples
+    --------
+
+    >>> names, namespaces = qualify_attribute_names(
+    ...     ['id', '{http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd}type',
+    ...      '{http://example.com/a}b'])
+    >>> print(' '.join(names[k] for k in sorted(names)))
+    id ns0:b sodipodi:type
+    >>> print(' '.join(namespaces))
+    sodipodi ns0
+    '''
+    qualified_names = {}
+    namespaces = OrderedDict()
+    prefixes = {}
+    for name in names:
+        if not name.startswith('{'):
+            qualified_names[name] = name
+            continue
+        uri, local_name = name[1:].split('}', 1)
+        if uri not in prefixes:
+            prefix = NAMESPACE_PREFIXES.get(uri)
+            if prefix is None:
+                prefix = 'ns%d' % sum(1 for prefix_i in prefixes.values()
+                                      if prefix_i.startswith('ns'))
+            prefixes[uri] = prefix
+            if prefix not in DOCUMENT_NAMESPACES and uri != XML_NAMESPACE:
+                namespaces[prefix] = uri
+        qualified_names[name] = '%s:%s' % (prefixes[uri], local_name)
+    return qualified_names, namespaces
+
+
+def format_attributes(df_attributes):
+    '''
+    Format attributes of one element per row (all rows at once).
+
+    Parameters
+    ----------
+    df_attributes : pandas.DataFrame
+        Table of attribute values, with one column per attribute.  Missing
+        values (e.g., ``None``) are omitted.
+
+        Columns must be valid XML attribute names, i.e., namespaced
+        attributes must be prefixed (see :func:`qualify_attribute_names`).
+
+    Returns
+    -------
+    numpy.ndarray
+        Attribute source (e.g., `` id="a" style="fill:#f00"``) of each row.
+    '''
+    result = np.empty(df_attributes.shape[0], dtype=object)
+    result[:] = ''
+    for name in sorted(df_attributes.columns):
+        values = df_attributes[name].values
+        valid = ~pd.isnull(values)
+        if not valid.any():
+            continue
+        strings = escape_attribute([six.text_type(v) for v in values[valid]])
+        result[valid] += (' %s="' % name) + strings.astype(object) + '"'
+    return result
+
+
+class SvgStreamWriter(object):
+    '''
+    Write SVG document source to an output stream.
+
+    The document header (i.e., XML declaration, ``svg:svg`` start tag, and
+    ``svg:defs`` element) is written on construction (or on entering the
+    context), and the document is closed by :meth:`close` (or on exiting the
+    context).
+
+    Parameters
+    ----------
+    output : str or file-like
+        Output file path, or writable (text or binary) file-like object.
+    width, height : float, optional
+        Document size.
+    profile : str, optional
+        SVG profile (i.e., ``"full"`` or ``"tiny"``).
+    style : str, optional
+        CSS style sheet (written to the ``svg:defs`` element).
+    namespaces : dict, optional
+        URI of each additional namespace prefix to declare (see
+        :func:`qualify_attribute_names`).
+
+    Examples
+    --------
+
+    >>> output = io.StringIO()
+    >>> with SvgStreamWriter(output, 10, 10) as writer:
+    ...     with writer.layer('Layer 1'):
+    ...         writer.write('<path d="M 0,0 L 1,0 L 1,1 Z" />')
+    >>> print(output.getvalue()[output.getvalue().index('<g'):])
+    <g id="layer1" inkscape:groupmode="layer" inkscape:label="Layer 1"><path d="M 0,0 L 1,0 L 1,1 Z" /></g></svg>
+    '''
+    def __init__(self, output, width=None, height=None, profile='full',
+                 style=None, namespaces=None):
+        if isinstance(output, six.string_types):
+            self._file = io.open(output, 'w', encoding='utf-8')
+            self.output = self._file
+        else:
+            self._file = None
+            self.output = output
+        if isinstance(self.output, io.TextIOBase):
+            self._write = self.output.write
+        elif six.PY2 or isinstance(self.output, (io.RawIOBase,
+                                                 io.BufferedIOBase)):
+            # Binary output.
+            self._write = lambda text: self.output.write(text
+                                                         .encode('utf-8'))
+        else:
+            self._write = self.output.write
+        self._open_layers = 0
+        self._write_header(width, height, profile, style, namespaces or {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _write_header(self, width, height, profile, style, namespaces):
+        attributes = [('baseProfile', profile),
+                      ('height', height),
+                      ('version', '1.2' if profile == 'tiny' else '1.1'),
+                      ('width', width),
+                      ('xmlns', 'http://www.w3.org/2000/svg')]
+        namespaces = [(prefix, uri) for prefix, uri in
+                      sorted(namespaces.items())
+                      if prefix not in DOCUMENT_NAMESPACES]
+        attributes += [('xmlns:%s' % prefix, escape_attribute([uri])[0])
+                       for prefix, uri in
+                       list(DOCUMENT_NAMESPACES.items()) + namespaces]
+        self.write('<?xml version="1.0" encoding="utf-8" ?>\n<svg%s>' %
+                   ''.join(' %s="%s"' % (k, v) for k, v in attributes
+                           if v is not None))
+        if style:
+            self.write('<defs><style type="text/css"><![CDATA[%s]]></style>'
+                       '</defs>' % style)
+        else:
+            self.write('<defs />')
+
+    def write(self, text):
+        '''
+        Write (already formatted) SVG source.
+        '''
+        self._write(text)
+
+    def write_lines(self, lines):
+        '''
+        Write sequence of (already formatted) element sources at once.
+        '''
+        self._write(''.join(lines))
+
+    def begin_layer(self, layer_name, layer_number=1):
+        '''
+        Write start tag of Inkscape layer group.
+        '''
+        self.write('<g id="layer%d" inkscape:groupmode="layer" '
+                   'inkscape:label="%s">' %
+                   (layer_number, escape_attribute([layer_name])[0]))
+        self._open_layers += 1
+
+    def end_layer(self):
+        '''
+        Write end tag of Inkscape layer group.
+        '''
+        self.write('</g>')
+        self._open_layers -= 1
+
+    @contextlib.contextmanager
+    def layer(self, layer_name, layer_number=1):
+        '''
+        Context manager writing start tag of Inkscape layer group on enter,
+        and end tag on exit.
+        '''
+        self.begin_layer(layer_name, layer_number)
+        yield self
+        self.end_layer()
+
+    def close(self):
+        '''
+        Close any open layers and the document.  If the output was specified
+        as a file path, the file is also closed.
+        '''
+        if self.output is None:
+            return
+        while self._open_layers:
+            self.end_layer()
+        self.write('</svg>')
+        if self._file is not None:
+            self._file.close()
+        self.output = None
@@ -0,0 +1,189 @@
+# coding: utf-8
+'''
+Index of (Inkscape) layers of an SVG document, and loading of shapes from
+selected layers only.
+
+Both are implemented as a single streaming pass over the document (see
+:func:`lxml.etree.iterparse`), where elements outside the selected layers are
+discarded as soon as they are parsed, i.e., the full element tree is never
+materialized.
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from collections import namedtuple
+
+from lxml import etree
+import six
+
+from ..transform import compose_transforms, parse_transform
+from .walk import (_GROUP_TAG, _GROUPMODE_ATTRIB, _LABEL_ATTRIB,
+                   _NON_RENDERED_TAGS, SHAPE_TAGS, SVG_NAMESPACE,
+                   ShapeElement)
+
+
+class LayerInfo(namedtuple('LayerInfo', 'label id parent shape_count')):
+    '''
+    Layer found by :func:`index_layers`.
+
+    Attributes
+    ----------
+    label : str or None
+        ``inkscape:label`` attribute of layer group.
+    id : str or None
+        ``id`` attribute of layer group.
+    parent : str or None
+        Label of the enclosing layer (or ``None`` for top-level layers).
+    shape_count : int
+        Number of shape elements in the layer (not including shapes in
+        sub-layers).
+    '''
+    __slots__ = ()
+
+
+def _iterparse(svg_source):
+    # `iterparse` only accepts exact `str`/`unicode` file paths (not
+    # subclasses, e.g., `path_helpers.path`).
+    for type_ in (six.binary_type, six.text_type):
+        if isinstance(svg_source, type_):
+            svg_source = type_(svg_source)
+    return etree.iterparse(svg_source, events=('start', 'end'))
+
+
+def _is_layer(element):
+    return (element.tag == _GROUP_TAG and
+            element.get(_GROUPMODE_ATTRIB) == 'layer')
+
+
+def index_layers(svg_source, tags=SHAPE_TAGS):
+    '''
+    Index layers of SVG document in one streaming pass (the element tree is
+    discarded while parsing).
+
+    Parameters
+    ----------
+    svg_source : str or file-like
+        A file path, URI, or file-like object.
+    tags : list, optional
+        Local names of (SVG namespace) shape elements to count.
+
+    Returns
+    -------
+    list
+        List of :class:`LayerInfo`, in document order.
+    '''
+    shape_tags = set('{%s}%s' % (SVG_NAMESPACE, tag) for tag in tags)
+    layers = []
+    # Position in `layers` of each enclosing layer.
+    stack = []
+    # Depth of nested non-rendered containers (e.g., `svg:defs`).
+    hidden = 0
+    for event, element in _iterparse(svg_source):
+        if not isinstance(element.tag, six.string_types):
+            continue
+        if element.tag in _NON_RENDERED_TAGS:
+            hidden += 1 if event == 'start' else -1
+        elif hidden:
+            pass
+        elif event == 'start':
+            if _is_layer(element):
+                parent = layers[stack[-1]].label if stack else None
+                stack.append(len(layers))
+                layers.append(LayerInfo(element.get(_LABEL_ATTRIB),
+                                        element.get('id'), parent, 0))
+            elif element.tag in shape_tags and stack:
+                layers[stack[-1]] = layers[stack[-1]]._replace(
+                    shape_count=layers[stack[-1]].shape_count + 1)
+        elif _is_layer(element):
+            stack.pop()
+        if event == 'start':
+            continue
+        # Discard parsed element (and any preceding siblings).  Note that
+        # the root element has no parent (but may have preceding siblings,
+        # e.g., comments).
+        element.clear()
+        parent = element.getparent()
+        while parent is not None and element.getprevious() is not None:
+            del parent[0]
+    return layers
+
+
+def iter_layer_shapes(svg_source, layers, tags=SHAPE_TAGS):
+    '''
+    Yield shape elements from selected layers of SVG document, in one
+    streaming pass.
+
+    Only shape elements within the selected layers (including their
+    sub-layers) are kept in memory; all other elements are discarded as soon
+    as they are parsed.  As with :func:`svg_model.svgload.walk.iter_shapes`,
+    shapes in non-rendered containers (e.g., ``svg:defs``) are skipped.
+
+    Parameters
+    ----------
+    svg_source : str or file-like
+        A file path, URI, or file-like object.
+    layers : str or list
+        Label (i.e., ``inkscape:label``) or list of labels of layers to load.
+    tags : list, optional
+        Local names of (SVG namespace) shape elements to yield.
+
+    Yields
+    ------
+    svg_model.svgload.walk.ShapeElement
+        Shape element, with cumulative transform and (innermost) layer.
+
+    Raises
+    ------
+    KeyError
+        If any of the selected layers is not found in the document (raised
+        after yielding the shapes of all layers that were found).
+    '''
+    if isinstance(layers, six.string_types):
+        layers = [layers]
+    layers = set(layers)
+    shape_tags = set('{%s}%s' % (SVG_NAMESPACE, tag) for tag in tags)
+    found = set()
+
+    # Stack of `(transform, layer, selected, hidden)` of each open element,
+    # where `selected` is `True` within selected layers, and `hidden` is
+    # `True` within non-rendered containers.
+    stack = [(None, None, False, False)]
+    for event, element in _iterparse(svg_source):
+        if not isinstance(element.tag, six.string_types):
+            continue
+        if event == 'start':
+            parent_transform, layer, selected, hidden = stack[-1]
+            transform = compose_transforms(parent_transform,
+                                           parse_transform(element
+                                                           .get('transform',
+                                                                '')))
+            if element.tag in _NON_RENDERED_TAGS:
+                hidden = True
+            elif _is_layer(element) and not hidden:
+                layer = element.get(_LABEL_ATTRIB)
+                if layer in layers:
+                    found.add(layer)
+                    selected = True
+            stack.append((transform, layer, selected, hidden))
+            continue
+
+        transform, layer, selected, hidden = stack.pop()
+        if selected:
+            if element.tag in shape_tags and not hidden:
+                yield ShapeElement(element, transform, layer)
+        elif not any(_is_layer(child) and child.get(_LABEL_ATTRIB) in layers
+                     for child in element.iter(_GROUP_TAG)):
+            # Discard element outside of (and not containing) selected
+            # layers, along with preceding discarded (i.e., cleared)
+            # siblings.  Note that the element itself may not be removed
+            # from the tree while parsing.
+            element.clear()
+            parent = element.getparent()
+            previous = element.getprevious()
+            while (parent is not None and previous is not None and
+                   not len(previous) and not _is_layer(previous)):
+                parent.remove(previous)
+                previous = element.getprevious()
+    missing = layers - found
+    if missing:
+        raise KeyError('Layer(s) not found: %s' %
+                       ', '.join(sorted(map(six.text_type, missing))))
@@ -15,6 +15,13 @@ Redistribution and use in source and binary forms, with or without modification,
 THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 '''
 from __future__ import unicode_literals
+import re
+
+import numpy as np
+
+from ..curves import (CURVE_TOLERANCE, CURVE_ARG_COUNTS, curve_segments,
+                      splice_curves)
+from ..color import parse_color, parse_style
 from ..loop import Loop
 from ..geo_path import ColoredPath
 
@@ -23,41 +30,111 @@ class ParseError(Exception):
     pass
 
 
+#: Path command character, i.e., any character other than whitespace, commas,
+#: and number characters.
+cre_path_command = re.compile(r'([^\s,\d.eE+-])')
+#: Path number, e.g., ``2``, ``-1.23``, ``.5``, ``23e39``, ``1.23e-6``.
+cre_path_number = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+cre_path_token = re.compile(r'(?P<number>%s)|(?P<separator>\s+)|'
+                            r'(?P<comma>,)|(?P<invalid>.)' %
+                            cre_path_number.pattern, re.S)
+
+
 class PathDataParser(object):
+    '''
+    Tokenize SVG path data (i.e., ``d`` attribute of ``path`` element).
 
-    def __init__(self):
-        self.data = None
-        self.pos = 0
+    The path data is split into commands and runs of arguments with a single
+    compiled regular expression, and the numbers of *all* commands are
+    converted at once (see :meth:`to_arrays`).
 
-    def get_char(self, allowed):
-        if self.pos < len(self.data) and self.data[self.pos] in allowed:
-            self.pos += 1
-            return self.data[self.pos - 1]
+    .. versionchanged:: 0.9.2
+        Add support for float exponent strings (e.g., ``3.435e-7``).
 
-    def get_chars(self, allowed):
-        start = self.pos
-        while self.get_char(allowed):
-            pass
-        return self.data[start:self.pos]
+        Fixes `issue #4 <https://github.com/wheeler-microfluidics/svg-model/issues/4>`.
+    '''
+    def __init__(self):
+        self.data = None
 
-    def get_number(self):
+    def _raise_args_error(self, position, args):
         '''
-        .. versionchanged:: 0.9.2
-            Add support for float exponent strings (e.g., ``3.435e-7``).
-
-            Fixes `issue #4 <https://github.com/wheeler-microfluidics/svg-model/issues/4>`.
+        Raise :class:`ParseError` for first invalid token in arguments string
+        :data:`args` starting at :data:`position` of :attr:`data`.
         '''
-        number = None
-        start = self.get_char('0123456789.-')
-        if start:
-            number = start
-            finish = self.get_chars('-e0123456789.')
-            if finish:
-                number += finish
-        if any(c in number for c in '.e'):
-            return float(number)
-        else:
-            return int(number)
+        numbers = 0
+        for match_i in cre_path_token.finditer(args):
+            position_i = position + match_i.start()
+            if match_i.group('number'):
+                numbers += 1
+            elif match_i.group('comma') and not numbers:
+                msg = 'unexpected comma at %d in %r' % (position_i, self.data)
+                raise ParseError(msg)
+            elif match_i.group('invalid'):
+                msg = 'invalid number at %d in %r' % (position_i, self.data)
+                raise ParseError(msg)
+
+    def _tokenize(self, data):
+        '''
+        Returns
+        -------
+        (commands, numbers, counts) : (list, list, list)
+            Command characters, number strings of all commands, and number of
+            arguments of each command.
+        '''
+        self.data = data
+        # `[prefix, command, args, command, args, ...]`
+        parts = cre_path_command.split(data)
+        prefix = parts[0].lstrip()
+        if prefix:
+            position = len(parts[0]) - len(prefix)
+            if prefix[0] == ',':
+                msg = 'unexpected comma at %d in %r' % (position, data)
+            else:
+                msg = 'missing command at %d in %r' % (position, data)
+            raise ParseError(msg)
+
+        commands = parts[1::2]
+        numbers = []
+        counts = []
+        position = len(parts[0])
+        for args in parts[2::2]:
+            # Skip command character.
+            position += 1
+            numbers_i = cre_path_number.findall(args)
+            if (args.lstrip()[:1] == ',' or
+                    cre_path_number.sub('', args).strip(' \t\r\n,')):
+                self._raise_args_error(position, args)
+            numbers.extend(numbers_i)
+            counts.append(len(numbers_i))
+            position += len(args)
+        return commands, numbers, counts
+
+    def to_arrays(self, data):
+        '''
+        Parse path data to array form.
+
+        Parameters
+        ----------
+        data : str
+            Path data, e.g., ``'M 46,74 L 35,12 l 53,-13 z'``.
+
+        Returns
+        -------
+        (commands, values, counts) : (list, numpy.ndarray, numpy.ndarray)
+            Command characters, e.g., ``['M', 'L', 'l', 'z']``, arguments of
+            all commands as a single float array, e.g., ``[46, 74, 35, 12, 53,
+            -13]``, and number of arguments of each command, e.g., ``[2, 2, 2,
+            0]``.
+
+        Raises
+        ------
+        ParseError
+            If :data:`data` does not start with a command, a comma precedes
+            the arguments of a command, or an argument is not a number.
+        '''
+        commands, numbers, counts = self._tokenize(data)
+        return (commands, np.array(numbers, dtype=float),
+                np.array(counts, dtype=int))
 
     def to_tuples(self, data):
         '''
@@ -69,35 +146,23 @@ class PathDataParser(object):
         in the output. The input may have its whitespace stripped out, or its
         commas replaced by whitespace.
         '''
-        self.data = data
-        self.pos = 0
-        parsed = []
-        command = []
-
-        while self.pos < len(self.data):
-            indicator = self.data[self.pos]
-            if indicator == ' ':
-                self.pos += 1
-            elif indicator == ',':
-                if len(command) >= 2:
-                    self.pos += 1
-                else:
-                    msg = 'unexpected comma at %d in %r' % (self.pos, self.data)
-                    raise ParseError(msg)
-            elif indicator in '0123456789.-':
-                if command:
-                    command.append(self.get_number())
-                else:
-                    msg = 'missing command at %d in %r' % (self.pos, self.data)
-                    raise ParseError(msg)
-            else:
-                if command:
-                    parsed.append(tuple(command))
-                command = [indicator]
-                self.pos += 1
+        commands, numbers, counts = self._tokenize(data)
+        if not commands:
+            return []
+        values = np.array(numbers, dtype=float).astype(object)
+        if numbers:
+            # Integer strings (i.e., without decimal point or exponent) are
+            # converted to `int`.
+            integer = np.char.isdigit(np.char.lstrip(np.array(numbers),
+                                                     '+-'))
+            values[integer] = values[integer].astype(int).tolist()
+        values = values.tolist()
 
-        if command:
-            parsed.append(tuple(command))
+        parsed = []
+        start = 0
+        for command, count in zip(commands, counts):
+            parsed.append((command, ) + tuple(values[start:start + count]))
+            start += count
 
         if parsed[0][0] == 'M' and parsed[-1][0] == 'L'\
                 and parsed[0][1:] == parsed[-1][1:]:
@@ -105,53 +170,215 @@ class PathDataParser(object):
         return parsed
 
 
+#: Number of arguments of each line command.
+LINE_ARG_COUNTS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'Z': 0}
+
+
+def absolute_coordinates(values, absolute):
+    '''
+    Convert mixed absolute/relative coordinates (along a single axis) to
+    absolute coordinates using a cumulative sum.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Coordinate of each vertex, either absolute or relative to the previous
+        vertex.
+    absolute : numpy.ndarray
+        ``True`` for each absolute value (the first value must be absolute).
+
+    Returns
+    -------
+    numpy.ndarray
+        Absolute coordinates, i.e., the last absolute value plus the sum of
+        the relative values since.
+
+    Examples
+    --------
+
+    >>> absolute_coordinates(np.array([1., 2, 3, 10, 4]),
+    ...                      np.array([True, False, False, True, False])).tolist()
+    [1.0, 3.0, 6.0, 10.0, 14.0]
+    '''
+    relative_sums = np.cumsum(np.where(absolute, 0, values))
+    last_absolute = np.maximum.accumulate(np.where(absolute,
+                                                   np.arange(values.size), 0))
+    return (values[last_absolute] + relative_sums -
+            relative_sums[last_absolute])
+
+
 class LoopTracer(object):
-    def __init__(self):
+    '''
+    Trace closed loops of SVG path commands.
+
+    The vertices of each loop are accumulated in a NumPy buffer (one block per
+    command, including implicitly repeated coordinates), and relative
+    coordinates are converted to absolute coordinates with a cumulative sum
+    (see :func:`absolute_coordinates`).
+
+    Parameters
+    ----------
+    tolerance : float, optional
+        Maximum distance between curves (i.e., ``C``, ``S``, ``Q``, ``T``,
+        ``A`` commands) and the line segments they are flattened to.
+    '''
+    def __init__(self, tolerance=CURVE_TOLERANCE):
         self.loops = []
+        self.tolerance = tolerance
 
-    def get_point(self, command):
-        x = command[1]
-        y = command[2]
-        return x, y
-
-    def onVerticalMove(self, command):
-        y = command[1]
-        prev_x, prev_y = self.current_loop[-1]
-        if command[0] == 'v':
-            new_y = prev_y + y
-        else:
-            new_y = y
-        self.current_loop.append((prev_x, new_y))
-
-    def onHorizontalMove(self, command):
-        x = command[1]
-        prev_x, prev_y = self.current_loop[-1]
-        if command[0] == 'h':
-            new_x = prev_x + x
-        else:
-            new_x = x
-        self.current_loop.append((new_x, prev_y))
-
-    def onMove(self, command):
-        x, y = self.get_point(command)
-        self.current_loop = [(x, y)]
-
-    def onLine(self, command):
-        x, y = self.get_point(command)
-        self.current_loop.append((x, y))
-
-    def onClose(self, command):
-        if self.current_loop[0] == self.current_loop[-1]:
-            self.current_loop = self.current_loop[:-1]
-        if len(self.current_loop) < 3:
-            raise ParseError('loop needs 3 or more verts')
-        loop = Loop(self.current_loop)
-        self.loops.append(loop)
-        self.current_loop = None
-
-    def onBadCommand(self, action):
-        msg = 'unsupported svg path command: %s' % (action,)
-        raise ParseError(msg) 
+    def _trace_subpath(self, subpath, current):
+        '''
+        Parameters
+        ----------
+        subpath : list
+            List of ``(command, args)`` tuples, starting with a move command.
+        current : numpy.ndarray
+            Current point before subpath.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(n, 2)`` array of absolute subpath vertices (curves flattened).
+        '''
+        # Current point is prepended as an absolute vertex, i.e., as the
+        # reference for relative coordinates of the first command.
+        blocks = [current[None]]
+        absolute = [np.ones((1, 2), dtype=bool)]
+        # Curve commands, as `(vertex position, command, args, continues)`
+        # tuples, where `continues` is `True` if the previous command is a
+        # curve (i.e., control points may be reflected).
+        curves = []
+        position = 0
+        previous_curve = False
+
+        for command, args in subpath:
+            kind = command.upper()
+            relative = command != kind
+            arg_count = (CURVE_ARG_COUNTS[kind] if kind in CURVE_ARG_COUNTS
+                         else LINE_ARG_COUNTS[kind])
+            if not args.size or args.size % arg_count:
+                # Missing or incomplete (trailing) coordinates.
+                raise ParseError('invalid number of arguments for command '
+                                 '%s: %d' % (command, args.size))
+            if kind in CURVE_ARG_COUNTS:
+                curves.append((position, command, args, previous_curve))
+                # End point of each curve segment, as a placeholder for the
+                # flattened segment.
+                block = args.reshape(-1, arg_count)[:, -2:]
+                absolute_i = (not relative, not relative)
+                previous_curve = True
+            else:
+                zeros = np.zeros(args.size)
+                if kind == 'H':
+                    block = np.column_stack([args, zeros])
+                    absolute_i = (not relative, False)
+                elif kind == 'V':
+                    block = np.column_stack([zeros, args])
+                    absolute_i = (False, not relative)
+                else:
+                    # Coordinates after the first pair of a move command are
+                    # implicit line commands.
+                    block = args.reshape(-1, 2)
+                    absolute_i = (not relative, not relative)
+                previous_curve = False
+            blocks.append(block)
+            absolute.append(np.tile(absolute_i, (block.shape[0], 1)))
+            position += block.shape[0]
+
+        xy = np.concatenate(blocks)
+        absolute = np.concatenate(absolute)
+        points = np.column_stack([absolute_coordinates(xy[:, i],
+                                                       absolute[:, i])
+                                  for i in range(2)])[1:]
+
+        if curves:
+            segments = []
+            control = None
+            for position_i, command_i, args_i, continues_i in curves:
+                try:
+                    segments_i, control = \
+                        curve_segments(command_i, args_i.tolist(),
+                                       tuple(points[position_i - 1]),
+                                       control if continues_i else None)
+                except ValueError as exception:
+                    raise ParseError(str(exception))
+                segments.extend((position_i + k, kind_k, values_k)
+                                for k, (kind_k, values_k) in
+                                enumerate(segments_i))
+            points = splice_curves(points, segments, self.tolerance)
+        return points
+
+    def trace(self, commands, values, counts, open_paths=False):
+        '''
+        Trace loops of path commands in array form (see
+        :meth:`PathDataParser.to_arrays`).
+
+        Parameters
+        ----------
+        commands : list
+            Command characters.
+        values : numpy.ndarray
+            Arguments of all commands.
+        counts : numpy.ndarray
+            Number of arguments of each command.
+        open_paths : bool, optional
+            If ``True``, vertices of unclosed subpaths (i.e., not closed with
+            ``Z`` and not ending at start point) are also returned, in order.
+            Otherwise, unclosed subpaths are ignored.
+
+        Returns
+        -------
+        list
+            ``(n, 2)`` array of vertices of each closed loop.  The final point
+            of each loop is eliminated if it is equal to the first.
+        '''
+        values = np.asarray(values, dtype=float)
+        counts = np.asarray(counts, dtype=int)
+        starts = np.cumsum(counts) - counts
+        loops = []
+        current = np.zeros(2)
+        subpath = None
+
+        def _close(subpath, require_closed=False):
+            points = self._trace_subpath(subpath, current)
+            closed = (points[0] == points[-1]).all()
+            if require_closed and not closed:
+                # Unclosed subpath (i.e., not closed with `Z` and not ending
+                # at start point) is not a loop.
+                if open_paths:
+                    loops.append(points)
+                return points[-1]
+            if closed:
+                points = points[:-1]
+            if points.shape[0] < 3:
+                raise ParseError('loop needs 3 or more verts')
+            loops.append(points)
+            # Closing a subpath moves the current point to its start point.
+            return points[0]
+
+        for command, start, count in zip(commands, starts, counts):
+            kind = command.upper()
+            if kind not in LINE_ARG_COUNTS and kind not in CURVE_ARG_COUNTS:
+                msg = 'unsupported svg path command: %s' % (command,)
+                raise ParseError(msg)
+            args = values[start:start + count]
+            if kind == 'M':
+                if subpath is not None:
+                    current = _close(subpath, require_closed=True)
+                subpath = [(command, args)]
+            elif kind == 'Z':
+                if subpath is not None:
+                    current = _close(subpath)
+                subpath = None
+            else:
+                if subpath is None:
+                    # Commands after `Z` start a new subpath at the current
+                    # point.
+                    subpath = [('M', current)]
+                subpath.append((command, args))
+        if subpath is not None:
+            _close(subpath, require_closed=True)
+        return loops
 
     def to_loops(self, commands):
         '''
@@ -168,39 +395,41 @@ class LoopTracer(object):
             L x,y: line, draw boundary
             H x: move horizontal
             V y: move vertical
+            C x1,y1 x2,y2 x,y: cubic Bezier curve
+            S x2,y2 x,y: smooth cubic Bezier curve
+            Q x1,y1 x,y: quadratic Bezier curve
+            T x,y: smooth quadratic Bezier curve
+            A rx,ry x-axis-rotation large-arc-flag,sweep-flag x,y: arc
             Z: close current loop - join to start point
         Lower-case command letters (eg 'm') indicate a relative offset.
+        Coordinates may be repeated without repeating the command letter (eg
+        'M 1,2 3,4' is a move followed by a line).
+        Curves are flattened to line segments (see `tolerance`).
         See http://www.w3.org/TR/SVG11/paths.html
-        '''
-        lookup = {
-            'M': self.onMove,
-            'L': self.onLine,
-            'H': self.onHorizontalMove,
-            'h': self.onHorizontalMove,
-            'V': self.onVerticalMove,
-            'v': self.onVerticalMove,
-            'Z': self.onClose,
-            'z': self.onClose,
-        }
-        self.loops = []
-        self.current_loop = None
 
-        for command in commands:
-            action = command[0]
-            if action in lookup:
-                lookup[action](command)
-            else:
-                self.onBadCommand(action)
+        See :meth:`trace` to trace loops of commands in array form.
+        '''
+        actions = [command[0] for command in commands]
+        counts = [len(command) - 1 for command in commands]
+        values = np.array([value for command in commands
+                           for value in command[1:]], dtype=float)
+        self.loops = [Loop(points)
+                      for points in self.trace(actions, values, counts)]
         return self.loops
 
 
-
 class PathParser(object):
     '''
     parse(path_tag) returns an SvgPath object()
+
+    Curves are flattened to line segments with a maximum error of
+    `tolerance`.
     '''
     next_id = 1
 
+    def __init__(self, tolerance=CURVE_TOLERANCE):
+        self.tolerance = tolerance
+
 
     def get_id(self, attributes):
         if 'id' in list(attributes.keys()):
@@ -212,16 +441,12 @@ class PathParser(object):
 
     def parse_color(self, color):
         '''
-        color : string, eg: '#rrggbb' or 'none'
-        (where rr, gg, bb are hex digits from 00 to ff)
+        color : string, eg: '#rrggbb', '#rgb', 'rgb(r, g, b)', a named color,
+        or 'none' (see `svg_model.color.parse_color`)
         returns a triple of unsigned bytes, eg: (0, 128, 255)
         '''
-        if color == 'none':
-            return None
-        return (
-            int(color[1:3], 16),
-            int(color[3:5], 16),
-            int(color[5:7], 16))
+        rgba = parse_color(color)
+        return None if rgba is None else rgba[:3]
 
 
     def parse_style(self, style):
@@ -230,13 +455,12 @@ class PathParser(object):
             fill:#ff2a2a;fill-rule:evenodd;stroke:none;stroke-width:1px;
             stroke-linecap:butt;stroke-linejoin:miter;stroke-opacity:1
         returns color as a triple of unsigned bytes: (r, g, b), or None
+
+        Parsed styles are cached by style string (see
+        `svg_model.color.parse_style`).
         '''
-        style_elements = style.split(';')
-        while style_elements:
-            element = style_elements.pop()
-            if element.startswith('fill:'):
-                return self.parse_color(element[5:])
-        return None
+        fill, properties = parse_style(style)
+        return None if fill is None else fill[:3]
 
 
     def parse(self, tag):
@@ -250,7 +474,7 @@ class PathParser(object):
         >>> path_tag = etree.XML("""
         ...     <path id="path0"
         ...         style="fill:#0000ff;stroke:#000000;stroke-width:0.10000000000000001;stroke-miterlimit:4;stroke-dasharray:none"
-        ...         d="M 525.93385,261.47322 L 525.933 85,269.65826 L 534.07239,269.65826 L 534.07239,261.47322 L 525.93385,261.47322" />
+        ...         d="M 525.93385,261.47322 L 525.93385,269.65826 L 534.07239,269.65826 L 534.07239,261.47322 L 525.93385,261.47322" />
         ... """)
         >>> path_parser = PathParser()
         >>> id, svg_path = path_parser.parse(path_tag)
@@ -261,28 +485,35 @@ class PathParser(object):
         >>> len(svg_path.loops)
         1
         >>> svg_path.loops[0].verts
-        [(534.07239, 261.47322), (534.07239, 269.65826), (525.933, 85), (525.93385, 261.47322)]
+        [(525.93385, 261.47322), (525.93385, 269.65826), (534.07239, 269.65826), (534.07239, 261.47322)]
+
+        Relative commands (i.e., lowercase) and implicitly repeated
+        coordinates are also supported.  For example:
+
+        >>> path_tag = E.path(id="path1", d="m 10,20 10,0 v 10 h -10 z")
+        >>> id, svg_path = path_parser.parse(path_tag)
+        >>> svg_path.loops[0].verts
+        [(10.0, 30.0), (20.0, 30.0), (20.0, 20.0), (10.0, 20.0)]
 
-        Note that only absolute commands (i.e., uppercase) are currently supported.  For example:
-        paths will throw a ParseError exception.  For example:
+        Unsupported commands throw a ParseError exception.  For example:
 
-        >>> path_tag = E.path(id="path0", d="M 636.0331,256.9345 l 636.0331,256.9345")
+        >>> path_tag = E.path(id="path0", d="M 636.0331,256.9345 X 636.0331,256.9345")
         >>> print etree.tostring(path_tag)
-        <path d="M 636.0331,256.9345 l 636.0331,256.9345" id="path0"/>
+        <path d="M 636.0331,256.9345 X 636.0331,256.9345" id="path0"/>
         >>> path_parser.parse(path_tag)
         Traceback (most recent call last):
         ...
-        ParseError: unsupported svg path command: l
+        ParseError: unsupported svg path command: X
         >>> 
         '''
         id = self.get_id(tag.attrib)
         
         parser = PathDataParser()
         path_data = tag.attrib['d']
-        path_tuple = parser.to_tuples(path_data)
 
-        tracer = LoopTracer()
-        loops = tracer.to_loops(path_tuple)
+        tracer = LoopTracer(self.tolerance)
+        loops = [Loop(points)
+                 for points in tracer.trace(*parser.to_arrays(path_data))]
         path = ColoredPath(loops)
 
         if 'style' in list(tag.attrib.keys()):
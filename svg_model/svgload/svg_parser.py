@@ -21,9 +21,16 @@ from collections import OrderedDict
 
 from lxml import etree
 from path_helpers import path
+import numpy as np
+import pandas as pd
 from .path_parser import PathParser, ParseError
+from .layers import iter_layer_shapes
+from .walk import iter_shapes
+from ..curves import CURVE_TOLERANCE
 from ..loop import Loop
-from ..geo_path import Path
+from ..geo_path import Path, PathCollection, transform_paths
+from ..mesh import TriangleMesh
+from ..seidel import Triangulator
 import six
 
 
@@ -40,11 +47,17 @@ def parse_warning(*args):
             etree.tostring(tag)), RuntimeWarning)
 
 
-class Svg(object):
+class Svg(PathCollection):
     '''
     Maintains an ordered list of paths, each one corresponding to a path tag
     from an SVG file. Creates a pylget Batch containing all these paths, for
     rendering as a single OpenGL GL_TRIANGLES indexed vert primitive.
+
+    The vertices of all paths may be transformed at once using
+    :meth:`apply_affine`, :meth:`translate`, or :meth:`scale`.
+
+    See :meth:`get_mesh` to get the corresponding indexed triangle mesh
+    directly, e.g., for software rendering.
     '''
     def __init__(self):
         self.paths = OrderedDict()
@@ -62,12 +75,36 @@ class Svg(object):
             svg_path = self.paths[name]
             svg_path.add_to_batch(batch)
 
+    def get_mesh(self):
+        '''
+        Tesselate all paths into a single indexed triangle mesh.
+
+        Returns
+        -------
+        svg_model.mesh.TriangleMesh
+            Mesh containing the triangles of all loops of all paths, where the
+            shape index of the mesh corresponds to the path ids.
+        '''
+        triangles = []
+        shape_codes = []
+        for i, svg_path in enumerate(six.itervalues(self.paths)):
+            for loop in svg_path.loops:
+                triangles_i = Triangulator(loop.points).triangles()
+                triangles.extend(triangles_i)
+                shape_codes.extend([i] * len(triangles_i))
+        return TriangleMesh.from_triangles(np.array(triangles, dtype=float)
+                                           .reshape(-1, 3, 2), shape_codes,
+                                           pd.Index(list(self.paths),
+                                                    name='id'))
+
     def get_bounding_box(self):
-        points = list(self.all_verts())
-        x_vals = zip(*points)[0]
-        y_vals = zip(*points)[1]
-        min_x, min_y = min(x_vals), min(y_vals)
-        max_x, max_y = max(x_vals), max(y_vals)
+        # Combine (cached) bounding boxes of paths, i.e., `(x, y, width,
+        # height)` rows.
+        bboxes = np.array([svg_path.get_bounding_box()
+                           for svg_path in six.itervalues(self.paths)],
+                          dtype=float).reshape(-1, 4)
+        min_x, min_y = bboxes[:, :2].min(axis=0).tolist()
+        max_x, max_y = (bboxes[:, :2] + bboxes[:, 2:]).max(axis=0).tolist()
         return Loop([(min_x, min_y), (min_x, max_y), (max_x, max_y),
                 (max_x, min_y)])
 
@@ -88,11 +125,33 @@ class Svg(object):
 class SvgParser(object):
     '''
     parse(filename) returns an Svg object, populated from the <path> tags
-    in the file.
+    in the file (at any depth, with the transforms of the tags and their
+    ancestors applied).
 
+    Curves are flattened to line segments with a maximum error of
+    `tolerance`.
     '''
-    def parse_file(self, filename, on_error=None):
+    def __init__(self, tolerance=CURVE_TOLERANCE):
+        self.tolerance = tolerance
+
+    def parse_file(self, filename, on_error=None, layers=None):
+        '''
+        Parameters
+        ----------
+        filename : str
+            SVG file path.
+        on_error : function, optional
+            See :meth:`parse`.
+        layers : str or list, optional
+            If not ``None``, only parse paths in the layer(s) with the
+            specified ``inkscape:label``.  Elements outside of the selected
+            layers are discarded while streaming the file (see
+            :func:`svg_model.svgload.layers.iter_layer_shapes`).
+        '''
         self.filename = path(filename)
+        if layers is not None:
+            return self._parse_paths(iter_layer_shapes(self.filename, layers,
+                                                       ('path', )), on_error)
         xml_root = etree.parse(self.filename)
         return self.parse(xml_root, on_error)
 
@@ -118,7 +177,7 @@ class SvgParser(object):
         ...     xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"
         ...     xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
         ...     id="path13231"
-        ...     d="M8 4 l-4,4"
+        ...     d="M8 4 X-4,4"
         ...     linecap="square"
         ...     stroke="#000000"
         ...     stroke-width="0.25"
@@ -127,7 +186,7 @@ class SvgParser(object):
         ...     svg = svg_parser.parse(path_tag, on_error=parse_warning)
         >>> print w[-1].category
         <type 'exceptions.RuntimeWarning'>
-        >>> match = re.search(r'^Error parsing None:\d+, unsupported svg path command: l', str(w[-1].message))
+        >>> match = re.search(r'^Error parsing None:\d+, unsupported svg path command: X', str(w[-1].message))
         >>> print match is None
         False
         >>> path_tag = etree.XML("""
@@ -149,15 +208,32 @@ class SvgParser(object):
         >>> print match is None
         False
         '''
+        # Collect paths at any depth (e.g., in nested layers) in one pass.
+        return self._parse_paths(iter_shapes(xml_root, ('path', )), on_error)
+
+    def _parse_paths(self, shapes, on_error=None):
+        '''
+        Parameters
+        ----------
+        shapes : iterable
+            ``svg:path`` elements, as
+            :class:`svg_model.svgload.walk.ShapeElement` instances.
+        on_error : function, optional
+            See :meth:`parse`.
+
+        Returns
+        -------
+        Svg
+            Parsed paths, centered on the boundary.
+        '''
         svg = Svg()
-        svg_namespace = {'svg': 'http://www.w3.org/2000/svg'}
-        path_tags = xml_root.xpath('(/svg:svg|/svg:svg/svg:g)/svg:path',
-                                   namespaces=svg_namespace)
-        parser = PathParser()
-        for path_tag in path_tags:
+        parser = PathParser(self.tolerance)
+        for path_tag, transform, layer in shapes:
             try:
                 id, svg_path = parser.parse(path_tag)
                 if svg_path.loops:
+                    if transform is not None:
+                        transform_paths([svg_path], transform)
                     svg.add_path(id, svg_path)
             except (ParseError, ) as why:
                 filename = getattr(self, 'filename', None)
@@ -169,6 +245,5 @@ class SvgParser(object):
 
         if svg.paths:
             x, y = svg.get_boundary().get_center()
-            for svg_path in svg.paths.values():
-                svg_path.offset(-x, -y)
+            svg.translate(-x, -y)
         return svg
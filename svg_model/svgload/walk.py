@@ -0,0 +1,98 @@
+# coding: utf-8
+'''
+Single-pass walk of an SVG element tree, collecting shape elements at any
+depth together with their cumulative transform and (Inkscape) layer.
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from collections import namedtuple
+
+import six
+
+from ..transform import compose_transforms, parse_transform
+
+SVG_NAMESPACE = 'http://www.w3.org/2000/svg'
+INKSCAPE_NAMESPACE = 'http://www.inkscape.org/namespaces/inkscape'
+
+#: Local names of shape elements collected by default.
+SHAPE_TAGS = ('path', 'polygon', 'polyline', 'line', 'rect', 'circle',
+              'ellipse')
+
+#: Local names of container elements that are not rendered directly (shapes
+#: within these elements are skipped).
+NON_RENDERED_TAGS = ('defs', 'clipPath', 'marker', 'mask', 'pattern',
+                     'symbol')
+
+_GROUP_TAG = '{%s}g' % SVG_NAMESPACE
+_NON_RENDERED_TAGS = frozenset('{%s}%s' % (SVG_NAMESPACE, tag)
+                               for tag in NON_RENDERED_TAGS)
+_GROUPMODE_ATTRIB = '{%s}groupmode' % INKSCAPE_NAMESPACE
+_LABEL_ATTRIB = '{%s}label' % INKSCAPE_NAMESPACE
+
+
+class ShapeElement(namedtuple('ShapeElement', 'element transform layer')):
+    '''
+    Shape element found by :func:`iter_shapes`.
+
+    Attributes
+    ----------
+    element : lxml.etree._Element
+        Shape element.
+    transform : numpy.ndarray or None
+        ``3x3`` cumulative transform of the element and all its ancestors
+        (i.e., element to document coordinates), or ``None`` if no transforms
+        apply.
+    layer : str or None
+        Label of the innermost Inkscape layer containing the element (or
+        ``None``).
+    '''
+    __slots__ = ()
+
+
+def iter_shapes(root, tags=SHAPE_TAGS):
+    '''
+    Walk SVG element tree (depth-first, in document order) and yield shape
+    elements.
+
+    Each element is visited exactly once, and the transform of each element
+    is composed with the (already resolved) transform of its parent, i.e.,
+    the walk takes time linear in the size of the tree.
+
+    Non-rendered containers (see :data:`NON_RENDERED_TAGS`, e.g., markers and
+    clip paths in ``svg:defs``) are skipped.
+
+    Parameters
+    ----------
+    root : lxml.etree._ElementTree or lxml.etree._Element
+        Parsed SVG document (or element to start walk at).
+    tags : list, optional
+        Local names of (SVG namespace) shape elements to yield.
+
+    Yields
+    ------
+    ShapeElement
+        Shape element, with cumulative transform and layer.
+    '''
+    if hasattr(root, 'getroot'):
+        root = root.getroot()
+    shape_tags = set('{%s}%s' % (SVG_NAMESPACE, tag) for tag in tags)
+
+    # Stack of `(element, parent transform, layer)`.
+    stack = [(root, None, None)]
+    while stack:
+        element, parent_transform, layer = stack.pop()
+        if element.tag in _NON_RENDERED_TAGS:
+            continue
+        transform = compose_transforms(parent_transform,
+                                       parse_transform(element
+                                                       .get('transform', '')))
+        if element.tag in shape_tags:
+            yield ShapeElement(element, transform, layer)
+            continue
+        if (element.tag == _GROUP_TAG and
+                element.get(_GROUPMODE_ATTRIB) == 'layer'):
+            layer = element.get(_LABEL_ATTRIB)
+        # Push children in reverse order to visit them in document order
+        # (skipping comments and processing instructions).
+        stack.extend((child, transform, layer) for child in reversed(element)
+                     if isinstance(child.tag, six.string_types))
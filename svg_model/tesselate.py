@@ -2,15 +2,149 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 import types
+import warnings
 
+import numpy as np
 import pandas as pd
+import six
 from .seidel import Triangulator
 
 
+def tesselate_shape(points):
+    '''
+    Tesselate a single shape path into one or more triangles.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        ``(n, 2)`` array of shape vertex coordinates.  If the end point is the
+        same as the start point, the end point is ignored.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(n_triangles, 3, 2)`` array of ``float64`` triangle vertex
+        coordinates.
+    '''
+    points = np.asarray(points, dtype=float)
+    if (points[0] == points[-1]).all():
+        # XXX End point is the same as the start point (do not include it).
+        points = points[:-1]
+    triangulator = Triangulator(points)
+    return np.array(triangulator.triangles(), dtype=float).reshape(-1, 3, 2)
+
+
+def tesselate_shapes_arrays(df_shapes, shape_i_columns):
+    '''
+    Tesselate each shape path into one or more triangles, returning the
+    triangles in columnar (i.e., array) form.
+
+    Parameters
+    ----------
+    df_shapes : pandas.DataFrame
+        Table containing vertices of shapes, one row per vertex, with the *at
+        least* the following columns:
+         - ``x``: The x-coordinate of the vertex.
+         - ``y``: The y-coordinate of the vertex.
+    shape_i_columns : str or list
+        Column(s) forming key to differentiate rows/vertices for each distinct
+        shape.
+
+    Returns
+    -------
+    (triangles, shape_codes, shape_index) : (numpy.ndarray, numpy.ndarray, pandas.Index)
+        The items in the tuple are:
+         - ``triangles``: ``(n_triangles, 3, 2)`` array of ``float64`` triangle
+           vertex coordinates.
+         - ``shape_codes``: ``(n_triangles, )`` array of ``int32`` codes, where
+           each code is the position of the corresponding shape key in
+           :data:`shape_index`.  Codes are sorted in ascending order, i.e., the
+           triangles of each shape are contiguous.
+         - ``shape_index``: Shape keys (a :class:`pandas.MultiIndex` if
+           :data:`shape_i_columns` contains more than one column).
+    '''
+    if isinstance(shape_i_columns, six.string_types):
+        shape_i_columns = [shape_i_columns]
+
+    shape_keys = []
+    triangle_arrays = []
+    code_arrays = []
+
+    for shape_i, df_path in df_shapes.groupby(shape_i_columns):
+        try:
+            triangles_i = tesselate_shape(df_path[['x', 'y']].values)
+        except Exception as exception:
+            warnings.warn('Error tesselating shape %s: %s' % (shape_i,
+                                                               exception),
+                          RuntimeWarning)
+            continue
+        code_arrays.append(np.full(triangles_i.shape[0], len(shape_keys),
+                                   dtype=np.int32))
+        triangle_arrays.append(triangles_i)
+        shape_keys.append(shape_i)
+
+    if len(shape_i_columns) > 1:
+        shape_index = pd.MultiIndex.from_tuples(shape_keys,
+                                                names=shape_i_columns)
+    else:
+        shape_index = pd.Index(shape_keys, name=shape_i_columns[0])
+
+    if not triangle_arrays:
+        return (np.empty((0, 3, 2), dtype=float),
+                np.empty(0, dtype=np.int32), shape_index)
+    return (np.concatenate(triangle_arrays), np.concatenate(code_arrays),
+            shape_index)
+
+
+def triangles_arrays_to_frame(triangles, shape_codes, shape_index):
+    '''
+    Construct tesselation table from the columnar output of
+    :func:`tesselate_shapes_arrays`.
+
+    Columns are built directly from the input arrays, i.e., without creating
+    any per-vertex Python objects.
+
+    Parameters
+    ----------
+    triangles : numpy.ndarray
+        ``(n_triangles, 3, 2)`` array of triangle vertex coordinates.
+    shape_codes : numpy.ndarray
+        Sorted ``(n_triangles, )`` array of shape codes (i.e., positions in
+        :data:`shape_index`).
+    shape_index : pandas.Index
+        Shape keys, as returned by :func:`tesselate_shapes_arrays`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Table in the format returned by :func:`tesselate_shapes_frame`.
+    '''
+    triangle_count = triangles.shape[0]
+    vertex_codes = np.repeat(shape_codes, 3)
+
+    columns = []
+    for i, name_i in enumerate(shape_index.names):
+        values_i = shape_index.get_level_values(i).values
+        columns.append((name_i, values_i[vertex_codes]))
+
+    # Index of each triangle within the corresponding shape (codes are sorted,
+    # so subtract the position of the first triangle of each shape).
+    triangle_i = (np.arange(triangle_count) -
+                  np.searchsorted(shape_codes, shape_codes, side='left'))
+    points = triangles.reshape(-1, 2)
+    columns += [('triangle_i', np.repeat(triangle_i, 3)),
+                ('vertex_i', np.tile(np.arange(3), triangle_count)),
+                ('x', points[:, 0]), ('y', points[:, 1])]
+    return pd.DataFrame(dict(columns), columns=[c for c, v in columns])
+
+
 def tesselate_shapes_frame(df_shapes, shape_i_columns):
     '''
     Tesselate each shape path into one or more triangles.
 
+    See :func:`tesselate_shapes_arrays` to get the triangles as arrays
+    instead (i.e., without building a table).
+
     Parameters
     ----------
     df_shapes : pandas.DataFrame
@@ -33,27 +167,5 @@ def tesselate_shapes_frame(df_shapes, shape_i_columns):
      - ``triangle_i``: The integer triangle index within each electrode path.
      - ``vertex_i``: The integer vertex index within each triangle.
     '''
-    frames = []
-    if isinstance(shape_i_columns, bytes):
-        shape_i_columns = [shape_i_columns]
-
-    for shape_i, df_path in df_shapes.groupby(shape_i_columns):
-        points_i = df_path[['x', 'y']].values
-        if (points_i[0] == points_i[-1]).all():
-            # XXX End point is the same as the start point (do not include it).
-            points_i = points_i[:-1]
-        try:
-            triangulator = Triangulator(points_i)
-        except:
-            import pdb; pdb.set_trace()
-            continue
-        if not isinstance(shape_i, (list, tuple)):
-            shape_i = [shape_i]
-
-        for i, triangle_i in enumerate(triangulator.triangles()):
-            triangle_points_i = [shape_i + [i] + [j, x, y]
-                                 for j, (x, y) in enumerate(triangle_i)]
-            frames.extend(triangle_points_i)
-    frames = None if not frames else frames
-    return pd.DataFrame(frames, columns=shape_i_columns +
-                        ['triangle_i', 'vertex_i', 'x', 'y'])
+    return triangles_arrays_to_frame(*tesselate_shapes_arrays(df_shapes,
+                                                              shape_i_columns))
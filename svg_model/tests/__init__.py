@@ -0,0 +1,15 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+
+
+def data_path(name):
+    '''
+    Returns
+    -------
+    str
+        Path of data file installed with :mod:`svg_model` (e.g.,
+        ``"circles.svg"``).
+    '''
+    return os.path.join(os.path.dirname(os.path.dirname(__file__)), name)
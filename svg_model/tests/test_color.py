@@ -0,0 +1,57 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import sys
+import threading
+
+from svg_model.color import CACHE_SIZE, LruCache, parse_style
+
+
+def test_lru_cache_eviction():
+    calls = []
+
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    cache = LruCache(square, maxsize=2)
+    assert [cache(1), cache(2), cache(1), cache(3)] == [1, 4, 1, 9]
+    # `2` was least recently used when `3` was added.
+    assert len(cache) == 2
+    assert cache(2) == 4
+    assert calls == [1, 2, 3, 2]
+
+
+def test_parse_style_threads():
+    parse_style.clear()
+    styles = ['fill:#%06x;stroke:none' % i for i in range(600)]
+    errors = []
+
+    def parse_all():
+        try:
+            for style_i in styles:
+                fill, properties = parse_style(style_i)
+                assert properties['stroke'] == 'none'
+        except Exception as exception:
+            errors.append(exception)
+
+    # Switch threads as often as possible.
+    if hasattr(sys, 'setswitchinterval'):
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+    else:
+        interval = sys.getcheckinterval()
+        sys.setcheckinterval(1)
+    try:
+        threads = [threading.Thread(target=parse_all) for i in range(8)]
+        for thread_i in threads:
+            thread_i.start()
+        for thread_i in threads:
+            thread_i.join()
+    finally:
+        if hasattr(sys, 'setswitchinterval'):
+            sys.setswitchinterval(interval)
+        else:
+            sys.setcheckinterval(interval)
+    assert not errors
+    assert len(parse_style) <= CACHE_SIZE
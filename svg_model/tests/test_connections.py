@@ -0,0 +1,95 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from svg_model.connections import dilate_polygons, extract_adjacent_shapes
+
+
+def test_dilate_repeated_vertices():
+    # Collinear vertex, and repeated corner vertex (i.e., zero-length edge).
+    points = [[0, 0], [1, 0], [2, 0], [2, 2], [2, 2], [0, 2]]
+    assert np.allclose(dilate_polygons(points, [6], 1),
+                       [[-1, -1], [1, -1], [3, -1], [3, 3], [3, 3], [-1, 3]])
+
+
+def test_dilate_closed_polygons():
+    # Explicitly closed (clockwise) polygon with repeated closing vertex, and
+    # (counter-clockwise) polygon that is not closed.
+    points = [[0, 0], [0, 2], [2, 2], [2, 0], [0, 0], [0, 0],
+              [5, 5], [6, 5], [6, 6], [5, 6]]
+    assert np.allclose(dilate_polygons(points, [6, 4], .5),
+                       [[-.5, -.5], [-.5, 2.5], [2.5, 2.5], [2.5, -.5],
+                        [-.5, -.5], [-.5, -.5],
+                        [4.5, 4.5], [6.5, 4.5], [6.5, 6.5], [4.5, 6.5]])
+
+
+# L-shaped shape, square `S` in the notch of `L` (5 units from `L`), square
+# `B` sharing an edge with `L`, and square `C` near `B` and `S`.
+ADJACENT_SHAPES = {'L': [(0, 0), (20, 0), (20, 10), (10, 10), (10, 20),
+                         (0, 20)],
+                   'S': [(15, 15), (20, 15), (20, 20), (15, 20)],
+                   'B': [(20, 0), (30, 0), (30, 10), (20, 10)],
+                   'C': [(21, 12), (30, 12), (30, 20), (21, 20)]}
+
+
+def _df_adjacent_shapes():
+    return pd.DataFrame([(k, x, y) for k, points_k in
+                         sorted(ADJACENT_SHAPES.items())
+                         for x, y in points_k], columns=['id', 'x', 'y'])
+
+
+def _point_segment_distance(p, a, b):
+    p, a, b = [np.array(v, dtype=float) for v in (p, a, b)]
+    t = np.clip(np.dot(p - a, b - a) / np.dot(b - a, b - a), 0, 1)
+    return np.hypot(*(a + t * (b - a) - p))
+
+
+def _outline_distance(a, b):
+    # Minimum distance between (non-crossing) polygon outlines, i.e., between
+    # a vertex of one polygon and an edge of the other.
+    def _distances(a, b):
+        return [_point_segment_distance(p, b[k], b[(k + 1) % len(b)])
+                for p in a for k in range(len(b))]
+    return min(_distances(a, b) + _distances(b, a))
+
+
+def _pairs(df_connected):
+    return df_connected[['source', 'target']].values.tolist()
+
+
+def test_polygon_adjacency():
+    df_shapes = _df_adjacent_shapes()
+    # Bounding box of `S` is within bounding box of `L`.
+    assert ['L', 'S'] in [sorted(pair_i) for pair_i in
+                          _pairs(extract_adjacent_shapes(df_shapes, 'id',
+                                                         .5))]
+    df_connected = extract_adjacent_shapes(df_shapes, 'id', .5,
+                                           mode='polygon')
+    assert _pairs(df_connected) == [['B', 'L']]
+    assert df_connected[['distance', 'shared_length']].values.tolist() == \
+        [[0, 10]]
+
+    df_connected = extract_adjacent_shapes(df_shapes, 'id', 3,
+                                           mode='polygon')
+    expected = [[a, b] for a, b in
+                itertools.combinations(sorted(ADJACENT_SHAPES), 2)
+                if _outline_distance(ADJACENT_SHAPES[a],
+                                     ADJACENT_SHAPES[b]) <= 3]
+    assert _pairs(df_connected) == expected == [['B', 'C'], ['B', 'L'],
+                                                ['C', 'L'], ['C', 'S']]
+    assert np.allclose(df_connected['distance'],
+                       [_outline_distance(ADJACENT_SHAPES[a],
+                                          ADJACENT_SHAPES[b])
+                        for a, b in expected])
+    assert df_connected['shared_length'].tolist() == [9, 10, 0, 5]
+
+    # Pairs sharing less than the minimum boundary length are not adjacent.
+    df_connected = extract_adjacent_shapes(df_shapes, 'id', 3,
+                                           mode='polygon',
+                                           min_shared_length=5)
+    assert _pairs(df_connected) == [['B', 'C'], ['B', 'L'], ['C', 'S']]
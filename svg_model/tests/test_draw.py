@@ -0,0 +1,57 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from lxml import etree
+import numpy as np
+import pandas as pd
+
+from svg_model import svg_shapes_to_df
+from svg_model.draw import draw_lines_svg_layer, draw_shapes_svg_layer
+from svg_model.svgload.walk import INKSCAPE_NAMESPACE
+from svg_model.tests import data_path
+
+SODIPODI_NAMESPACE = 'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd'
+
+
+def test_draw_shapes_namespaced_attributes():
+    # Inkscape shapes have namespaced attributes (e.g., `sodipodi:nodetypes`).
+    df_shapes = svg_shapes_to_df(data_path('circles.svg'))
+    assert ('{%s}nodetypes' % SODIPODI_NAMESPACE) in df_shapes
+
+    for use_svg_path in (True, False):
+        output = draw_shapes_svg_layer(df_shapes, 'id', 'Layer 1',
+                                       use_svg_path=use_svg_path)
+        # Output must be valid XML.
+        shapes = etree.parse(output).getroot()[1]
+        assert shapes.get('{%s}label' % INKSCAPE_NAMESPACE) == 'Layer 1'
+        assert len(shapes) == df_shapes['id'].nunique()
+        for shape_i in shapes:
+            assert ('{%s}nodetypes' % SODIPODI_NAMESPACE) in shape_i.attrib
+
+
+def test_draw_shapes_round_trip():
+    df_shapes = pd.DataFrame({'id': ['a'] * 3 + ['b'] * 4,
+                              'fill': ['#f00'] * 3 + [None] * 4,
+                              'vertex_i': [0, 1, 2, 0, 1, 2, 3],
+                              'x': [0, 10, 10, 20, 30, 30, 20.5],
+                              'y': [0, 0, 10, 0, 0, 1e-7, 0]})
+    output = draw_shapes_svg_layer(df_shapes, 'id', 'Layer 1',
+                                   use_svg_path=False)
+    df_loaded = svg_shapes_to_df(output)
+    assert (df_loaded['id'].tolist() == df_shapes['id'].tolist())
+    assert df_loaded['fill'].tolist() == df_shapes['fill'].tolist()
+    assert np.allclose(df_loaded[['x', 'y']].values,
+                       df_shapes[['x', 'y']].values)
+
+
+def test_draw_lines():
+    df_endpoints = pd.DataFrame([[0, 0, 3, 5], [1.5, 2, 4, 6]],
+                                columns=['x_source', 'y_source', 'x_target',
+                                         'y_target'], index=[3, 7])
+    root = etree.parse(draw_lines_svg_layer(df_endpoints, 'Connections'))
+    lines = root.getroot()[1]
+    assert [line_i.get('id') for line_i in lines] == ['line3', 'line7']
+    assert np.allclose([[float(line_i.get(k)) for k in ('x1', 'y1', 'x2',
+                                                         'y2')]
+                        for line_i in lines], df_endpoints.values)
@@ -0,0 +1,74 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+import pytest
+
+from svg_model.geo_path import Path, transform_paths
+from svg_model.loop import Loop
+from svg_model.svgload.svg_parser import SvgParser
+from svg_model.tests import data_path
+
+
+def test_reflect_preserves_loop_orientation():
+    svg = SvgParser().parse_file(data_path('circles.svg'))
+    centroids = [(np.array(path_i.get_centroid()),
+                  [np.array(loop_i.get_centroid()) for loop_i in
+                   path_i.loops]) for path_i in svg.paths.values()]
+
+    svg.scale(1, -1)
+    for path_i, (centroid_i, loop_centroids_i) in zip(svg.paths.values(),
+                                                      centroids):
+        assert np.allclose(path_i.get_centroid(), centroid_i * (1, -1))
+        for loop_i, loop_centroid_i in zip(path_i.loops, loop_centroids_i):
+            assert loop_i.is_clockwise()
+            assert np.allclose(loop_i.get_centroid(),
+                               loop_centroid_i * (1, -1))
+            # Loop vertices are still views into the shared vertex array.
+            assert loop_i._points.base is not None
+
+
+def test_reflect_multiple_loops():
+    path = Path([Loop([(0, 0), (0, 1), (1, 1), (1, 0)]),
+                 Loop([(2, 0), (2, 2), (4, 2), (4, 0)])])
+    path_points = path.points.copy()
+    transform_paths([path], [[-1, 0, 0], [0, 1, 0]])
+    for loop_i in path.loops:
+        assert loop_i.is_clockwise()
+    # Same vertices (reflected), each loop in reverse order.
+    assert np.allclose(path.points[:4], path_points[:4][::-1] * (-1, 1))
+    assert np.allclose(path.points[4:], path_points[4:][::-1] * (-1, 1))
+    assert np.allclose(path.get_centroid(), (-2.5, 0.9))
+
+
+def test_set_loop_points_in_place():
+    path = Path([Loop([(0, 0), (0, 1), (1, 1), (1, 0)]),
+                 Loop([(2, 0), (2, 2), (4, 2), (4, 0)])])
+    assert path.get_bounding_box() == (0, 0, 4, 2)
+    loop = path.loops[1]
+    loop.verts = [(2, 0), (2, 4), (4, 4), (4, 0)]
+    # Loop vertices are written into the vertex array of the path.
+    assert loop._points.base is path.points.base
+    assert path.points[4:].tolist() == [[2, 0], [2, 4], [4, 4], [4, 0]]
+    assert path.get_bounding_box() == (0, 0, 4, 4)
+    assert loop.get_area() == 8
+    with pytest.raises(ValueError):
+        loop.points = [(2, 0), (2, 4), (4, 4)]
+    assert path.points.shape == (8, 2)
+    # Loops without a path may be resized.
+    loop = Loop([(0, 0), (0, 1), (1, 1), (1, 0)])
+    loop.points = [(0, 0), (0, 1), (1, 0)]
+    assert loop.get_area() == .5
+
+
+def test_offset_loop_resets_path_cache():
+    path = Path([Loop([(0, 0), (0, 1), (1, 1), (1, 0)]),
+                 Loop([(2, 0), (2, 1), (3, 1), (3, 0)])])
+    assert path.get_bounding_box() == (0, 0, 3, 1)
+    assert np.allclose(path.get_centroid(), (1.5, .5))
+    path.loops[1].offset(1, 2)
+    assert path.points[4:].tolist() == [[3, 2], [3, 3], [4, 3], [4, 2]]
+    assert path.get_bounding_box() == (0, 0, 4, 3)
+    assert np.allclose(path.get_centroid(), (2, 1.5))
+    assert path.get_area() == 2
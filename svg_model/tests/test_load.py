@@ -0,0 +1,192 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import io
+
+from lxml import etree
+import numpy as np
+import pytest
+
+from svg_model.tests import data_path
+
+from svg_model import (load_layer, parse_points, path_vertices,
+                       svg_shapes_to_df)
+from svg_model.draw import draw_shapes_svg_layer
+from svg_model.svgload.layers import index_layers
+from svg_model.svgload.svg_parser import SvgParser
+
+SVG_TEMPLATE = ('<svg xmlns="http://www.w3.org/2000/svg" '
+                'xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape">'
+                '%s</svg>')
+
+
+def _svg(source):
+    return io.BytesIO((SVG_TEMPLATE % source).encode('utf-8'))
+
+
+def test_transform_round_trip():
+    # Shape transform is applied to the vertices (and not also kept as an
+    # attribute, which would apply it again when drawing the frame).
+    df_shapes = svg_shapes_to_df(_svg('<polygon id="a" points="0,0 10,0 10,10"'
+                                      ' transform="translate(100,0)"/>'))
+    assert 'transform' not in df_shapes
+    assert df_shapes['x'].tolist() == [100, 110, 110]
+
+    output = draw_shapes_svg_layer(df_shapes, 'id', 'Layer 1',
+                                   use_svg_path=False)
+    df_reloaded = svg_shapes_to_df(output)
+    assert np.allclose(df_reloaded[['x', 'y']].values,
+                       df_shapes[['x', 'y']].values)
+
+
+NON_RENDERED_SOURCE = '''
+<defs>
+  <marker id="arrow"><path id="arrowpath" d="M 0,0 L 1,0 L 1,1 Z"/></marker>
+</defs>
+<clipPath id="clip"><path id="clippath" d="M 0,0 L 5,0 L 5,5 Z"/></clipPath>
+<g inkscape:groupmode="layer" inkscape:label="Layer 1">
+  <path id="a" d="M 0,0 L 2,0 L 2,2 Z"/>
+  <defs><rect id="layerdefs" x="0" y="0" width="1" height="1"/></defs>
+</g>
+'''
+
+
+def test_skip_non_rendered_shapes():
+    df_shapes = svg_shapes_to_df(_svg(NON_RENDERED_SOURCE))
+    assert df_shapes['id'].unique().tolist() == ['a']
+    svg = SvgParser().parse(etree.parse(_svg(NON_RENDERED_SOURCE)))
+    assert list(svg.paths) == ['a']
+    assert (load_layer(_svg(NON_RENDERED_SOURCE), 'Layer 1')['id'].unique()
+            .tolist() == ['a'])
+    layers = index_layers(_svg(NON_RENDERED_SOURCE))
+    assert [(layer_i.label, layer_i.shape_count)
+            for layer_i in layers] == [('Layer 1', 1)]
+
+
+def test_parse_points():
+    assert np.allclose(parse_points(' .5,-1e1\n+2 3.,-.25 4 '),
+                       [[.5, -10], [2, 3], [-.25, 4]])
+    assert parse_points('').shape == (0, 2)
+    for points in ('0,0 1,x 2', '0,0 1,1 2 2e', '0,0;1,1'):
+        with pytest.raises(ValueError):
+            parse_points(points)
+    with pytest.raises(ValueError):
+        parse_points('0,0 1')
+
+
+@pytest.mark.parametrize('d, expected', [
+    # Implicit (relative) line commands after move command.
+    ('m 100,200 50,0 0,50 -50,0 z',
+     [[100, 200], [150, 200], [150, 250], [100, 250]]),
+    # No whitespace after commands.
+    ('M10,10 L20,10 L20,20 Z', [[10, 10], [20, 10], [20, 20]]),
+    # No commas between coordinates.
+    ('M 0 0 L 10 0 L 10 10 Z', [[0, 0], [10, 0], [10, 10]]),
+    # Each subpath is closed to its own start point.
+    ('M 0,0 L 10,0 L 10,10 Z M 20,0 L 30,0 L 30,10 Z',
+     [[0, 0], [10, 0], [10, 10], [20, 0], [30, 0], [30, 10]]),
+    # Closing vertex is dropped for both `Z` and `z`.
+    ('M 0,0 L 10,0 L 10,10 L 0,0 z', [[0, 0], [10, 0], [10, 10]]),
+    # Unclosed path.
+    ('M 0,0 L 10,0', [[0, 0], [10, 0]]),
+])
+def test_path_vertices(d, expected):
+    assert path_vertices(d).tolist() == expected
+    df_shapes = svg_shapes_to_df(_svg('<path id="a" d="%s"/>' % d))
+    assert df_shapes[['x', 'y']].values.tolist() == expected
+
+
+def test_path_vertices_invalid():
+    with pytest.warns(RuntimeWarning):
+        df_shapes = svg_shapes_to_df(_svg('<path id="a" d="M 0,0 L 1,0 X"/>'
+                                          '<path id="b" d="M 0,0 L 2,0 L 2,2'
+                                          ' Z"/>'))
+    assert df_shapes['id'].unique().tolist() == ['b']
+
+
+def test_circles_path_vertices():
+    # Closing vertex of `z`-closed paths is not repeated.
+    df_shapes = svg_shapes_to_df(data_path('circles.svg'))
+    for shape_id, df_shape_i in df_shapes.groupby('id'):
+        xy_i = df_shape_i[['x', 'y']].values
+        assert not (xy_i[0] == xy_i[-1]).all()
+        assert (xy_i[1:] != xy_i[:-1]).any(axis=1).all()
+
+
+def test_simplify_tolerance():
+    # Shape `a` has a collinear vertex and a bump within tolerance, shape `b`
+    # is kept as is.
+    source = ('<polygon id="a" points="0,0 5,0.01 10,0 10,5 10,10 0,10"/>'
+              '<polygon id="b" points="20,0 30,0 25,10"/>')
+    df_shapes = svg_shapes_to_df(_svg(source))
+    assert df_shapes.shape[0] == 9
+    df_simplified = svg_shapes_to_df(_svg(source), simplify_tolerance=0.1)
+    assert (df_simplified[['id', 'vertex_i', 'x', 'y']].values.tolist() ==
+            [['a', 0, 0, 0], ['a', 1, 10, 0], ['a', 2, 10, 10],
+             ['a', 3, 0, 10], ['b', 0, 20, 0], ['b', 1, 30, 0],
+             ['b', 2, 25, 10]])
+    # Only duplicate and collinear vertices are removed for zero tolerance.
+    df_simplified = svg_shapes_to_df(_svg(source), simplify_tolerance=0)
+    assert df_simplified.groupby('id').size().to_dict() == {'a': 5, 'b': 3}
+
+
+LAYERED_SOURCE = '''
+<g inkscape:groupmode="layer" inkscape:label="Electrodes" id="layer1"
+   transform="translate(100,0)">
+  <polygon id="e0" points="0,0 10,0 10,10"/>
+  <g transform="translate(0,50)">
+    <rect id="e1" x="0" y="0" width="5" height="5"/>
+  </g>
+  <g inkscape:groupmode="layer" inkscape:label="Sub" id="layer2"
+     transform="scale(2)">
+    <path id="s0" d="M 0,0 L 1,0 L 1,1 Z"/>
+  </g>
+</g>
+<g inkscape:groupmode="layer" inkscape:label="Connections" id="layer3">
+  <line id="c0" x1="0" y1="0" x2="5" y2="5"/>
+</g>
+<g inkscape:groupmode="layer" inkscape:label="Empty" id="layer4"/>
+<polygon id="outside" points="0,0 1,0 1,1"/>
+'''
+
+
+def test_index_layers():
+    layers = index_layers(_svg(LAYERED_SOURCE))
+    assert [tuple(layer_i) for layer_i in layers] == \
+        [('Electrodes', 'layer1', None, 2), ('Sub', 'layer2', 'Electrodes', 1),
+         ('Connections', 'layer3', None, 1), ('Empty', 'layer4', None, 0)]
+    # File path (with comment before root element).
+    assert [tuple(layer_i) for layer_i in
+            index_layers(data_path('circles.svg'))] == \
+        [('Layer 1', 'layer1', None, 4)]
+
+
+def test_load_layer():
+    df_shapes = svg_shapes_to_df(_svg(LAYERED_SOURCE))
+
+    def _expected(ids):
+        return (df_shapes.loc[df_shapes['id'].isin(ids)]
+                .reset_index(drop=True))
+
+    # Shapes of sub-layers are included, and transforms of enclosing groups
+    # and layers are applied.
+    for layers, ids in [('Electrodes', ['e0', 'e1', 's0']),
+                        ('Sub', ['s0']),
+                        (['Connections', 'Sub'], ['s0', 'c0'])]:
+        df_layer = load_layer(_svg(LAYERED_SOURCE), layers)
+        assert df_layer.equals(_expected(ids)[df_layer.columns])
+    assert load_layer(_svg(LAYERED_SOURCE), 'Sub')[['x', 'y']].values \
+        .tolist() == [[100, 0], [102, 0], [102, 2]]
+    assert load_layer(_svg(LAYERED_SOURCE), 'Empty').shape[0] == 0
+    assert (load_layer(data_path('circles.svg'), 'Layer 1')['id'].unique()
+            .tolist() == svg_shapes_to_df(data_path('circles.svg'))['id']
+            .unique().tolist())
+
+
+def test_load_missing_layer():
+    for layers in ('Missing', ['Electrodes', 'Missing']):
+        with pytest.raises(KeyError) as exception:
+            load_layer(_svg(LAYERED_SOURCE), layers)
+        assert 'Missing' in str(exception.value)
+    with pytest.raises(KeyError):
+        load_layer(data_path('circles.svg'), 'Missing')
@@ -0,0 +1,72 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from svg_model.mesh import TriangleMesh
+from svg_model.svgload.svg_parser import SvgParser
+from svg_model.tesselate import tesselate_shapes_arrays
+from svg_model.tests import data_path
+
+
+def _df_shapes():
+    # Two squares sharing an edge.
+    return pd.DataFrame({'id': ['a'] * 4 + ['b'] * 4,
+                         'x': [0, 10, 10, 0, 10, 20, 20, 10],
+                         'y': [0, 0, 10, 10, 0, 0, 10, 10]})
+
+
+def test_mesh_matches_triangles():
+    triangles, shape_codes, shape_index = \
+        tesselate_shapes_arrays(_df_shapes(), 'id')
+    mesh = TriangleMesh.from_shapes_frame(_df_shapes(), 'id')
+    assert len(mesh) == triangles.shape[0]
+    assert mesh.vertices.dtype == np.float64
+    assert mesh.indices.dtype == np.int32
+    assert mesh.shape_ids.dtype == np.int32
+    # Vertices shared by triangles of both shapes are stored once.
+    assert mesh.vertices.shape == (6, 2)
+    assert np.array_equal(mesh.triangles, triangles)
+    assert np.array_equal(mesh.shape_ids, shape_codes)
+    assert mesh.shape_index.tolist() == shape_index.tolist() == ['a', 'b']
+    assert (mesh.shape_keys.tolist() ==
+            shape_index[shape_codes].tolist())
+
+
+def test_buffers_are_views():
+    mesh = TriangleMesh.from_shapes_frame(_df_shapes(), 'id')
+    buffers = mesh.buffers()
+    assert list(buffers) == ['vertices', 'indices', 'shape_ids']
+    for name_i, buffer_i in buffers.items():
+        array_i = getattr(mesh, name_i)
+        assert array_i.flags.c_contiguous
+        assert buffer_i.readonly
+        view_i = np.asarray(buffer_i)
+        assert view_i.shape == array_i.shape
+        assert np.shares_memory(view_i, array_i)
+        with pytest.raises(ValueError):
+            view_i[...] = 0
+
+
+def test_empty_mesh():
+    mesh = TriangleMesh.from_shapes_frame(_df_shapes().iloc[:0], 'id')
+    assert len(mesh) == 0
+    assert mesh.indices.shape == (0, 3)
+    assert mesh.triangles.shape == (0, 3, 2)
+
+
+def test_svg_mesh():
+    svg = SvgParser().parse_file(data_path('circles.svg'))
+    mesh = svg.get_mesh()
+    assert mesh.shape_index.tolist() == list(svg.paths)
+    assert (np.unique(mesh.shape_ids).tolist() ==
+            list(range(len(svg.paths))))
+    assert mesh.indices.max() < mesh.vertices.shape[0]
+    # Triangles cover the loops of each path.
+    (ax, ay), (bx, by), (cx, cy) = mesh.triangles.transpose(1, 2, 0)
+    areas = .5 * np.abs((bx - ax) * (cy - ay) - (cx - ax) * (by - ay))
+    assert np.allclose(np.bincount(mesh.shape_ids, weights=areas),
+                       [path_i.get_area() for path_i in svg.paths.values()])
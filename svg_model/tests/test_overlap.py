@@ -0,0 +1,71 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+import pandas as pd
+
+from svg_model.overlap import find_overlapping_shapes
+
+
+def _shapes_frame(shapes):
+    return pd.DataFrame([(key, x, y) for key, vertices in shapes
+                         for x, y in vertices], columns=['id', 'x', 'y'])
+
+
+def _areas(shapes):
+    df_overlaps = find_overlapping_shapes(_shapes_frame(shapes), 'id')
+    return dict(((source, target), area) for source, target, area in
+                df_overlaps.values)
+
+
+SQUARE = [(0, 0), (2, 0), (2, 2), (0, 2)]
+# Concave L-shape, with notch above `x > 1, y > 1`.
+L_SHAPE = [(0, 0), (4, 0), (4, 1), (1, 1), (1, 4), (0, 4)]
+
+
+def _translate(vertices, dx, dy):
+    return [(x + dx, y + dy) for x, y in vertices]
+
+
+def test_touching():
+    # Shared edge, shared corner, and partially shared edge.
+    areas = _areas([('a', SQUARE), ('b', _translate(SQUARE, 2, 0)),
+                    ('c', _translate(SQUARE, 2, 2)),
+                    ('d', _translate(SQUARE, -1, 2))])
+    assert areas == {}
+
+
+def test_identical():
+    # Identical shapes with opposite orientations.
+    areas = _areas([('a', SQUARE), ('b', SQUARE[::-1])])
+    assert list(areas) == [('a', 'b')]
+    assert np.isclose(areas['a', 'b'], 4)
+
+
+def test_contained():
+    inner = [(.5, .5), (1.5, .5), (1.5, 1), (.5, 1)]
+    # Inner shape touching the outline of the outer shape.
+    touching = [(0, .5), (1, .5), (1, 1.5), (0, 1.5)]
+    areas = _areas([('a', SQUARE), ('b', inner), ('c', touching)])
+    assert np.isclose(areas['a', 'b'], .5)
+    assert np.isclose(areas['a', 'c'], 1)
+    assert np.isclose(areas['b', 'c'], .25)
+    assert len(areas) == 3
+
+
+def test_concave():
+    # Square in the notch of the L-shape only touches it.
+    notch = [(1, 1), (3, 1), (3, 3), (1, 3)]
+    # Square overlapping both arms of the L-shape (and the notch).
+    corner = [(.5, .5), (1.5, .5), (1.5, 1.5), (.5, 1.5)]
+    # Square crossing the horizontal arm.
+    crossing = [(2.5, -1), (3, -1), (3, 3), (2.5, 3)]
+    areas = _areas([('L', L_SHAPE), ('notch', notch), ('corner', corner),
+                    ('crossing', crossing)])
+    assert ('L', 'notch') not in areas
+    assert np.isclose(areas['L', 'corner'], .75)
+    assert np.isclose(areas['L', 'crossing'], .5)
+    assert np.isclose(areas['corner', 'notch'], .25)
+    assert np.isclose(areas['crossing', 'notch'], 1)
+    assert len(areas) == 4
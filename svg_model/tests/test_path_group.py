@@ -0,0 +1,82 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import io
+
+import numpy as np
+import pytest
+
+from svg_model.path_group import PathGroup, load_many
+from svg_model.svgload.svg_parser import SvgParseError
+
+SVG_TEMPLATE = '<svg xmlns="http://www.w3.org/2000/svg">%s</svg>'
+PATH_TEMPLATE = '<path id="%s" d="%s"/>'
+
+
+def _write_svgs(tmpdir, count, invalid=()):
+    '''
+    Write SVG files, where file ``i`` contains a square path ``p<i>`` of size
+    ``i + 1`` (and an invalid path ``bad<i>``, if ``i`` is in
+    :data:`invalid`).
+    '''
+    svg_paths = []
+    for i in range(count):
+        paths_i = [PATH_TEMPLATE % ('p%d' % i, 'M 0,0 L %d,0 L %d,%d L 0,%d Z'
+                                    % ((i + 1, ) * 4))]
+        if i in invalid:
+            paths_i.append(PATH_TEMPLATE % ('bad%d' % i, 'M 0,0 L 1,0 5'))
+        svg_path_i = tmpdir.join('%02d.svg' % i)
+        with io.open(str(svg_path_i), 'w') as output:
+            output.write(SVG_TEMPLATE % ''.join(paths_i))
+        svg_paths.append(str(svg_path_i))
+    return svg_paths
+
+
+@pytest.mark.parametrize('workers, pool', [(1, 'process'), (3, 'process'),
+                                           (3, 'thread')])
+def test_load_many_order(tmpdir, workers, pool):
+    svg_paths = _write_svgs(tmpdir, 7)
+    path_groups, durations = load_many(svg_paths, workers=workers,
+                                       pool=pool)
+    assert len(path_groups) == len(durations) == len(svg_paths)
+    assert all(duration_i >= 0 for duration_i in durations)
+    for i, (svg_path_i, path_group_i) in enumerate(zip(svg_paths,
+                                                       path_groups)):
+        assert isinstance(path_group_i, PathGroup)
+        assert list(path_group_i.paths) == ['p%d' % i]
+        assert path_group_i.get_bounding_box()[2:] == (i + 1, i + 1)
+        # Same result as loading the file in the calling process.
+        expected = PathGroup.load_svg(svg_path_i)
+        assert np.array_equal(path_group_i.get_points(),
+                              expected.get_points())
+        # Vertices of loaded paths are views into the shared vertex array.
+        path_group_i.translate(1, 2)
+        assert np.array_equal(path_group_i.paths['p%d' % i].points,
+                              expected.paths['p%d' % i].points + (1, 2))
+
+
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_load_many_on_error(tmpdir, pool):
+    svg_paths = _write_svgs(tmpdir, 5, invalid=(3, 1))
+    errors = []
+
+    def _on_error(filename, tag, message):
+        errors.append((filename, tag.get('id'), message))
+
+    path_groups, durations = load_many(svg_paths, workers=2, pool=pool,
+                                       on_error=_on_error)
+    # Errors are reported in input order, and valid paths are still loaded.
+    assert [(filename, id_) for filename, id_, message in errors] == \
+        [(svg_paths[1], 'bad1'), (svg_paths[3], 'bad3')]
+    assert all('invalid number of arguments' in message
+               for filename, id_, message in errors)
+    assert [list(path_group_i.paths) for path_group_i in path_groups] == \
+        [['p%d' % i] for i in range(5)]
+
+    with pytest.raises(SvgParseError):
+        load_many(svg_paths, workers=2, pool=pool)
+
+
+def test_load_many_invalid_pool(tmpdir):
+    with pytest.raises(ValueError):
+        load_many(_write_svgs(tmpdir, 2), workers=2, pool='fiber')
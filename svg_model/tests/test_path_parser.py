@@ -0,0 +1,92 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+import pytest
+
+from svg_model.svgload.path_parser import (LoopTracer, ParseError,
+                                           PathDataParser)
+
+
+@pytest.mark.parametrize('data, message', [
+    (',M 1 2', 'unexpected comma at 0 in %r'),
+    ('M ,1 2', 'unexpected comma at 2 in %r'),
+    ('1 2', 'missing command at 0 in %r'),
+    ('  1 2', 'missing command at 2 in %r'),
+    ('M1e', 'invalid number at 2 in %r'),
+    ('M 1 2 L 3 4e+', 'invalid number at 11 in %r'),
+])
+def test_parse_error(data, message):
+    # Position and message of first invalid token.
+    with pytest.raises(ParseError) as exception:
+        PathDataParser().to_arrays(data)
+    assert str(exception.value) == message % (data, )
+
+
+@pytest.mark.parametrize('data, commands, values, counts', [
+    # Exponents.
+    ('M 1.5e2,-3E-1 l 1e2 .5e-1', ['M', 'l'], [150, -.3, 100, .05], [2, 2]),
+    ('M1.5e2-3E-1L-.5+2e+1', ['M', 'L'], [150, -.3, -.5, 20], [2, 2]),
+    # Signs and decimal points separate numbers.
+    ('M1-2-3-4', ['M'], [1, -2, -3, -4], [4]),
+    ('M.5.5.5.5', ['M'], [.5, .5, .5, .5], [4]),
+    ('M 5..6', ['M'], [5, .6], [2]),
+    # No whitespace.
+    ('M1 2L3 4Z', ['M', 'L', 'Z'], [1, 2, 3, 4], [2, 2, 0]),
+    ('M1,2L3,4z', ['M', 'L', 'z'], [1, 2, 3, 4], [2, 2, 0]),
+    # Whitespace (including newlines) around commands and commas.
+    ('\n M 1 , 2\tL\n3 4 ', ['M', 'L'], [1, 2, 3, 4], [2, 2]),
+    ('', [], [], []),
+])
+def test_to_arrays(data, commands, values, counts):
+    commands_i, values_i, counts_i = PathDataParser().to_arrays(data)
+    assert commands_i == commands
+    assert values_i.tolist() == values
+    assert counts_i.tolist() == counts
+
+
+def _trace(data, tolerance=1):
+    return [loop_i.tolist() for loop_i in
+            LoopTracer(tolerance).trace(*PathDataParser().to_arrays(data))]
+
+
+@pytest.mark.parametrize('data, loops', [
+    # Relative commands.
+    ('m 1 1 l 10 0 v 10 h -10 z',
+     [[[1, 1], [11, 1], [11, 11], [1, 11]]]),
+    # Implicit line commands after move commands.
+    ('M 0 0 10 0 10 10 z', [[[0, 0], [10, 0], [10, 10]]]),
+    # Relative move after `z` is relative to start point of closed subpath.
+    ('m 1 1 10 0 0 10 z m 20 0 10 0 0 10 z',
+     [[[1, 1], [11, 1], [11, 11]], [[21, 1], [31, 1], [31, 11]]]),
+    # Commands after `Z` start a new subpath at start point of closed subpath.
+    ('M 0 0 L 10 0 L 10 10 Z L 0 -10 L 10 -10 Z',
+     [[[0, 0], [10, 0], [10, 10]], [[0, 0], [0, -10], [10, -10]]]),
+    # Subpath ending at start point is closed.
+    ('M 0 0 L 10 0 L 10 10 L 0 0', [[[0, 0], [10, 0], [10, 10]]]),
+    # Unclosed subpath is not a loop.
+    ('M 0 0 L 10 0 10 10 0 10', []),
+])
+def test_trace(data, loops):
+    assert _trace(data) == loops
+
+
+@pytest.mark.parametrize('data', ['M 0 0 C 0 10 10 10 10 0 S 20 -10 20 0 Z',
+                                  'M 0 0 Q 5 10 10 0 T 20 0 Z'])
+def test_trace_curve_continuation(data):
+    # Control point of smooth curve is the reflection of the previous control
+    # point, i.e., the second curve is the first curve reflected about the
+    # x-axis (and offset by 10).
+    loop = np.array(_trace(data)[0])
+    n = loop.shape[0] // 2
+    assert loop[n].tolist() == [10, 0]
+    assert loop[-1].tolist() == [20, 0]
+    assert np.allclose(loop[n + 1:-1], loop[1:n] * (1, -1) + (10, 0))
+
+
+@pytest.mark.parametrize('data', ['M 0 0 L 10 0 5', 'M 0 0 10 0 10',
+                                  'M 0 0 H 10 V', 'M 0 0 C 0 10 10 10 10'])
+def test_trace_incomplete_coordinates(data):
+    with pytest.raises(ParseError):
+        _trace(data)
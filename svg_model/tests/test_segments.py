@@ -0,0 +1,94 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+import itertools
+
+import numpy as np
+
+from svg_model import segments
+from svg_model.segments import (iter_segment_pairs, points_in_polygons,
+                                polygon_segments, segment_distances)
+
+
+def _point_segment_distance(p, q0, q1):
+    # Distance of point `p` to segment `q0`-`q1`, one pair at a time.
+    d = q1 - q0
+    length_sq = d.dot(d)
+    t = 0 if length_sq == 0 else min(max((p - q0).dot(d) / length_sq, 0), 1)
+    return np.hypot(*(p - (q0 + t * d)))
+
+
+def _orientation(p, q, r):
+    return np.sign((q[0] - p[0]) * (r[1] - p[1]) -
+                   (q[1] - p[1]) * (r[0] - p[0]))
+
+
+def _intersect(a0, a1, b0, b1):
+    o1, o2 = _orientation(a0, a1, b0), _orientation(a0, a1, b1)
+    o3, o4 = _orientation(b0, b1, a0), _orientation(b0, b1, a1)
+    if o1 != o2 and o3 != o4 and 0 not in (o1, o2, o3, o4):
+        return True
+
+    def _on(p, q0, q1):
+        return (min(q0[0], q1[0]) <= p[0] <= max(q0[0], q1[0]) and
+                min(q0[1], q1[1]) <= p[1] <= max(q0[1], q1[1]))
+    return ((o1 == 0 and _on(b0, a0, a1)) or (o2 == 0 and _on(b1, a0, a1)) or
+            (o3 == 0 and _on(a0, b0, b1)) or (o4 == 0 and _on(a1, b0, b1)))
+
+
+def test_segment_distances_brute_force():
+    random = np.random.RandomState(0)
+    # Integer coordinates, for exactly touching and collinear segments.
+    a0, a1, b0, b1 = random.randint(0, 8, size=(4, 500, 2)).astype(float)
+    distances = segment_distances(a0, a1, b0, b1)
+
+    expected = [0 if _intersect(a0[k], a1[k], b0[k], b1[k]) else
+                min(_point_segment_distance(a0[k], b0[k], b1[k]),
+                    _point_segment_distance(a1[k], b0[k], b1[k]),
+                    _point_segment_distance(b0[k], a0[k], a1[k]),
+                    _point_segment_distance(b1[k], a0[k], a1[k]))
+                for k in range(a0.shape[0])]
+    assert (distances == 0).any() and (distances > 0).any()
+    assert np.allclose(distances, expected)
+
+
+def test_iter_segment_pairs_batches(monkeypatch):
+    monkeypatch.setattr(segments, 'MAX_SEGMENT_PAIRS', 7)
+    segment_counts = np.array([3, 1, 4, 2, 5])
+    i = np.array([0, 0, 1, 2, 3, 4])
+    j = np.array([1, 2, 3, 4, 4, 0])
+    segment_starts = np.cumsum(segment_counts) - segment_counts
+
+    batches = list(iter_segment_pairs(segment_counts, i, j))
+    assert len(batches) > 1
+    for pair_k, segment_a, segment_b in batches:
+        # Only a single polygon pair may exceed the limit.
+        assert (pair_k.size <= 7 or (pair_k == pair_k[0]).all())
+
+    result = [tuple(row) for pair_k, segment_a, segment_b in batches
+              for row in zip(pair_k, segment_a, segment_b)]
+    expected = [(k, a, b) for k in range(i.size)
+                for a, b in itertools.product(range(segment_starts[i[k]],
+                                                    segment_starts[i[k]] +
+                                                    segment_counts[i[k]]),
+                                              range(segment_starts[j[k]],
+                                                    segment_starts[j[k]] +
+                                                    segment_counts[j[k]]))]
+    assert result == expected
+
+
+def test_points_in_polygons(monkeypatch):
+    monkeypatch.setattr(segments, 'MAX_SEGMENT_PAIRS', 5)
+    # Square and (concave) L-shape, with duplicate vertex.
+    points = np.array([[0, 0], [2, 0], [2, 2], [0, 2],
+                       [0, 0], [4, 0], [4, 1], [1, 1], [1, 1], [1, 4],
+                       [0, 4]], dtype=float)
+    p0, p1, segment_counts = polygon_segments(points, [4, 7])
+    assert segment_counts.tolist() == [4, 6]
+
+    queries = np.array([[1, 1], [3, 1.5], [.5, .5], [3, .5], [2, 2],
+                        [.5, 3]])
+    inside = points_in_polygons(queries, [0, 0, 1, 1, 1, 1], p0, p1,
+                                segment_counts)
+    assert inside.tolist() == [True, False, True, True, False, True]
@@ -0,0 +1,110 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+import math
+
+import numpy as np
+
+from svg_model.seidel import PointLocator
+
+
+def _contains(points, x, y):
+    # Even-odd rule, one polygon at a time.
+    inside = False
+    for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _brute_force(polygons, x, y):
+    keys = [key for key, points in polygons.items() if _contains(points, x, y)]
+    assert len(keys) <= 1
+    return keys[0] if keys else None
+
+
+def _rectangle(x0, y0, x1, y1):
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+
+def _grid(n, size=10):
+    return dict(((i, j), _rectangle(size * i, size * j, size * (i + 1),
+                                    size * (j + 1)))
+                for i in range(n) for j in range(n))
+
+
+def _check(locator, polygons, random, extent, count=400):
+    # Random points (not on any edge) and polygon centers.
+    queries = random.uniform(-.1 * extent, 1.1 * extent, size=(count, 2))
+    queries = queries.tolist() + [np.mean(points, axis=0).tolist()
+                                  for points in polygons.values()]
+    for x, y in queries:
+        assert locator.find_shape(x, y) == _brute_force(polygons, x, y)
+
+
+def test_grids():
+    random = np.random.RandomState(0)
+    for n in (2, 4, 6, 9):
+        polygons = _grid(n)
+        locator = PointLocator(polygons.items())
+        assert locator.find_shape(15, 15) == (1, 1)
+        _check(locator, polygons, random, 10 * n)
+
+
+def test_rotated_grid():
+    random = np.random.RandomState(1)
+    angle = math.radians(30)
+    c, s = math.cos(angle), math.sin(angle)
+    polygons = dict((key, [(c * x - s * y + 60, s * x + c * y)
+                           for x, y in points])
+                    for key, points in _grid(6).items())
+    _check(PointLocator(polygons.items()), polygons, random, 120)
+
+
+def test_t_junctions():
+    # Grid of cells of mixed size, where the corners of small cells lie on
+    # the edges of large cells.
+    random = np.random.RandomState(2)
+    polygons = _grid(6)
+    for i, j in ((0, 0), (2, 2), (4, 0), (1, 4)):
+        for key in ((i, j), (i + 1, j), (i, j + 1), (i + 1, j + 1)):
+            del polygons[key]
+        polygons['large', i, j] = _rectangle(10 * i, 10 * j, 10 * i + 20,
+                                             10 * j + 20)
+    # Triangles sharing diagonal edges.
+    for i in range(6):
+        polygons['upper', i] = [(10 * i, 60), (10 * i + 10, 60),
+                                (10 * i, 70)]
+        polygons['lower', i] = [(10 * i + 10, 60), (10 * i + 10, 70),
+                                (10 * i, 70)]
+    _check(PointLocator(polygons.items()), polygons, random, 70)
+
+
+def test_edits():
+    random = np.random.RandomState(3)
+    polygons = _grid(5)
+    locator = PointLocator(polygons.items())
+    assert locator.find_shape(5, 5) == (0, 0)
+    query_graph = locator.query_graph
+
+    # Removing shapes does not rebuild the map.
+    for key in ((1, 1), (1, 2), (4, 4)):
+        locator.remove_shape(key)
+        del polygons[key]
+    _check(locator, polygons, random, 50)
+    assert locator.query_graph is query_graph
+
+    # Adding a shape sharing (whole) edges with existing segments is
+    # inserted into the existing map.
+    polygons['new'] = locator_points = _rectangle(10, 10, 20, 30)
+    locator.add_shape('new', locator_points)
+    _check(locator, polygons, random, 50)
+    assert locator.query_graph is query_graph
+
+    # Replacing a shape with a shape crossing existing segments rebuilds
+    # the map.
+    polygons['new'] = _rectangle(12, 10, 20, 30)
+    locator.add_shape('new', polygons['new'])
+    _check(locator, polygons, random, 50)
+    assert locator.query_graph is not query_graph
@@ -0,0 +1,70 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import subprocess
+import sys
+
+import pandas as pd
+
+from svg_model.shapes_canvas import ShapesCanvas
+
+
+def _df_shapes():
+    return pd.DataFrame({'id': ['a'] * 4 + ['b'] * 4,
+                         'vertex_i': [0, 1, 2, 3] * 2,
+                         'x': [0, 10, 10, 0, 20, 30, 30, 20],
+                         'y': [0, 0, 10, 10, 0, 0, 10, 10]})
+
+
+def test_seidel_does_not_import_pymunk():
+    # `pymunk` is only imported by the `'pymunk'` point locator.
+    code = ('import sys; import svg_model.shapes_canvas; '
+            'sys.exit("svg_model.point_query" in sys.modules)')
+    assert subprocess.call([sys.executable, '-c', code]) == 0
+
+
+def test_point_locators():
+    for point_locator in ('seidel', 'pymunk'):
+        canvas = ShapesCanvas(_df_shapes(), b'id', point_locator=point_locator)
+        assert canvas.find_shape(2, 3) == 'a'
+        assert canvas.find_shape(27, 4) == 'b'
+        assert canvas.find_shape(15, 5) is None
+        if point_locator == 'seidel':
+            assert canvas.space is None
+            assert canvas.bodies is None
+        else:
+            assert canvas.space is not None
+            assert sorted(set(canvas.bodies)) == ['a', 'b']
+            assert canvas.bodies.index.name == 'body'
+            assert canvas.bodies.name == 'id'
+
+
+def test_find_shape_on_triangle_boundary():
+    # Center of each square lies on the diagonal shared by its triangles.
+    df_shapes = pd.DataFrame([('s%d' % k, x + 10 * k, y) for k in range(3)
+                              for x, y in [(0, 0), (10, 0), (10, 10),
+                                           (0, 10)]],
+                             columns=['id', 'x', 'y'])
+    for point_locator in ('pymunk', 'seidel'):
+        canvas = ShapesCanvas(df_shapes, [b'id'], point_locator=point_locator)
+        assert [canvas.find_shape(5 + 10 * k, 5)
+                for k in range(3)] == ['s0', 's1', 's2']
+        assert canvas.find_shape(15, 12) is None
+
+
+def test_shape_edits():
+    for point_locator in ('seidel', 'pymunk'):
+        # Text (i.e., unicode) shape column name.
+        canvas = ShapesCanvas(_df_shapes(), 'id', point_locator=point_locator)
+        canvas.add_shape('c', [[40, 0], [50, 0], [50, 10], [40, 10]])
+        assert canvas.find_shape(45, 2) == 'c'
+        canvas.update_shape('a', [[0, 0], [15, 0], [15, 10], [0, 10]])
+        assert canvas.find_shape(12, 3) == 'a'
+        canvas.remove_shape('b')
+        assert canvas.find_shape(27, 4) is None
+        assert canvas.find_shape(2, 3) == 'a'
+        assert (canvas.df_shapes.groupby('id').size().to_dict() ==
+                {'a': 4, 'c': 4})
+        if point_locator == 'pymunk':
+            assert sorted(set(canvas.bodies)) == ['a', 'c']
+            assert canvas.bodies.name == 'id'
@@ -0,0 +1,50 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+
+from svg_model.spatial_index import BoundingBoxIndex
+
+
+def _random_bboxes(random, n):
+    # Integer coordinates, so that some boxes touch exactly along edges.
+    corners = random.randint(0, 20, size=(n, 2))
+    sizes = random.randint(0, 6, size=(n, 2))
+    return np.column_stack([corners, corners + sizes]).astype(float)
+
+
+def _overlapping(a, b):
+    return (a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3])
+
+
+def test_query_brute_force():
+    random = np.random.RandomState(0)
+    bboxes = _random_bboxes(random, 60)
+    queries = _random_bboxes(random, 40)
+    query_i, index_i = BoundingBoxIndex(bboxes).query(queries)
+
+    expected = set((q, k) for q, query_q in enumerate(queries)
+                   for k, bbox_k in enumerate(bboxes)
+                   if _overlapping(query_q, bbox_k))
+    assert len(expected) > 0
+    assert sorted(zip(query_i, index_i)) == sorted(expected)
+
+
+def test_pairs_brute_force():
+    random = np.random.RandomState(1)
+    bboxes = _random_bboxes(random, 80)
+    i, j = BoundingBoxIndex(bboxes).pairs()
+
+    expected = set((a, b) for a in range(len(bboxes))
+                   for b in range(a + 1, len(bboxes))
+                   if _overlapping(bboxes[a], bboxes[b]))
+    assert len(expected) > 0
+    assert sorted(zip(i, j)) == sorted(expected)
+
+
+def test_empty():
+    index = BoundingBoxIndex(np.empty((0, 4)))
+    query_i, index_i = index.query([[0, 0, 1, 1]])
+    assert query_i.size == index_i.size == 0
+    assert all(k.size == 0 for k in index.pairs())
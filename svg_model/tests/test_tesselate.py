@@ -0,0 +1,78 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+import pandas as pd
+
+from svg_model.tesselate import (tesselate_shape, tesselate_shapes_arrays,
+                                 tesselate_shapes_frame)
+
+
+def _df_shapes():
+    # Square and L-shape, keyed by two columns.
+    shapes = [(('d', 1), [(0, 0), (10, 0), (10, 10), (0, 10)]),
+              (('d', 0), [(20, 0), (40, 0), (40, 10), (30, 10), (30, 20),
+                          (20, 20)])]
+    return pd.DataFrame([key_i + (x, y) for key_i, points_i in shapes
+                         for x, y in points_i],
+                        columns=['device', 'shape', 'x', 'y'])
+
+
+def _areas(triangles):
+    (ax, ay), (bx, by), (cx, cy) = triangles.transpose(1, 2, 0)
+    return .5 * np.abs((bx - ax) * (cy - ay) - (cx - ax) * (by - ay))
+
+
+def test_arrays_match_frame():
+    df_shapes = _df_shapes()
+    triangles, shape_codes, shape_index = \
+        tesselate_shapes_arrays(df_shapes, ['device', 'shape'])
+    assert triangles.dtype == np.float64
+    assert shape_codes.dtype == np.int32
+    assert shape_index.tolist() == [('d', 0), ('d', 1)]
+    assert shape_index.names == ['device', 'shape']
+    # Triangles of each shape are contiguous and cover the shape.
+    assert (np.diff(shape_codes) >= 0).all()
+    assert np.bincount(shape_codes, weights=_areas(triangles)).tolist() == \
+        [300, 100]
+    assert np.allclose(triangles[shape_codes == 1],
+                       tesselate_shape(df_shapes[['x', 'y']].values[:4]))
+
+    # Frame has one row per triangle vertex, in array order.
+    df_triangles = tesselate_shapes_frame(df_shapes, ['device', 'shape'])
+    assert df_triangles.columns.tolist() == ['device', 'shape', 'triangle_i',
+                                             'vertex_i', 'x', 'y']
+    assert df_triangles.shape[0] == 3 * triangles.shape[0]
+    assert np.array_equal(df_triangles[['x', 'y']].values,
+                          triangles.reshape(-1, 2))
+    keys = [tuple(key_i) for key_i in
+            df_triangles[['device', 'shape']].values.tolist()]
+    assert keys == [shape_index[code_i] for code_i in shape_codes
+                    for vertex_i in range(3)]
+    for key_i, df_i in df_triangles.groupby(['device', 'shape']):
+        triangle_count = df_i.shape[0] // 3
+        assert (df_i['triangle_i'].tolist() ==
+                np.repeat(np.arange(triangle_count), 3).tolist())
+        assert df_i['vertex_i'].tolist() == [0, 1, 2] * triangle_count
+
+
+def test_single_shape_column():
+    df_shapes = _df_shapes()
+    triangles, shape_codes, shape_index = \
+        tesselate_shapes_arrays(df_shapes, 'shape')
+    assert shape_index.name == 'shape'
+    df_triangles = tesselate_shapes_frame(df_shapes, 'shape')
+    assert df_triangles.columns.tolist() == ['shape', 'triangle_i',
+                                             'vertex_i', 'x', 'y']
+    assert (df_triangles['shape'].values ==
+            shape_index.values[np.repeat(shape_codes, 3)]).all()
+
+
+def test_empty():
+    df_shapes = _df_shapes().iloc[:0]
+    triangles, shape_codes, shape_index = \
+        tesselate_shapes_arrays(df_shapes, 'shape')
+    assert triangles.shape == (0, 3, 2)
+    assert shape_codes.shape == (0, )
+    assert tesselate_shapes_frame(df_shapes, 'shape').shape[0] == 0
@@ -0,0 +1,84 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import numpy as np
+import pandas as pd
+
+from svg_model import (fit_points_in_bounding_box,
+                       fit_points_in_bounding_box_params, scale_points)
+from svg_model.transform import TransformedPoints
+
+
+def _df_points():
+    return pd.DataFrame({'id': ['a', 'a', 'b'], 'x': [0., 10, 20],
+                         'y': [0., 5, 10]}, index=[3, 4, 5],
+                        columns=['id', 'x', 'y'])
+
+
+def test_transformed_points_lazy():
+    df_points = _df_points()
+    view = TransformedPoints(df_points, 2, (1, -1))
+    # Source table is not copied, i.e., coordinates are computed on access.
+    assert view.df_points is df_points
+    assert view.values.tolist() == [[1, -1], [21, 9], [41, 19]]
+    df_points.loc[5, 'x'] = 30
+    assert view.x.tolist() == [1, 21, 61]
+    assert view.y.tolist() == [-1, 9, 19]
+    assert view.x.index.tolist() == [3, 4, 5]
+    assert view['id'] is df_points['id']
+    assert len(view) == 3 and view.shape == (3, 3)
+
+    df_view = view.to_frame()
+    assert df_view.columns.tolist() == ['id', 'x', 'y']
+    assert df_view[['x', 'y']].values.tolist() == view.values.tolist()
+    # Source table is unchanged.
+    assert df_points['x'].tolist() == [0, 10, 30]
+    assert view[['id', 'x']].columns.tolist() == ['id', 'x']
+
+    # Transforms are composed, i.e., applied after the transform of the view.
+    composed = view.transform(.5, (3, 4))
+    assert composed.df_points is df_points
+    assert np.allclose(composed.values, .5 * view.values + (3, 4))
+
+
+def test_fit_points_in_bounding_box():
+    df_points = _df_points()
+    for padding_fraction in (0, .1):
+        offset, scale = \
+            fit_points_in_bounding_box_params(df_points, (100, 100),
+                                              padding_fraction)
+        # Points span the width of the bounding box (except padding), and are
+        # centered.
+        assert np.isclose(scale, (1 - 2 * padding_fraction) * 100 / 20.)
+        fitted = fit_points_in_bounding_box(df_points, pd.Series([100, 100],
+                                            index=['width', 'height']),
+                                            padding_fraction, lazy=True)
+        assert isinstance(fitted, TransformedPoints)
+        assert fitted.df_points is df_points
+        xy = fitted.values
+        assert np.allclose(xy.min(axis=0)[0] + xy.max(axis=0)[0], 100)
+        assert np.allclose(xy.max(axis=0) - xy.min(axis=0), (20 * scale,
+                                                             10 * scale))
+        assert np.allclose(xy, scale * df_points[['x', 'y']].values +
+                           offset.values)
+        df_fitted = fit_points_in_bounding_box(df_points, (100, 100),
+                                               padding_fraction)
+        assert isinstance(df_fitted, pd.DataFrame)
+        assert np.allclose(df_fitted[['x', 'y']].values, xy)
+        assert df_fitted['id'].tolist() == ['a', 'a', 'b']
+
+
+def test_scale_points():
+    df_points = _df_points()
+    view = scale_points(df_points, scale=2., lazy=True)
+    assert view.df_points is df_points
+    assert view.values.tolist() == [[0, 0], [5, 2.5], [10, 5]]
+    df_scaled = scale_points(df_points, scale=2.)
+    assert df_scaled[['x', 'y']].values.tolist() == view.values.tolist()
+    assert df_points['x'].tolist() == [0, 10, 20]
+    scale_points(df_points, scale=2., inplace=True)
+    assert (df_points[['x', 'y']].values.tolist() ==
+            df_scaled[['x', 'y']].values.tolist())
+    # View is computed from the (now scaled) source table on access.
+    assert view.values.tolist() == [[0, 0], [2.5, 1.25], [5, 2.5]]
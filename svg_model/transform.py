@@ -0,0 +1,295 @@
+# coding: utf-8
+'''
+Parsing and composition of SVG `transform`_ attributes, and lazily
+transformed views of point tables (see :class:`TransformedPoints`).
+
+.. _transform: https://developer.mozilla.org/en-US/docs/Web/SVG/Attribute/transform
+'''
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import math
+import re
+
+import numpy as np
+import pandas as pd
+import six
+
+cre_transform = re.compile(r'(?P<name>matrix|translate|scale|rotate|skewX|'
+                           r'skewY)\s*\((?P<args>[^)]*)\)')
+cre_separator = re.compile(r'[\s,]+')
+
+# Memoized results of `parse_transform` (transform string -> matrix).
+_TRANSFORM_CACHE = {}
+_TRANSFORM_CACHE_SIZE = 1024
+
+
+def _transform_matrix(name, args):
+    '''
+    Returns
+    -------
+    numpy.ndarray
+        ``3x3`` matrix corresponding to a single transform function.
+    '''
+    matrix = np.identity(3)
+    if name == 'matrix':
+        a, b, c, d, e, f = args
+        matrix[:2] = [[a, c, e], [b, d, f]]
+    elif name == 'translate':
+        matrix[:2, 2] = (args[0], args[1] if len(args) > 1 else 0)
+    elif name == 'scale':
+        matrix[0, 0] = args[0]
+        matrix[1, 1] = args[1] if len(args) > 1 else args[0]
+    elif name == 'rotate':
+        angle = math.radians(args[0])
+        cos, sin = math.cos(angle), math.sin(angle)
+        matrix[:2, :2] = [[cos, -sin], [sin, cos]]
+        if len(args) > 1:
+            # Rotate about `(cx, cy)`, i.e., `translate(cx, cy) rotate(angle)
+            # translate(-cx, -cy)`.
+            cx, cy = args[1:3]
+            matrix[:2, 2] = (cx - cos * cx + sin * cy,
+                             cy - sin * cx - cos * cy)
+    elif name == 'skewX':
+        matrix[0, 1] = math.tan(math.radians(args[0]))
+    elif name == 'skewY':
+        matrix[1, 0] = math.tan(math.radians(args[0]))
+    return matrix
+
+
+def parse_transform(transform):
+    '''
+    Parse SVG ``transform`` attribute value.
+
+    Results are memoized, i.e., parsing the same string again returns the
+    cached (read-only) matrix.
+
+    Parameters
+    ----------
+    transform : str
+        SVG ``transform`` attribute value, e.g., ``"translate(10, 20)
+        scale(2)"``.
+
+    Returns
+    -------
+    numpy.ndarray or None
+        ``3x3`` affine transformation matrix, or ``None`` if :data:`transform`
+        is empty.
+
+    Raises
+    ------
+    ValueError
+        If a transform function has the wrong number of arguments.
+
+    Examples
+    --------
+
+    >>> parse_transform('translate(10, 20) scale(2)').tolist()
+    [[2.0, 0.0, 10.0], [0.0, 2.0, 20.0], [0.0, 0.0, 1.0]]
+    >>> parse_transform('') is None
+    True
+    '''
+    try:
+        return _TRANSFORM_CACHE[transform]
+    except KeyError:
+        pass
+
+    matrix = None
+    for match_i in cre_transform.finditer(transform):
+        args_str = match_i.group('args').strip()
+        args = ([float(v) for v in cre_separator.split(args_str)]
+                if args_str else [])
+        name = match_i.group('name')
+        arg_counts = {'matrix': (6, ), 'translate': (1, 2), 'scale': (1, 2),
+                      'rotate': (1, 3), 'skewX': (1, ), 'skewY': (1, )}[name]
+        if len(args) not in arg_counts:
+            raise ValueError('Invalid number of arguments to `%s` in %r' %
+                             (name, transform))
+        matrix_i = _transform_matrix(name, args)
+        # Transform functions are applied right to left.
+        matrix = matrix_i if matrix is None else matrix.dot(matrix_i)
+
+    if matrix is not None:
+        matrix.flags.writeable = False
+    if len(_TRANSFORM_CACHE) >= _TRANSFORM_CACHE_SIZE:
+        _TRANSFORM_CACHE.clear()
+    _TRANSFORM_CACHE[transform] = matrix
+    return matrix
+
+
+def compose_transforms(parent, child):
+    '''
+    Returns
+    -------
+    numpy.ndarray or None
+        Matrix applying :data:`child` transform *followed by* :data:`parent`
+        transform, where ``None`` denotes the identity transform.
+    '''
+    if parent is None:
+        return child
+    elif child is None:
+        return parent
+    return parent.dot(child)
+
+
+def element_transform(element, cache=None):
+    '''
+    Resolve cumulative transform of an SVG element, i.e., the product of the
+    ``transform`` attributes of all ancestor elements (e.g., nested ``svg:g``
+    layers) and the element itself.
+
+    Parameters
+    ----------
+    element : lxml.etree._Element
+        SVG element.
+    cache : dict, optional
+        Cumulative transforms of *ancestor* elements, keyed by element.
+
+        Share the same dictionary between calls for elements of the same
+        document to resolve the transform of each ancestor group only once.
+
+    Returns
+    -------
+    numpy.ndarray or None
+        ``3x3`` affine transformation matrix mapping element coordinates to
+        document coordinates, or ``None`` if no transforms apply.
+    '''
+    if cache is None:
+        cache = {}
+
+    def _ancestor_transform(ancestor):
+        if ancestor is None:
+            return None
+        try:
+            return cache[ancestor]
+        except KeyError:
+            matrix = compose_transforms(_ancestor_transform(ancestor
+                                                            .getparent()),
+                                        parse_transform(ancestor.attrib
+                                                        .get('transform', '')))
+            cache[ancestor] = matrix
+            return matrix
+
+    return compose_transforms(_ancestor_transform(element.getparent()),
+                              parse_transform(element.attrib.get('transform',
+                                                                 '')))
+
+
+def apply_transform(points, matrix):
+    '''
+    Apply affine transform to points as a single matrix multiply.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        ``(n, 2)`` array of point coordinates.
+    matrix : numpy.ndarray or None
+        ``3x3`` (or ``2x3``) affine transformation matrix.  If ``None``,
+        :data:`points` is returned unchanged.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(n, 2)`` array of transformed point coordinates.
+    '''
+    if matrix is None:
+        return points
+    return points.dot(matrix[:2, :2].T) + matrix[:2, 2]
+
+
+class TransformedPoints(object):
+    '''
+    Lazy view of the ``x``/``y`` coordinates of a table of points, scaled and
+    offset (i.e., ``scale * (x, y) + offset``).
+
+    The source table is *not* copied; transformed coordinates are computed
+    from the source coordinates on access.  Columns other than ``x`` and
+    ``y`` are read from the source table as is.
+
+    Parameters
+    ----------
+    df_points : pandas.DataFrame
+        Table with at least the columns ``x`` and ``y``, containing one row
+        per point.
+    scale : float, optional
+        Scale factor.
+    offset : tuple, optional
+        ``(x, y)`` offset (applied *after* scaling).
+    '''
+    def __init__(self, df_points, scale=1., offset=(0, 0)):
+        self.df_points = df_points
+        self.scale = float(scale)
+        self.offset = np.asarray(offset, dtype=float).reshape(2)
+
+    def __len__(self):
+        return self.df_points.shape[0]
+
+    @property
+    def shape(self):
+        return self.df_points.shape
+
+    @property
+    def index(self):
+        return self.df_points.index
+
+    @property
+    def columns(self):
+        return self.df_points.columns
+
+    @property
+    def x(self):
+        return pd.Series(self.scale * self.df_points['x'].values +
+                         self.offset[0], index=self.df_points.index, name='x')
+
+    @property
+    def y(self):
+        return pd.Series(self.scale * self.df_points['y'].values +
+                         self.offset[1], index=self.df_points.index, name='y')
+
+    @property
+    def values(self):
+        '''
+        ``(n, 2)`` array of transformed ``x``/``y`` coordinates.
+        '''
+        return self.scale * self.df_points[['x', 'y']].values + self.offset
+
+    def __getitem__(self, key):
+        if isinstance(key, six.string_types):
+            return getattr(self, key) if key in ('x', 'y') else \
+                self.df_points[key]
+        # List of columns.
+        return self.to_frame(list(key))
+
+    def transform(self, scale=1., offset=(0, 0)):
+        '''
+        Returns
+        -------
+        TransformedPoints
+            View of the same source table, with :data:`scale` and
+            :data:`offset` applied *after* the transform of this view.
+        '''
+        return TransformedPoints(self.df_points, scale * self.scale,
+                                 scale * self.offset + offset)
+
+    def to_frame(self, columns=None):
+        '''
+        Materialize transformed table.
+
+        Parameters
+        ----------
+        columns : list, optional
+            Columns to include (default: all columns of the source table).
+
+        Returns
+        -------
+        pandas.DataFrame
+            Copy of (the selected columns of) the source table, with
+            transformed ``x``/``y`` coordinates.
+        '''
+        df_points = (self.df_points.copy() if columns is None
+                     else self.df_points[columns].copy())
+        for i, column in enumerate(('x', 'y')):
+            if column in df_points:
+                df_points[column] = (self.scale *
+                                     self.df_points[column].values +
+                                     self.offset[i])
+        return df_points